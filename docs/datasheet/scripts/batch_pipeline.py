@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+データシート出力の差分ビルド (make 風バッチパイプライン)
+
+docs/datasheet/output/<id>/<id>.pdf を走査して依存グラフを作り、入力が
+変わったターゲットだけを作り直す。
+
+ターゲット:
+    text     <id>.pdf → <id>.txt, extraction_meta.json     (extract_pdf_text.py)
+    tables   <id>.pdf → <id>.tables.json, tables_meta.json (extract_tables.py)
+    summary  全データシートの extraction_meta.json / tables_meta.json
+             → output/extraction_summary.csv
+
+ターゲットが最新かどうかは、入力・出力ファイルの内容ハッシュと抽出器の
+バージョン（CLI が同ディレクトリからインポートするモジュール全体のソースと
+抽出オプションのハッシュ）をマニフェスト (output/.pipeline_manifest.json) の
+記録と比べて判定する。
+ファイルのサイズと mtime が記録と同じ場合はハッシュを再計算しないため、
+変更のない再実行はファイルを読まずに終わる。
+
+依存関係のないターゲットは --jobs 個まで並列に実行する（抽出はサブプロセス、
+--daemon 指定時は extraction_daemon.py のワーカー）。
+マニフェストはターゲットが完了するたびに保存するので、中断しても
+完了済みのターゲットは次回作り直さない。
+
+--strategies を渡さない場合、抽出 CLI はローカルの戦略統計 (strategy_stats.py) で
+試行順を決めるため、採用される戦略が統計の内容によって変わりうる。統計は
+バージョンに含まれないので、「最新」と判定された出力が作り直した結果と一致する
+とは限らない。再現性が必要なら --text-args=--no-strategy-stats
+--table-args=--no-strategy-stats を付ける（"-" で始まる値は = で繋いで渡す）。
+
+使用方法:
+    python batch_pipeline.py [output_dir]
+    python batch_pipeline.py docs/datasheet/output/ --jobs 8
+    python batch_pipeline.py --dry-run
+    python batch_pipeline.py --targets text --datasheets TI_LM358M --force
+    python batch_pipeline.py --text-args="--strategies pymupdf,pdfminer"
+    python batch_pipeline.py --text-args=--no-strategy-stats --table-args=--no-strategy-stats
+    python batch_pipeline.py --daemon --jobs 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import csv
+import functools
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+from extraction_daemon import PRIORITIES, default_socket_path, run_remote
+from results_store import compute_code_version, file_sha256
+
+SCRIPT_DIR = Path(__file__).parent
+
+MANIFEST_NAME = ".pipeline_manifest.json"
+MANIFEST_VERSION = 1
+SUMMARY_NAME = "extraction_summary.csv"
+TEXT_META_NAME = "extraction_meta.json"
+TABLES_META_NAME = "tables_meta.json"
+
+TARGET_KINDS = ["text", "tables", "summary"]
+
+# ターゲットを作る CLI（キーは extraction_daemon.py のジョブ種別）
+CLI_SCRIPTS = {"text": "extract_pdf_text.py", "tables": "extract_tables.py"}
+
+# バージョンの算出対象を CLI のインポートから求めないターゲット
+STATIC_KIND_MODULES = {"summary": ["batch_pipeline.py"]}
+
+SUMMARY_FIELDS = [
+    "datasheet_id",
+    "text_method",
+    "text_quality",
+    "page_count",
+    "text_elapsed_ms",
+    "table_method",
+    "table_count",
+    "tables_elapsed_ms",
+]
+
+
+@dataclass
+class Target:
+    """依存グラフの1ノード。"""
+
+    key: str  # マニフェストのキー（例: "text:TI_LM358M"）
+    kind: str
+    inputs: list[str]
+    outputs: list[str]
+    version: str
+    build: Callable[[], None]
+    deps: list[str] = field(default_factory=list)  # 先に完了している必要があるターゲット
+
+
+# =====================================================================
+# マニフェスト
+# =====================================================================
+
+
+class Manifest:
+    """
+    ターゲットごとの入出力ハッシュとバージョンの記録。
+    ファイルハッシュは (サイズ, mtime_ns) をキーにキャッシュする。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.targets: dict[str, dict] = {}
+        self.files: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.targets = data.get("targets", {})
+                    self.files = data.get("files", {})
+            except (OSError, ValueError):
+                pass  # 壊れたマニフェストは無いものとして全て作り直す
+
+    def file_hash(self, path: str) -> str | None:
+        """ファイル内容のハッシュ（存在しなければ None）。stat が同じなら記録を使う。"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self.files.get(path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha256"]
+        digest = file_sha256(path)
+        with self._lock:
+            self.files[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def _hashes(self, paths: list[str]) -> dict[str, str | None]:
+        return {path: self.file_hash(path) for path in paths}
+
+    def stale_reason(self, target: Target) -> str | None:
+        """作り直しが必要なら理由を、最新なら None を返す。"""
+        record = self.targets.get(target.key)
+        if record is None:
+            return "never built"
+        if record["version"] != target.version:
+            return "extractor version changed"
+        if record["inputs"] != self._hashes(target.inputs):
+            return "inputs changed"
+        outputs = self._hashes(target.outputs)
+        if any(digest is None for digest in outputs.values()):
+            return "output missing"
+        if record["outputs"] != outputs:
+            return "output modified"
+        return None
+
+    def record(self, target: Target) -> None:
+        """ビルドが完了したターゲットを記録して保存する。"""
+        entry = {
+            "version": target.version,
+            "inputs": self._hashes(target.inputs),
+            "outputs": self._hashes(target.outputs),
+            "built_at": time.time(),
+        }
+        with self._lock:
+            self.targets[target.key] = entry
+        self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"version": MANIFEST_VERSION, "targets": self.targets, "files": self.files}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+# =====================================================================
+# ビルダー
+# =====================================================================
+
+
+def _run_script(cli: str, args: list[str], log_path: str, daemon_socket: str | None = None) -> None:
+    """
+    抽出 CLI を実行する。daemon_socket があれば extraction_daemon.py に
+    batch 優先度で投入し、無ければサブプロセスで起動する。失敗時は RuntimeError。
+    """
+    script = CLI_SCRIPTS[cli]
+    args = [*args, "--log-file", log_path]
+    if daemon_socket:
+        try:
+            result = run_remote(daemon_socket, cli, args, PRIORITIES["batch"])
+        except OSError as e:
+            raise RuntimeError(f"cannot reach extraction daemon at {daemon_socket}: {e}")
+        returncode, output = result["exit_code"], result["stderr"] or result["stdout"]
+    else:
+        proc = subprocess.run(
+            [sys.executable, str(SCRIPT_DIR / script), *args], capture_output=True, text=True
+        )
+        returncode, output = proc.returncode, proc.stderr or proc.stdout
+    if returncode != 0:
+        tail = output.strip().splitlines()[-1:] or [""]
+        raise RuntimeError(f"{script} exited with {returncode}: {tail[0][:200]}")
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_summary(output_dir: str, datasheet_ids: list[str], summary_path: str) -> None:
+    """各データシートのメタ情報を1つの CSV にまとめる。"""
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for datasheet_id in datasheet_ids:
+            base = Path(output_dir) / datasheet_id
+            text_meta = _read_json(str(base / TEXT_META_NAME))
+            tables_meta = _read_json(str(base / TABLES_META_NAME))
+            writer.writerow({
+                "datasheet_id": datasheet_id,
+                "text_method": text_meta.get("method", ""),
+                "text_quality": text_meta.get("quality_score", ""),
+                "page_count": text_meta.get("page_count", tables_meta.get("page_count", "")),
+                "text_elapsed_ms": text_meta.get("total_elapsed_ms", ""),
+                "table_method": tables_meta.get("method", ""),
+                "table_count": tables_meta.get("table_count", ""),
+                "tables_elapsed_ms": tables_meta.get("total_elapsed_ms", ""),
+            })
+
+
+@functools.lru_cache(maxsize=None)
+def local_imports(script: str) -> tuple[str, ...]:
+    """
+    script が同ディレクトリから（関数内の遅延インポートも含めて）推移的に
+    インポートするモジュールのファイル名を、script 自身を先頭にして返す。
+    """
+    found: dict[str, None] = {}
+    pending = [script]
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        found[name] = None
+        tree = ast.parse((SCRIPT_DIR / name).read_text(encoding="utf-8"), filename=name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                modules = [node.module]
+            else:
+                continue
+            for module in modules:
+                path = f"{module.split('.')[0]}.py"
+                if (SCRIPT_DIR / path).exists():
+                    pending.append(path)
+    return (script, *sorted(n for n in found if n != script))
+
+
+def kind_modules(kind: str) -> list[str]:
+    """ターゲットの種類ごとに、バージョンの算出対象とするモジュール。"""
+    if kind in STATIC_KIND_MODULES:
+        return STATIC_KIND_MODULES[kind]
+    return list(local_imports(CLI_SCRIPTS[kind]))
+
+
+def _version(kind: str, options: list[str]) -> str:
+    digest = hashlib.sha256(compute_code_version(SCRIPT_DIR, kind_modules(kind)).encode("utf-8"))
+    digest.update(json.dumps(options).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def build_graph(
+    output_dir: str,
+    pdfs: list[tuple[str, str]],
+    kinds: list[str],
+    text_args: list[str],
+    table_args: list[str],
+    daemon_socket: str | None = None,
+) -> list[Target]:
+    """データシートごとの text / tables ターゲットと、それらに依存する summary を作る。"""
+    targets: list[Target] = []
+    text_version = _version("text", text_args)
+    tables_version = _version("tables", table_args)
+
+    for datasheet_id, pdf_path in pdfs:
+        base = Path(pdf_path).parent
+        if "text" in kinds:
+            txt_path = str(base / f"{datasheet_id}.txt")
+            meta_path = str(base / TEXT_META_NAME)
+            targets.append(Target(
+                key=f"text:{datasheet_id}",
+                kind="text",
+                inputs=[pdf_path],
+                outputs=[txt_path, meta_path],
+                version=text_version,
+                build=lambda p=pdf_path, t=txt_path, m=meta_path, b=base: _run_script(
+                    "text",
+                    [p, t, "--json-meta", m, *text_args],
+                    str(b / "extract_pdf_text.log"),
+                    daemon_socket,
+                ),
+            ))
+        if "tables" in kinds:
+            tables_path = str(base / f"{datasheet_id}.tables.json")
+            meta_path = str(base / TABLES_META_NAME)
+            targets.append(Target(
+                key=f"tables:{datasheet_id}",
+                kind="tables",
+                inputs=[pdf_path],
+                outputs=[tables_path, meta_path],
+                version=tables_version,
+                build=lambda p=pdf_path, t=tables_path, m=meta_path, b=base: _run_script(
+                    "tables",
+                    [p, t, "--json-meta", m, *table_args],
+                    str(b / "extract_tables.log"),
+                    daemon_socket,
+                ),
+            ))
+
+    if "summary" in kinds:
+        datasheet_ids = [datasheet_id for datasheet_id, _ in pdfs]
+        meta_paths = [
+            str(Path(pdf_path).parent / name)
+            for _, pdf_path in pdfs
+            for name in (TEXT_META_NAME, TABLES_META_NAME)
+        ]
+        summary_path = str(Path(output_dir) / SUMMARY_NAME)
+        targets.append(Target(
+            key="summary",
+            kind="summary",
+            inputs=meta_paths,
+            outputs=[summary_path],
+            version=_version("summary", datasheet_ids),
+            build=lambda: build_summary(output_dir, datasheet_ids, summary_path),
+            deps=[t.key for t in targets],
+        ))
+    return targets
+
+
+# =====================================================================
+# 実行
+# =====================================================================
+
+
+def run_pipeline(
+    targets: list[Target],
+    manifest: Manifest,
+    jobs: int,
+    force: bool = False,
+    dry_run: bool = False,
+) -> dict[str, list]:
+    """
+    依存順にターゲットを実行する。依存先が作り直された、または失敗したターゲットは
+    入力の判定を依存先の完了後に行う（依存先が失敗したものは実行しない）。
+
+    Returns:
+        {"built": [key], "up_to_date": [key], "failed": [(key, error)], "skipped": [key]}
+    """
+    outcome: dict[str, list] = {"built": [], "up_to_date": [], "failed": [], "skipped": []}
+    by_key = {t.key: t for t in targets}
+    pending = {t.key for t in targets}
+    finished: set[str] = set()
+    failed: set[str] = set()
+
+    def ready(key: str) -> bool:
+        return all(dep in finished or dep not in by_key for dep in by_key[key].deps)
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        running: dict = {}
+        while pending or running:
+            for key in sorted(pending):
+                if not ready(key):
+                    continue
+                target = by_key[key]
+                pending.discard(key)
+                if any(dep in failed for dep in target.deps):
+                    failed.add(key)
+                    outcome["skipped"].append(key)
+                    finished.add(key)
+                    continue
+                reason = "forced" if force else manifest.stale_reason(target)
+                if reason is None and dry_run and any(dep in outcome["built"] for dep in target.deps):
+                    # 実行しない場合は依存先の出力が変わらないため、依存先の再ビルドで判定する
+                    reason = "dependency out of date"
+                if reason is None:
+                    outcome["up_to_date"].append(key)
+                    finished.add(key)
+                    continue
+                print(f"  build {key} ({reason})", flush=True)
+                if dry_run:
+                    outcome["built"].append(key)
+                    finished.add(key)
+                    continue
+                running[pool.submit(_build, target)] = (key, time.perf_counter())
+
+            if not running:
+                if pending and not any(ready(key) for key in pending):
+                    raise RuntimeError(f"dependency cycle among: {sorted(pending)}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, start = running.pop(future)
+                error = future.result()
+                elapsed = time.perf_counter() - start
+                if error:
+                    failed.add(key)
+                    outcome["failed"].append((key, error))
+                    print(f"  FAILED {key}: {error}", flush=True)
+                else:
+                    manifest.record(by_key[key])
+                    outcome["built"].append(key)
+                    print(f"  done  {key} ({elapsed:.1f}s)", flush=True)
+                finished.add(key)
+    return outcome
+
+
+def _build(target: Target) -> str:
+    """ターゲットを実行し、エラーがあればメッセージを返す。"""
+    try:
+        target.build()
+    except Exception as e:
+        return str(e)[:300]
+    missing = [path for path in target.outputs if not os.path.exists(path)]
+    if missing:
+        return f"outputs not produced: {', '.join(Path(p).name for p in missing)}"
+    return ""
+
+
+def find_pdfs(output_dir: str) -> list[tuple[str, str]]:
+    """
+    output_dir 配下の <id>/<id>.pdf を探す
+    （evaluate_extraction.find_pdfs と同じ。抽出モジュールを読み込まないよう別に持つ）。
+    """
+    results = []
+    output_path = Path(output_dir)
+    if not output_path.exists():
+        return results
+    for entry in sorted(output_path.iterdir()):
+        pdf_file = entry / f"{entry.name}.pdf"
+        if entry.is_dir() and pdf_file.exists():
+            results.append((entry.name, str(pdf_file)))
+    return results
+
+
+def main():
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(
+        description="データシート出力のうち入力が変わったものだけを作り直す"
+    )
+    parser.add_argument(
+        "output_dir",
+        nargs="?",
+        default=None,
+        help="docs/datasheet/output/ ディレクトリのパス（省略時は自動検出）",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="並列に実行するターゲット数。デフォルト: CPU数",
+    )
+    parser.add_argument(
+        "--targets",
+        default=",".join(TARGET_KINDS),
+        help=f"作るターゲットの種類（カンマ区切り）。デフォルト: {','.join(TARGET_KINDS)}",
+    )
+    parser.add_argument(
+        "--datasheets",
+        default=None,
+        help="対象のデータシートID（カンマ区切り）。省略時は全件",
+    )
+    parser.add_argument(
+        "--text-args",
+        default="",
+        help=(
+            "extract_pdf_text.py に渡す追加オプション（バージョンの判定に含まれる）。"
+            "- で始まる値は --text-args=--no-strategy-stats のように = で繋ぐ"
+        ),
+    )
+    parser.add_argument(
+        "--table-args",
+        default="",
+        help=(
+            "extract_tables.py に渡す追加オプション（バージョンの判定に含まれる）。"
+            "- で始まる値は --table-args=--no-strategy-stats のように = で繋ぐ"
+        ),
+    )
+    parser.add_argument(
+        "--daemon",
+        nargs="?",
+        const=default_socket_path(),
+        default=None,
+        metavar="SOCKET",
+        help="抽出を extraction_daemon.py に batch 優先度で投入する（省略時はサブプロセスで実行）",
+    )
+    parser.add_argument("--force", action="store_true", help="最新のターゲットも作り直す")
+    parser.add_argument(
+        "--dry-run",
+        "-n",
+        action="store_true",
+        help="作り直すターゲットを表示するだけで実行しない",
+    )
+    args = parser.parse_args()
+
+    if args.output_dir:
+        output_dir = args.output_dir
+    else:
+        output_dir = str(SCRIPT_DIR.parent / "output")
+
+    kinds = [s.strip() for s in args.targets.split(",") if s.strip()]
+    unknown = [k for k in kinds if k not in TARGET_KINDS]
+    if unknown:
+        parser.error(f"Unknown target(s): {unknown}. Available: {TARGET_KINDS}")
+
+    pdfs = find_pdfs(output_dir)
+    if args.datasheets:
+        wanted = {s.strip() for s in args.datasheets.split(",") if s.strip()}
+        pdfs = [(datasheet_id, path) for datasheet_id, path in pdfs if datasheet_id in wanted]
+    if not pdfs:
+        print(f"No PDFs found in {output_dir}")
+        sys.exit(1)
+
+    manifest = Manifest(str(Path(output_dir) / MANIFEST_NAME))
+    targets = build_graph(
+        output_dir,
+        pdfs,
+        kinds,
+        shlex.split(args.text_args),
+        shlex.split(args.table_args),
+        daemon_socket=args.daemon,
+    )
+    outcome = run_pipeline(targets, manifest, args.jobs, force=args.force, dry_run=args.dry_run)
+    if not args.dry_run:
+        manifest.save()  # 再計算したファイルハッシュのキャッシュも保存する
+
+    verb = "would build" if args.dry_run else "built"
+    print(
+        f"{len(targets)} target(s): {len(outcome['built'])} {verb}, "
+        f"{len(outcome['up_to_date'])} up to date, {len(outcome['failed'])} failed, "
+        f"{len(outcome['skipped'])} skipped ({time.perf_counter() - start:.2f}s)"
+    )
+    if outcome["failed"] or outcome["skipped"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
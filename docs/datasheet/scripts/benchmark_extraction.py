@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+PDF抽出パイプラインのエンドツーエンド・ベンチマーク
+
+docs/datasheet/output/ 配下の全PDFに対して、テキスト抽出・表抽出の各戦略、
+正規化、品質スコアリングを計測し、ステージ × 戦略 × データシートごとに
+スループット (pages/sec)、ページ単位レイテンシ (p50/p95)、ピーク RSS を
+JSON で出力する。
+
+計測ステージ:
+    text           テキスト抽出戦略 (run_strategy)
+    table          表抽出戦略 (run_table_strategy)
+    normalize      ページテキストの正規化 (normalize_page_text)。入力は --text-strategies の先頭
+    text_quality   テキスト品質スコア (evaluate_quality)。入力は --text-strategies の先頭
+    table_quality  表品質スコア (evaluate_table_quality)。入力は --table-strategies の先頭
+
+各ケースは既定で新しいプロセスで実行し（ピーク RSS をケースごとに分離するため）、
+ウォームアップ実行の後に --repeat 回計測する。プロセス内キャッシュ（セル正規化・
+OCR結果）は各実行の前に破棄する。
+
+使用方法:
+    python benchmark_extraction.py [output_dir]
+    python benchmark_extraction.py docs/datasheet/output/ --repeat 5 -o bench.json
+    python benchmark_extraction.py --stages text,table --datasheets TI_LM358M
+    python benchmark_extraction.py --compare baseline.json
+    python benchmark_extraction.py --compare baseline.json --current bench.json
+
+--compare を指定すると、計測結果（または --current の既存結果）をベースラインと
+比較し、スループット・メモリの回帰があれば終了コード 1 で終了する。
+
+OCR 戦略を含めた場合、表抽出の OCR はページの OCR をまとめて先に行うため、
+ページ単位レイテンシは先頭ページに集中する。
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pdf_ocr
+import pdf_table_extractor
+import table_quality
+from evaluate_extraction import find_pdfs
+from pdf_extractors import run_strategy
+from pdf_normalize import normalize_page_text
+from pdf_quality import evaluate_quality
+from pdf_table_extractor import run_table_strategy
+from resource_usage import current_rss_mb, peak_rss_mb
+from results_store import compute_code_version
+from table_quality import evaluate_table_quality
+
+STAGES = ["text", "table", "normalize", "text_quality", "table_quality"]
+
+# 結果 JSON のスキーマバージョン（比較ツールとの互換性確認用）
+BENCHMARK_SCHEMA_VERSION = 1
+
+# 比較時の既定許容幅（相対値）
+DEFAULT_THROUGHPUT_TOLERANCE = 0.10
+DEFAULT_MEMORY_TOLERANCE = 0.10
+# メモリ回帰とみなす最小増加量 (MB)。小さいケースの揺らぎを無視する
+MEMORY_NOISE_FLOOR_MB = 5.0
+# 反復間のばらつき (MAD 由来の相対標準偏差) に掛ける係数
+NOISE_SIGMAS = 2.0
+# quality_score の変化として報告する最小差
+QUALITY_EPSILON = 1e-6
+
+# 環境差の警告対象とするメタデータ
+COMPARABLE_META_KEYS = ["python", "platform", "cpu_count", "warmup", "repeat", "isolated"]
+
+
+def clear_caches() -> None:
+    """計測の前にプロセス内キャッシュを破棄し、実行ごとの条件を揃える。"""
+    for module in (pdf_table_extractor, table_quality):
+        for obj in vars(module).values():
+            if hasattr(obj, "cache_clear"):
+                obj.cache_clear()
+    pdf_ocr.clear_ocr_cache()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """線形補間によるパーセンタイル（values が空なら 0.0）。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+class _PageClock:
+    """ページ完了コールバックの間隔からページ単位レイテンシを記録する。"""
+
+    def __init__(self):
+        self.latencies_ms: list[float] = []
+        self.peak_rss_mb: float | None = None
+        self._last = time.perf_counter()
+
+    def tick(self, *_args) -> None:
+        now = time.perf_counter()
+        self.latencies_ms.append((now - self._last) * 1000)
+        self._last = now
+        rss = current_rss_mb()
+        if rss is not None:
+            self.peak_rss_mb = max(rss, self.peak_rss_mb or 0.0)
+
+
+def _prepare_input(stage: str, strategy: str, pdf_path: str):
+    """正規化・品質ステージの入力（計測対象外）を用意する。"""
+    if stage in ("normalize", "text_quality"):
+        page_texts = run_strategy(strategy, pdf_path).page_texts
+        if stage == "text_quality":
+            page_texts = [normalize_page_text(text) for text in page_texts]
+        return page_texts
+    if stage == "table_quality":
+        result = run_table_strategy(strategy, pdf_path)
+        by_page: list[list] = [[] for _ in range(result.page_count)]
+        for table in result.tables:
+            by_page[table.page - 1].append(table)
+        return by_page
+    return None
+
+
+def _run_once(stage: str, strategy: str, pdf_path: str, prepared) -> tuple[_PageClock, float]:
+    """1回分を計測し、(ページ時計, 品質スコア) を返す。"""
+    clock = _PageClock()
+    quality_score = 0.0
+
+    if stage == "text":
+        result = run_strategy(strategy, pdf_path, on_page=clock.tick)
+        quality_score = evaluate_quality(result.text, result.page_texts)
+    elif stage == "table":
+        result = run_table_strategy(strategy, pdf_path, on_page=clock.tick)
+        scores = [evaluate_table_quality(table) for table in result.tables]
+        quality_score = sum(scores) / len(scores) if scores else 0.0
+    elif stage == "normalize":
+        for text in prepared:
+            normalize_page_text(text)
+            clock.tick()
+    elif stage == "text_quality":
+        scores = []
+        for text in prepared:
+            scores.append(evaluate_quality(text))
+            clock.tick()
+        quality_score = sum(scores) / len(scores) if scores else 0.0
+    elif stage == "table_quality":
+        scores = []
+        for page_tables in prepared:
+            scores.extend(evaluate_table_quality(table) for table in page_tables)
+            clock.tick()
+        quality_score = sum(scores) / len(scores) if scores else 0.0
+    else:
+        raise ValueError(f"Unknown stage: {stage}. Available: {STAGES}")
+
+    return clock, quality_score
+
+
+def run_case(
+    stage: str,
+    strategy: str,
+    datasheet_id: str,
+    pdf_path: str,
+    warmup: int,
+    repeat: int,
+) -> dict:
+    """
+    1ケース (ステージ, 戦略, データシート) をウォームアップ後に repeat 回計測する。
+    プロセスプールのワーカーからも呼ばれるため、例外は結果の error に格納する。
+    """
+    case = {
+        "stage": stage,
+        "strategy": strategy,
+        "datasheet_id": datasheet_id,
+        "pages": 0,
+        "runs": [],
+        "pages_per_sec": 0.0,
+        "page_latency_ms": {"p50": 0.0, "p95": 0.0},
+        "rss_before_mb": None,
+        "peak_rss_mb": None,
+        "quality_score": 0.0,
+        "error": "",
+    }
+    try:
+        prepared = _prepare_input(stage, strategy, pdf_path)
+        rss_before = current_rss_mb()
+        case["rss_before_mb"] = round(rss_before, 1) if rss_before is not None else None
+
+        for _ in range(warmup):
+            clear_caches()
+            _run_once(stage, strategy, pdf_path, prepared)
+
+        latencies: list[float] = []
+        sampled_peak = 0.0
+        for _ in range(repeat):
+            clear_caches()
+            start = time.perf_counter()
+            clock, quality_score = _run_once(stage, strategy, pdf_path, prepared)
+            elapsed = time.perf_counter() - start
+            pages = len(clock.latencies_ms)
+            case["runs"].append({
+                "elapsed_ms": round(elapsed * 1000, 3),
+                "pages_per_sec": round(pages / elapsed, 3) if elapsed > 0 else 0.0,
+            })
+            case["pages"] = pages
+            case["quality_score"] = quality_score
+            latencies.extend(clock.latencies_ms)
+            sampled_peak = max(sampled_peak, clock.peak_rss_mb or 0.0)
+
+        case["pages_per_sec"] = statistics.median(run["pages_per_sec"] for run in case["runs"])
+        case["page_latency_ms"] = {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+        }
+        peak = peak_rss_mb()
+        case["peak_rss_mb"] = round(max(peak or 0.0, sampled_peak), 1) or None
+    except Exception as e:
+        case["error"] = str(e)[:200]
+
+    return case
+
+
+def build_cases(
+    pdfs: list[tuple[str, str]],
+    stages: list[str],
+    text_strategies: list[str],
+    table_strategies: list[str],
+) -> list[tuple[str, str, str, str]]:
+    """(stage, strategy, datasheet_id, pdf_path) の計測ケースを列挙する。"""
+    stage_strategies = {
+        "text": text_strategies,
+        "table": table_strategies,
+        "normalize": text_strategies[:1],
+        "text_quality": text_strategies[:1],
+        "table_quality": table_strategies[:1],
+    }
+    return [
+        (stage, strategy, datasheet_id, pdf_path)
+        for stage in stages
+        for strategy in stage_strategies[stage]
+        for datasheet_id, pdf_path in pdfs
+    ]
+
+
+def run_benchmark(
+    cases: list[tuple[str, str, str, str]],
+    warmup: int,
+    repeat: int,
+    isolate: bool = True,
+) -> list[dict]:
+    """
+    ケースを1つずつ順に計測する（並列実行は計測を乱すため行わない）。
+    isolate=True の場合、ケースごとに新しいプロセスで実行してピーク RSS を分離する。
+    """
+    results: list[dict] = []
+    context = multiprocessing.get_context("spawn")
+    for i, (stage, strategy, datasheet_id, pdf_path) in enumerate(cases, start=1):
+        args = (stage, strategy, datasheet_id, pdf_path, warmup, repeat)
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                case = pool.submit(run_case, *args).result()
+        else:
+            case = run_case(*args)
+        results.append(case)
+        status = f"ERROR - {case['error'][:60]}" if case["error"] else (
+            f"{case['pages_per_sec']:.1f} pages/s "
+            f"p95={case['page_latency_ms']['p95']:.1f}ms"
+        )
+        print(f"[{i}/{len(cases)}] {stage}/{strategy} {datasheet_id}: {status}", flush=True)
+    return results
+
+
+def benchmark_metadata(output_dir: str, warmup: int, repeat: int, isolate: bool) -> dict:
+    """比較時に環境差を確認するためのメタデータ。"""
+    return {
+        "schema_version": BENCHMARK_SCHEMA_VERSION,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "code_version": compute_code_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "output_dir": output_dir,
+        "warmup": warmup,
+        "repeat": repeat,
+        "isolated": isolate,
+    }
+
+
+def print_summary(results: list[dict]) -> None:
+    """ステージ × 戦略ごとの合計スループットを表示する。"""
+    print()
+    print("=" * 100)
+    print("Extraction Benchmark Summary")
+    print("=" * 100)
+    print(
+        f"  {'stage/strategy':<28s} {'cases':>5s} {'pages':>6s} {'pages/s':>9s} "
+        f"{'p50 ms':>8s} {'p95 ms':>8s} {'peak RSS':>9s}"
+    )
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for case in results:
+        if not case["error"]:
+            groups.setdefault((case["stage"], case["strategy"]), []).append(case)
+
+    for (stage, strategy), cases in groups.items():
+        pages = sum(c["pages"] for c in cases)
+        # 合計ページ数 / 合計時間（各ケースの中央値スループットから換算）
+        seconds = sum(c["pages"] / c["pages_per_sec"] for c in cases if c["pages_per_sec"])
+        peak = max((c["peak_rss_mb"] or 0.0) for c in cases)
+        print(
+            f"  {stage + '/' + strategy:<28s} {len(cases):>5d} {pages:>6d} "
+            f"{(pages / seconds if seconds else 0.0):>9.1f} "
+            f"{statistics.median(c['page_latency_ms']['p50'] for c in cases):>8.2f} "
+            f"{max(c['page_latency_ms']['p95'] for c in cases):>8.2f} "
+            f"{peak:>7.1f}MB"
+        )
+
+    errors = [c for c in results if c["error"]]
+    if errors:
+        print(f"\n  {len(errors)} case(s) failed:")
+        for case in errors:
+            print(f"    {case['stage']}/{case['strategy']} {case['datasheet_id']}: {case['error'][:80]}")
+    print()
+
+
+# =====================================================================
+# ベースライン比較（回帰ゲート）
+# =====================================================================
+
+
+def _case_key(case: dict) -> tuple[str, str, str]:
+    return (case["stage"], case["strategy"], case["datasheet_id"])
+
+
+def _relative_noise(values: list[float]) -> float:
+    """
+    反復計測値の相対的なばらつきを返す。
+    外れ値に強い MAD (中央絶対偏差) を標準偏差相当に換算し、中央値で割る。
+    """
+    if len(values) < 2:
+        return 0.0
+    median = statistics.median(values)
+    if median <= 0:
+        return 0.0
+    mad = statistics.median(abs(v - median) for v in values)
+    return 1.4826 * mad / median
+
+
+def compare_case(
+    base: dict,
+    current: dict,
+    tolerance: float = DEFAULT_THROUGHPUT_TOLERANCE,
+    memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+) -> dict:
+    """
+    1ケースのベースラインと今回の結果を比較する。
+
+    スループットは反復ごとの pages/sec の中央値で比べ、許容幅に両者の反復間
+    ばらつきを加えた閾値を超えて低下した場合に回帰とする。
+    メモリはピーク RSS が許容幅と MEMORY_NOISE_FLOOR_MB の両方を超えて
+    増えた場合に回帰とする。quality_score の変化は回帰とは別に報告する。
+    """
+    entry = {
+        "stage": current["stage"],
+        "strategy": current["strategy"],
+        "datasheet_id": current["datasheet_id"],
+        "throughput_change": 0.0,
+        "throughput_threshold": 0.0,
+        "memory_change_mb": 0.0,
+        "quality_change": 0.0,
+        "regressions": [],
+    }
+
+    if current["error"]:
+        if not base["error"]:
+            entry["regressions"].append(f"error: {current['error'][:80]}")
+        return entry
+    if base["error"]:
+        return entry
+
+    base_runs = [run["pages_per_sec"] for run in base["runs"]]
+    cur_runs = [run["pages_per_sec"] for run in current["runs"]]
+    base_median = statistics.median(base_runs) if base_runs else 0.0
+    cur_median = statistics.median(cur_runs) if cur_runs else 0.0
+    if base_median > 0:
+        change = cur_median / base_median - 1
+        noise = (_relative_noise(base_runs) ** 2 + _relative_noise(cur_runs) ** 2) ** 0.5
+        threshold = tolerance + NOISE_SIGMAS * noise
+        entry["throughput_change"] = change
+        entry["throughput_threshold"] = threshold
+        if change < -threshold:
+            entry["regressions"].append(
+                f"throughput {base_median:.1f} -> {cur_median:.1f} pages/s "
+                f"({change:+.1%}, threshold -{threshold:.1%})"
+            )
+
+    if base["peak_rss_mb"] and current["peak_rss_mb"]:
+        delta = current["peak_rss_mb"] - base["peak_rss_mb"]
+        entry["memory_change_mb"] = delta
+        if delta > max(base["peak_rss_mb"] * memory_tolerance, MEMORY_NOISE_FLOOR_MB):
+            entry["regressions"].append(
+                f"peak RSS {base['peak_rss_mb']:.1f} -> {current['peak_rss_mb']:.1f} MB "
+                f"({delta:+.1f} MB)"
+            )
+
+    entry["quality_change"] = current["quality_score"] - base["quality_score"]
+    return entry
+
+
+def compare_benchmarks(
+    baseline: dict,
+    current: dict,
+    tolerance: float = DEFAULT_THROUGHPUT_TOLERANCE,
+    memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+) -> dict:
+    """
+    ベースラインと今回のベンチマーク結果 JSON を比較する。
+
+    Returns:
+        {"entries": [...], "missing": [...], "added": [...], "meta_diffs": [...]}
+    """
+    base_cases = {_case_key(case): case for case in baseline["results"]}
+    cur_cases = {_case_key(case): case for case in current["results"]}
+
+    entries = [
+        compare_case(base_cases[key], case, tolerance, memory_tolerance)
+        for key, case in cur_cases.items()
+        if key in base_cases
+    ]
+    meta_diffs = [
+        f"{key}: {baseline['meta'].get(key)} -> {current['meta'].get(key)}"
+        for key in COMPARABLE_META_KEYS
+        if baseline["meta"].get(key) != current["meta"].get(key)
+    ]
+    return {
+        "entries": entries,
+        "missing": [key for key in base_cases if key not in cur_cases],
+        "added": [key for key in cur_cases if key not in base_cases],
+        "meta_diffs": meta_diffs,
+    }
+
+
+def print_comparison(comparison: dict) -> bool:
+    """比較結果を表示し、回帰があれば True を返す。"""
+    print()
+    print("=" * 100)
+    print("Benchmark Comparison")
+    print("=" * 100)
+
+    if comparison["meta_diffs"]:
+        print("  WARNING: benchmark environments differ:")
+        for diff in comparison["meta_diffs"]:
+            print(f"    {diff}")
+
+    regressed = [e for e in comparison["entries"] if e["regressions"]]
+    for entry in regressed:
+        label = f"{entry['stage']}/{entry['strategy']} {entry['datasheet_id']}"
+        for reason in entry["regressions"]:
+            print(f"  REGRESSION  {label}: {reason}")
+
+    improved = [
+        e for e in comparison["entries"]
+        if not e["regressions"] and e["throughput_change"] > e["throughput_threshold"] > 0
+    ]
+    for entry in improved:
+        print(
+            f"  improved    {entry['stage']}/{entry['strategy']} {entry['datasheet_id']}: "
+            f"throughput {entry['throughput_change']:+.1%}"
+        )
+
+    quality_changed = [
+        e for e in comparison["entries"] if abs(e["quality_change"]) > QUALITY_EPSILON
+    ]
+    for entry in quality_changed:
+        print(
+            f"  quality     {entry['stage']}/{entry['strategy']} {entry['datasheet_id']}: "
+            f"quality_score {entry['quality_change']:+.4f}"
+        )
+
+    for stage, strategy, datasheet_id in comparison["missing"]:
+        print(f"  missing     {stage}/{strategy} {datasheet_id}: not in current run")
+    for stage, strategy, datasheet_id in comparison["added"]:
+        print(f"  new         {stage}/{strategy} {datasheet_id}: not in baseline")
+
+    print(
+        f"\n  {len(comparison['entries'])} case(s) compared: "
+        f"{len(regressed)} regressed, {len(improved)} improved, "
+        f"{len(quality_changed)} quality change(s)"
+    )
+    print()
+    return bool(regressed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="PDF抽出パイプラインのスループット・レイテンシ・メモリを計測する"
+    )
+    parser.add_argument(
+        "output_dir",
+        nargs="?",
+        default=None,
+        help="docs/datasheet/output/ ディレクトリのパス（省略時は自動検出）",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="benchmark_results.json",
+        help="結果 JSON の出力パス。デフォルト: benchmark_results.json",
+    )
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help=f"計測するステージ（カンマ区切り）。デフォルト: {','.join(STAGES)}",
+    )
+    parser.add_argument(
+        "--text-strategies",
+        default="pymupdf,pdfminer",
+        help="テキスト抽出戦略（カンマ区切り）。デフォルト: pymupdf,pdfminer",
+    )
+    parser.add_argument(
+        "--table-strategies",
+        default="pdfplumber,pymupdf,textalign",
+        help="表抽出戦略（カンマ区切り）。デフォルト: pdfplumber,pymupdf,textalign",
+    )
+    parser.add_argument(
+        "--datasheets",
+        default=None,
+        help="計測するデータシートID（カンマ区切り）。省略時は全件",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1,
+        help="計測前のウォームアップ実行回数。デフォルト: 1",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="計測の繰り返し回数。デフォルト: 3",
+    )
+    parser.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="ケースごとのプロセス分離を行わない（速いがピーク RSS が累積する）",
+    )
+    parser.add_argument(
+        "--compare",
+        default=None,
+        metavar="BASELINE",
+        help="ベースライン JSON と比較し、回帰があれば終了コード 1 で終了する",
+    )
+    parser.add_argument(
+        "--current",
+        default=None,
+        help="計測せずに既存の結果 JSON をベースラインと比較する（--compare と併用）",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_THROUGHPUT_TOLERANCE,
+        help=f"スループット低下の許容幅（相対値）。デフォルト: {DEFAULT_THROUGHPUT_TOLERANCE}",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=DEFAULT_MEMORY_TOLERANCE,
+        help=f"ピーク RSS 増加の許容幅（相対値）。デフォルト: {DEFAULT_MEMORY_TOLERANCE}",
+    )
+    args = parser.parse_args()
+
+    if args.current and not args.compare:
+        parser.error("--current requires --compare")
+    if args.current:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        comparison = compare_benchmarks(baseline, current, args.tolerance, args.memory_tolerance)
+        sys.exit(1 if print_comparison(comparison) else 0)
+
+    if args.output_dir:
+        output_dir = args.output_dir
+    else:
+        script_dir = Path(__file__).parent
+        output_dir = str(script_dir.parent / "output")
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print(f"Unknown stage(s): {unknown}. Available: {STAGES}")
+        sys.exit(1)
+    text_strategies = [s.strip() for s in args.text_strategies.split(",") if s.strip()]
+    table_strategies = [s.strip() for s in args.table_strategies.split(",") if s.strip()]
+    repeat = max(args.repeat, 1)
+    warmup = max(args.warmup, 0)
+    isolate = not args.no_isolate
+
+    pdfs = find_pdfs(output_dir)
+    if args.datasheets:
+        wanted = {s.strip() for s in args.datasheets.split(",") if s.strip()}
+        pdfs = [(datasheet_id, path) for datasheet_id, path in pdfs if datasheet_id in wanted]
+    if not pdfs:
+        print(f"No PDFs found in {output_dir}")
+        sys.exit(1)
+
+    cases = build_cases(pdfs, stages, text_strategies, table_strategies)
+    print(f"Output directory: {output_dir}")
+    print(f"Benchmarking {len(cases)} case(s) over {len(pdfs)} PDF(s): warmup={warmup} repeat={repeat}")
+
+    results = run_benchmark(cases, warmup, repeat, isolate=isolate)
+    report = {
+        "meta": benchmark_metadata(output_dir, warmup, repeat, isolate),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print_summary(results)
+    print(f"Benchmark results written to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparison = compare_benchmarks(baseline, report, args.tolerance, args.memory_tolerance)
+        sys.exit(1 if print_comparison(comparison) else 0)
+
+
+if __name__ == "__main__":
+    main()
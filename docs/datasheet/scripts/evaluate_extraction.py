@@ -9,6 +9,12 @@ docs/datasheet/output/ 配下の全PDFに対して各抽出方式を試行し、
     python evaluate_extraction.py [output_dir]
     python evaluate_extraction.py docs/datasheet/output/
     python evaluate_extraction.py docs/datasheet/output/ --csv report.csv
+    python evaluate_extraction.py docs/datasheet/output/ --include-ocr --jobs 8
+    python evaluate_extraction.py docs/datasheet/output/ --resume
+    python evaluate_extraction.py docs/datasheet/output/ --profile cpu
+
+結果は (データシート, 戦略) ごとに完了した時点で SQLite (--db) に保存される。
+--resume を付けると、同じデータシート・同じPDF内容・同じコードバージョンで保存済みの組は再評価しない。
 
 引数を省略した場合は docs/datasheet/output/ を使用する。
 """
@@ -21,6 +27,7 @@ import os
 import sys
 import time
 from pathlib import Path
+from typing import Callable
 
 # 同ディレクトリのモジュールをインポート
 sys.path.insert(0, str(Path(__file__).parent))
@@ -28,6 +35,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 from pdf_extractors import ExtractionResult, run_strategy, STRATEGIES
 from pdf_quality import evaluate_quality, quality_details
 from pdf_normalize import normalize_text
+from profiling import PROFILE_MODES, profile_region, profile_session
+from results_store import ResultsStore, compute_code_version, file_sha256
 
 
 def find_pdfs(output_dir: str) -> list[tuple[str, str]]:
@@ -52,55 +61,135 @@ def find_pdfs(output_dir: str) -> list[tuple[str, str]]:
     return results
 
 
-def evaluate_single(
+def evaluate_strategy(
     datasheet_id: str,
     pdf_path: str,
-    strategies: list[str],
-) -> list[dict]:
+    strategy_name: str,
+) -> dict:
     """
-    1つのPDFに対して各方式を試行し、結果を返す。
+    1つのPDFに対して1方式を試行し、結果行を返す。
+    プロセスプールのワーカーからも呼ばれるため、例外は行の error に格納する。
     """
-    rows = []
-    for strategy_name in strategies:
-        row = {
-            "datasheet_id": datasheet_id,
-            "strategy": strategy_name,
-            "page_count": 0,
-            "total_chars": 0,
-            "quality_score": 0.0,
-            "control_char_ratio": 0.0,
-            "printable_ratio": 0.0,
-            "alnum_ratio": 0.0,
-            "replacement_chars": 0,
-            "elapsed_ms": 0,
-            "error": "",
-            "text_preview": "",
-        }
-        try:
+    row = {
+        "datasheet_id": datasheet_id,
+        "strategy": strategy_name,
+        "page_count": 0,
+        "total_chars": 0,
+        "quality_score": 0.0,
+        "control_char_ratio": 0.0,
+        "printable_ratio": 0.0,
+        "alnum_ratio": 0.0,
+        "replacement_chars": 0,
+        "elapsed_ms": 0,
+        "cpu_ms": 0,
+        "peak_rss_delta_mb": None,
+        "bytes_read": None,
+        "pages_processed": 0,
+        "pages_skipped": 0,
+        "quality_per_cpu_s": None,
+        "error": "",
+        "text_preview": "",
+    }
+    try:
+        with profile_region(f"strategy:{strategy_name}"):
             result = run_strategy(strategy_name, pdf_path)
+        with profile_region("quality"):
             result.quality_score = evaluate_quality(result.text, result.page_texts)
             details = quality_details(result.text, result.page_texts)
 
-            # 正規化後テキストでも品質チェック
+        # 正規化後テキストでも品質チェック
+        with profile_region("normalize"):
             normalized = normalize_text(result.text)
 
-            row["page_count"] = result.page_count
-            row["total_chars"] = details.get("total_chars", 0)
-            row["quality_score"] = result.quality_score
-            row["control_char_ratio"] = details.get("control_char_ratio", 0)
-            row["printable_ratio"] = details.get("printable_ratio", 0)
-            row["alnum_ratio"] = details.get("alnum_ratio", 0)
-            row["replacement_chars"] = details.get("replacement_char_count", 0)
-            row["elapsed_ms"] = result.elapsed_ms
-            # テキストプレビュー（先頭200文字、改行を空白に変換）
-            preview = normalized[:200].replace("\n", " ").replace("\r", "")
-            row["text_preview"] = preview
+        row["page_count"] = result.page_count
+        row["total_chars"] = details.get("total_chars", 0)
+        row["quality_score"] = result.quality_score
+        row["control_char_ratio"] = details.get("control_char_ratio", 0)
+        row["printable_ratio"] = details.get("printable_ratio", 0)
+        row["alnum_ratio"] = details.get("alnum_ratio", 0)
+        row["replacement_chars"] = details.get("replacement_char_count", 0)
+        row["elapsed_ms"] = result.elapsed_ms
+        row["cpu_ms"] = result.usage.cpu_ms
+        row["peak_rss_delta_mb"] = result.usage.peak_rss_delta_mb
+        row["bytes_read"] = result.usage.bytes_read
+        row["pages_processed"] = result.usage.pages_processed
+        row["pages_skipped"] = result.usage.pages_skipped
+        per_cpu = result.usage.quality_per_cpu_second(result.quality_score)
+        row["quality_per_cpu_s"] = round(per_cpu, 4) if per_cpu is not None else None
+        # テキストプレビュー（先頭200文字、改行を空白に変換）
+        preview = normalized[:200].replace("\n", " ").replace("\r", "")
+        row["text_preview"] = preview
+
+    except Exception as e:
+        row["error"] = str(e)[:200]
+
+    return row
+
+
+def evaluate_single(
+    datasheet_id: str,
+    pdf_path: str,
+    strategies: list[str],
+) -> list[dict]:
+    """
+    1つのPDFに対して各方式を試行し、結果を返す。
+    """
+    return [
+        evaluate_strategy(datasheet_id, pdf_path, strategy_name)
+        for strategy_name in strategies
+    ]
+
+
+def evaluate_parallel(
+    pdfs: list[tuple[str, str]],
+    strategies: list[str],
+    jobs: int,
+    skip: set[tuple[str, str]] | None = None,
+    on_result: Callable[[dict], None] | None = None,
+) -> list[dict]:
+    """
+    (データシート, 戦略) の組をプロセスプールで並列評価する。
+
+    大きいPDFから投入してプールの終盤の偏りを抑え、完了順に進捗を表示する。
+    返す行の順序は完了順によらず pdfs × strategies の順に揃える。
 
-        except Exception as e:
-            row["error"] = str(e)[:200]
+    Args:
+        skip: 評価を省略する (datasheet_id, strategy) の組
+        on_result: 1組の評価が完了するたびに結果行を渡して呼ぶコールバック
+    """
+    # プロセスプールは --jobs 指定時にしか使わないため、起動時には読み込まない
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    skip = skip or set()
+    tasks = [
+        (pdf_idx, strat_idx, datasheet_id, pdf_path, strategy_name)
+        for pdf_idx, (datasheet_id, pdf_path) in enumerate(pdfs)
+        for strat_idx, strategy_name in enumerate(strategies)
+        if (datasheet_id, strategy_name) not in skip
+    ]
+    # 大きいPDFから先にスケジュール（ファイルサイズで近似）
+    tasks.sort(key=lambda t: os.path.getsize(t[3]), reverse=True)
+
+    results: dict[tuple[int, int], dict] = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(evaluate_strategy, datasheet_id, pdf_path, strategy_name): (pdf_idx, strat_idx)
+            for pdf_idx, strat_idx, datasheet_id, pdf_path, strategy_name in tasks
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            row = future.result()
+            results[futures[future]] = row
+            if on_result:
+                on_result(row)
+            status = f"ERROR - {row['error'][:60]}" if row["error"] else (
+                f"score={row['quality_score']:.4f} elapsed={row['elapsed_ms']}ms"
+            )
+            print(
+                f"[{done}/{len(tasks)}] {row['datasheet_id']} / {row['strategy']}: {status}",
+                flush=True,
+            )
 
-        rows.append(row)
-    return rows
+    return [results[key] for key in sorted(results)]
 
 
 def print_report(all_rows: list[dict]) -> None:
@@ -131,7 +220,8 @@ def print_report(all_rows: list[dict]) -> None:
                 f"chars={row['total_chars']:>6d}  "
                 f"ctrl={row['control_char_ratio']:.4f}  "
                 f"alnum={row['alnum_ratio']:.4f}  "
-                f"elapsed={row['elapsed_ms']:>5d}ms"
+                f"elapsed={row['elapsed_ms']:>5d}ms  "
+                f"cpu={row.get('cpu_ms', 0):>5d}ms"
                 f"{marker}"
             )
 
@@ -172,6 +262,12 @@ def write_csv(all_rows: list[dict], csv_path: str) -> None:
         "alnum_ratio",
         "replacement_chars",
         "elapsed_ms",
+        "cpu_ms",
+        "peak_rss_delta_mb",
+        "bytes_read",
+        "pages_processed",
+        "pages_skipped",
+        "quality_per_cpu_s",
         "error",
         "text_preview",
     ]
@@ -209,6 +305,32 @@ def main():
         action="store_true",
         help="OCR戦略も含める（時間がかかる）",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="並列ワーカー数。2以上で (データシート, 戦略) 単位にプロセス並列で評価する。デフォルト: 1",
+    )
+    parser.add_argument(
+        "--db",
+        default=None,
+        help="結果を保存する SQLite ファイルのパス。デフォルト: <output_dir>/evaluation_results.sqlite",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="同じPDF内容・コードバージョンで保存済みの (データシート, 戦略) を再評価しない",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help=(
+            "プロファイルを取り、CSV の隣（未指定時は output_dir/evaluation）に "
+            "<path>.<mode>profile.* として保存する。指定時は --jobs を無視して直列で評価する"
+        ),
+    )
     args = parser.parse_args()
 
     # output_dir の自動検出
@@ -236,19 +358,65 @@ def main():
     print(f"Found {len(pdfs)} PDF(s)")
     print()
 
-    # 一括評価
-    all_rows: list[dict] = []
-    for i, (datasheet_id, pdf_path) in enumerate(pdfs):
-        print(f"[{i + 1}/{len(pdfs)}] Evaluating: {datasheet_id}...")
-        rows = evaluate_single(datasheet_id, pdf_path, strategies)
-        all_rows.extend(rows)
-
-    # レポート出力
-    print_report(all_rows)
-
-    # CSV出力
-    if args.csv:
-        write_csv(all_rows, args.csv)
+    # 結果ストア（PDF内容ハッシュ × データシートID × コードバージョン × 戦略 で保存）
+    db_path = args.db or os.path.join(output_dir, "evaluation_results.sqlite")
+    store = ResultsStore(db_path)
+    code_version = compute_code_version()
+    run_id = store.start_run(code_version, output_dir, strategies)
+    pdf_hashes = {datasheet_id: file_sha256(pdf_path) for datasheet_id, pdf_path in pdfs}
+    print(f"Results DB: {db_path} (code version {code_version}, run {run_id})")
+
+    skip: set[tuple[str, str]] = set()
+    if args.resume:
+        skip = {
+            (datasheet_id, strategy_name)
+            for datasheet_id, _ in pdfs
+            for strategy_name in strategies
+            if store.has_result(pdf_hashes[datasheet_id], datasheet_id, code_version, strategy_name)
+        }
+        print(f"Resuming: {len(skip)} of {len(pdfs) * len(strategies)} result(s) already stored")
+
+    def save(row: dict) -> None:
+        store.save_result(pdf_hashes[row["datasheet_id"]], code_version, run_id, row)
+
+    profile_base = args.csv or os.path.join(output_dir, "evaluation")
+    if args.profile and args.jobs > 1:
+        print("Profiling enabled: evaluating serially (--jobs ignored)")
+    with profile_session(args.profile, profile_base) as profiler:
+        # 一括評価
+        if args.jobs > 1 and not args.profile:
+            print(f"Evaluating with {args.jobs} workers...")
+            evaluate_parallel(pdfs, strategies, args.jobs, skip=skip, on_result=save)
+        else:
+            for i, (datasheet_id, pdf_path) in enumerate(pdfs):
+                pending = [s for s in strategies if (datasheet_id, s) not in skip]
+                if not pending:
+                    print(f"[{i + 1}/{len(pdfs)}] Skipping (stored): {datasheet_id}")
+                    continue
+                print(f"[{i + 1}/{len(pdfs)}] Evaluating: {datasheet_id}...")
+                for strategy_name in pending:
+                    save(evaluate_strategy(datasheet_id, pdf_path, strategy_name))
+
+        # レポートはストアから pdfs × strategies の順で組み立てる
+        all_rows = [
+            row
+            for datasheet_id, _ in pdfs
+            for strategy_name in strategies
+            if (row := store.load_row(pdf_hashes[datasheet_id], datasheet_id, code_version, strategy_name))
+        ]
+        store.close()
+
+        # レポート出力
+        print_report(all_rows)
+
+        # CSV出力
+        if args.csv:
+            with profile_region("serialize"):
+                write_csv(all_rows, args.csv)
+
+    if profiler is not None:
+        for path in profiler.written:
+            print(f"Profile written to: {path}")
 
 
 if __name__ == "__main__":
@@ -10,6 +10,14 @@ PDFデータシートからテキストを抽出するスクリプト
     python extract_pdf_text.py <input_pdf> [output_txt] --strategies pymupdf,pdfminer,ocr
     python extract_pdf_text.py <input_pdf> [output_txt] --log-file extraction.log
     python extract_pdf_text.py <input_pdf> [output_txt] --quality-threshold 0.8
+    python extract_pdf_text.py <input_pdf> [output_txt] --ocr-cache ../output/.ocr-cache
+    python extract_pdf_text.py <input_pdf> [output_txt] --profile cpu
+    python extract_pdf_text.py <input_pdf> [output_txt] --no-strategy-stats
+
+--strategies を省略すると、ローカルの戦略統計 (strategy_stats.py) から試行順を決める。
+品質閾値に達した最初の戦略で止まるため、統計の内容によって採用される戦略
+（出力）が変わりうる。試行予定の順序はメタ情報の strategy_plan に、
+早期終了までに実際に試した戦略は strategies_tried に記録される。
 
 例:
     python extract_pdf_text.py ../raw/GRM185R60J105KE26-01.pdf
@@ -23,6 +31,7 @@ import logging
 import os
 import sys
 import time
+from dataclasses import asdict
 from pathlib import Path
 
 # 同ディレクトリのモジュールをインポート可能にする
@@ -31,6 +40,14 @@ sys.path.insert(0, str(Path(__file__).parent))
 from pdf_extractors import ExtractionResult, run_strategy, STRATEGIES
 from pdf_quality import evaluate_quality, quality_details
 from pdf_normalize import normalize_text
+from profiling import PROFILE_MODES, profile_base_path, profile_region, profile_session
+from strategy_stats import (
+    PdfProfile,
+    StrategyStats,
+    default_stats_path,
+    open_stats,
+    plan_strategies,
+)
 
 # ロガー設定
 logger = logging.getLogger("extract_pdf_text")
@@ -63,40 +80,69 @@ def extract_with_fallback(
     pdf_path: str,
     strategies: list[str] | None = None,
     quality_threshold: float = 0.8,
+    strategy_options: dict[str, dict] | None = None,
+    stats: StrategyStats | None = None,
+    profile: PdfProfile | None = None,
+    tried: list[str] | None = None,
 ) -> ExtractionResult:
     """
     複数の抽出方式をフォールバックで試行し、最良の結果を返す。
 
     Args:
         pdf_path: PDFファイルパス
-        strategies: 試行する戦略名リスト（デフォルト: ["pymupdf", "pdfminer", "ocr"]）
+        strategies: 試行する戦略名リスト。省略時は pymupdf, pdfminer, ocr を
+                    stats の実績から期待所要時間が最小になる順に並べて試す
+                    （stats も無ければこの順のまま）。指定時は順序を変えない
         quality_threshold: この品質スコア以上で早期終了する閾値
+        strategy_options: 戦略名 → 戦略関数に渡す追加引数
+        stats: 戦略統計ストア。指定時は試した戦略ごとの品質・所要時間を記録する
+        profile: stats.profile(pdf_path) の計算済みの結果（省略時は stats から求める）
+        tried: 指定時は実際に試行した戦略名を試行順に追記する（失敗した戦略を含み、
+               早期終了で試さなかった戦略は含まない）
 
     Returns:
         最も品質スコアが高い ExtractionResult
     """
-    if strategies is None:
-        strategies = ["pymupdf", "pdfminer", "ocr"]
+    if profile is None and stats is not None:
+        profile = stats.profile(pdf_path)
+    strategies, order = plan_strategies("text", strategies, stats, profile, quality_threshold)
+    if order == "cost_model":
+        logger.info(
+            f"Strategy order (cost model, manufacturer={profile.manufacturer}, "
+            f"producer={profile.producer}): {strategies}"
+        )
 
     results: list[ExtractionResult] = []
 
     for strategy_name in strategies:
+        if tried is not None:
+            tried.append(strategy_name)
         logger.info(f"Trying strategy: {strategy_name}")
+        strategy_start = time.time()
         try:
-            result = run_strategy(strategy_name, pdf_path)
+            options = (strategy_options or {}).get(strategy_name, {})
+            with profile_region(f"strategy:{strategy_name}"):
+                result = run_strategy(strategy_name, pdf_path, **options)
 
             # 品質スコアリング
-            result.quality_score = evaluate_quality(result.text, result.page_texts)
-            details = quality_details(result.text, result.page_texts)
+            with profile_region("quality"), result.spans.span("quality"):
+                result.quality_score = evaluate_quality(result.text, result.page_texts)
+                details = quality_details(result.text, result.page_texts)
 
             results.append(result)
+            if stats is not None:
+                stats.record(
+                    "text", strategy_name, profile, result.page_count,
+                    result.elapsed_ms, result.quality_score,
+                )
 
             logger.info(
                 f"  [{strategy_name}] score={result.quality_score:.4f}, "
                 f"pages={result.page_count}, "
                 f"chars={details.get('total_chars', 0)}, "
                 f"ctrl_ratio={details.get('control_char_ratio', 0):.4f}, "
-                f"elapsed={result.elapsed_ms}ms"
+                f"elapsed={result.elapsed_ms}ms, "
+                f"{result.usage.format()}"
             )
 
             if result.warnings:
@@ -120,6 +166,9 @@ def extract_with_fallback(
             logger.warning(f"  [{strategy_name}] skipped: {e}")
         except Exception as e:
             logger.error(f"  [{strategy_name}] failed: {e}", exc_info=True)
+            if stats is not None:
+                elapsed_ms = int((time.time() - strategy_start) * 1000)
+                stats.record("text", strategy_name, profile, profile.page_count, elapsed_ms, None)
 
     if not results:
         logger.error("All extraction strategies failed.")
@@ -143,7 +192,8 @@ def extract_with_fallback(
             marker = " <<<" if r.method == best.method else ""
             logger.info(
                 f"  {r.method}: score={r.quality_score:.4f}, "
-                f"elapsed={r.elapsed_ms}ms{marker}"
+                f"elapsed={r.elapsed_ms}ms, "
+                f"{r.usage.format(r.quality_score)}{marker}"
             )
 
     logger.info(f"Selected strategy: {best.method} (score={best.quality_score:.4f})")
@@ -195,8 +245,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("output_path", nargs="?", default=None, help="出力テキストファイルのパス（省略時は標準出力）")
     parser.add_argument(
         "--strategies",
-        default="pymupdf,pdfminer,ocr",
-        help="試行する戦略（カンマ区切り）。デフォルト: pymupdf,pdfminer,ocr",
+        default=None,
+        help=(
+            "試行する戦略（カンマ区切り、この順で試す）。省略時は pymupdf,pdfminer,ocr を "
+            "戦略統計から期待所要時間が最小になる順に並べる"
+        ),
     )
     parser.add_argument(
         "--quality-threshold",
@@ -219,6 +272,27 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="メタ情報をJSON形式で出力するファイルパス",
     )
+    parser.add_argument(
+        "--ocr-cache",
+        default=None,
+        help="OCR結果のキャッシュディレクトリ（extract_tables.py と共有し、再OCRを避ける）",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="プロファイルを取り、出力ファイルの隣に <output>.<mode>profile.* として保存する",
+    )
+    parser.add_argument(
+        "--strategy-stats",
+        default=None,
+        help=f"戦略統計の SQLite ファイル。デフォルト: {default_stats_path()}",
+    )
+    parser.add_argument(
+        "--no-strategy-stats",
+        action="store_true",
+        help="戦略統計を記録・参照しない（省略時の試行順を pymupdf,pdfminer,ocr に固定し、出力を再現可能にする）",
+    )
     return parser.parse_args()
 
 
@@ -233,68 +307,104 @@ def main() -> None:
         logger.error(f"PDF file not found: {args.pdf_path}")
         sys.exit(1)
 
-    # 戦略リスト
-    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
-    for s in strategies:
-        if s not in STRATEGIES:
-            logger.error(
-                f"Unknown strategy: {s}. Available: {list(STRATEGIES.keys())}"
-            )
-            sys.exit(1)
+    # 戦略リスト（省略時は戦略統計から試行順を決める）
+    strategies = None
+    if args.strategies:
+        strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+        for s in strategies:
+            if s not in STRATEGIES:
+                logger.error(
+                    f"Unknown strategy: {s}. Available: {list(STRATEGIES.keys())}"
+                )
+                sys.exit(1)
+    stats = None if args.no_strategy_stats else open_stats(args.strategy_stats)
+    profile = stats.profile(args.pdf_path) if stats is not None else None
+    strategies, strategy_order = plan_strategies(
+        "text", strategies, stats, profile, args.quality_threshold
+    )
 
     logger.info(f"Input: {args.pdf_path}")
-    logger.info(f"Strategies: {strategies}")
+    if strategy_order == "cost_model":
+        logger.info(
+            f"Strategies: {strategies} (cost model order, manufacturer={profile.manufacturer}, "
+            f"producer={profile.producer})"
+        )
+    else:
+        logger.info(f"Strategies: {strategies} ({strategy_order} order)")
     logger.info(f"Quality threshold: {args.quality_threshold}")
 
-    total_start = time.time()
-
-    # フォールバック抽出
-    result = extract_with_fallback(
-        args.pdf_path,
-        strategies=strategies,
-        quality_threshold=args.quality_threshold,
-    )
-
-    # テキスト正規化
-    if result.text:
-        result.text = normalize_text(result.text)
-        # ページ別テキストも正規化
-        result.page_texts = [normalize_text(pt) for pt in result.page_texts]
-
-    total_elapsed = int((time.time() - total_start) * 1000)
-
-    # 出力テキスト整形
-    output_text = format_output(result, args.pdf_path)
-
-    # ファイル出力 or 標準出力
-    if args.output_path:
-        with open(args.output_path, "w", encoding="utf-8") as f:
-            f.write(output_text)
-        logger.info(f"Text extracted to: {args.output_path}")
-    else:
-        print(output_text)
-
-    # メタ情報JSON出力
-    if args.json_meta:
-        meta = {
-            "pdf_path": args.pdf_path,
-            "method": result.method,
-            "page_count": result.page_count,
-            "quality_score": result.quality_score,
-            "quality_details": quality_details(result.text, result.page_texts),
-            "warnings": result.warnings,
-            "elapsed_ms": result.elapsed_ms,
-            "total_elapsed_ms": total_elapsed,
-            "strategies_tried": strategies,
-        }
-        with open(args.json_meta, "w", encoding="utf-8") as f:
-            json.dump(meta, f, ensure_ascii=False, indent=2)
-        logger.info(f"Metadata written to: {args.json_meta}")
+    profile_base = profile_base_path(args.output_path, args.pdf_path)
+    strategies_tried: list[str] = []
+    with profile_session(args.profile, profile_base) as profiler:
+        total_start = time.time()
+
+        # フォールバック抽出
+        result = extract_with_fallback(
+            args.pdf_path,
+            strategies=strategies,
+            quality_threshold=args.quality_threshold,
+            strategy_options={"ocr": {"ocr_cache_dir": args.ocr_cache}},
+            stats=stats,
+            profile=profile,
+            tried=strategies_tried,
+        )
+        if stats is not None:
+            stats.close()
+
+        # テキスト正規化
+        if result.text:
+            with profile_region("normalize"), result.spans.span("normalize"):
+                result.text = normalize_text(result.text)
+                # ページ別テキストも正規化
+                result.page_texts = [normalize_text(pt) for pt in result.page_texts]
+
+        total_elapsed = int((time.time() - total_start) * 1000)
+
+        with profile_region("serialize"):
+            # 出力テキスト整形
+            output_text = format_output(result, args.pdf_path)
+
+            # ファイル出力 or 標準出力
+            if args.output_path:
+                with open(args.output_path, "w", encoding="utf-8") as f:
+                    f.write(output_text)
+                logger.info(f"Text extracted to: {args.output_path}")
+            else:
+                print(output_text)
+
+        # メタ情報JSON出力
+        if args.json_meta:
+            with profile_region("quality"):
+                final_details = quality_details(result.text, result.page_texts)
+            meta = {
+                "pdf_path": args.pdf_path,
+                "method": result.method,
+                "page_count": result.page_count,
+                "quality_score": result.quality_score,
+                "quality_details": final_details,
+                "warnings": result.warnings,
+                "elapsed_ms": result.elapsed_ms,
+                "total_elapsed_ms": total_elapsed,
+                "usage": asdict(result.usage),
+                "strategy_plan": strategies,
+                "strategy_order": strategy_order,
+                "strategies_tried": strategies_tried,
+                "timing": result.spans.to_dict(),
+            }
+            with profile_region("serialize"), open(args.json_meta, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+            logger.info(f"Metadata written to: {args.json_meta}")
+
+    if profiler is not None:
+        for path in profiler.written:
+            logger.info(f"Profile written to: {path}")
 
     logger.info(
         f"Done. method={result.method}, score={result.quality_score:.4f}, "
         f"total_elapsed={total_elapsed}ms"
     )
+    if result.spans.spans:
+        logger.info(f"Slowest pages: {result.spans.format_slowest_pages()}")
 
     # 品質が低い場合は警告
     if result.quality_score < 0.5:
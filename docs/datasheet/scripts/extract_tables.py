@@ -10,6 +10,18 @@ PDFデータシートから表構造を抽出するスクリプト
     python extract_tables.py <input_pdf> [output_tables.json] --strategies pdfplumber,pymupdf
     python extract_tables.py <input_pdf> [output_tables.json] --quality-threshold 0.6
     python extract_tables.py <input_pdf> [output_tables.json] --log-file tables.log
+    python extract_tables.py <input_pdf> [output_tables.json] --memory-budget-mb 1024
+    python extract_tables.py <input_pdf> [output_tables.json] --columnar
+    python extract_tables.py <input_pdf> [output_tables.jsonl] --format jsonl
+    python extract_tables.py <input_pdf> [output_tables.json] --strategies ocr --ocr-cache ../output/.ocr-cache
+    python extract_tables.py <input_pdf> [output_tables.json] --profile mem
+    python extract_tables.py <input_pdf> [output_tables.json] --json-meta tables_meta.json
+    python extract_tables.py <input_pdf> [output_tables.json] --no-strategy-stats
+
+--strategies を省略すると、ローカルの戦略統計 (strategy_stats.py) から試行順を決める。
+品質閾値に達した最初の戦略で止まるため、統計の内容によって採用される戦略
+（出力）が変わりうる。試行予定の順序はメタ情報の strategy_plan に、
+早期終了までに実際に試した戦略は strategies_tried に記録される。
 
 例:
     python extract_tables.py ../output/ST_1N5822/ST_1N5822.pdf
@@ -23,13 +35,10 @@ import logging
 import os
 import sys
 import time
+from collections.abc import Callable
+from dataclasses import asdict
 from pathlib import Path
-
-# Windows での stdout エンコーディングを UTF-8 に強制
-if sys.stdout.encoding != "utf-8":
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
-if sys.stderr.encoding != "utf-8":
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+from typing import TextIO
 
 # 同ディレクトリのモジュールをインポート可能にする
 sys.path.insert(0, str(Path(__file__).parent))
@@ -40,7 +49,15 @@ from pdf_table_extractor import (
     run_table_strategy,
     TABLE_STRATEGIES,
 )
-from table_quality import evaluate_table_quality, table_quality_details
+from profiling import PROFILE_MODES, profile_base_path, profile_region, profile_session
+from strategy_stats import (
+    PdfProfile,
+    StrategyStats,
+    default_stats_path,
+    open_stats,
+    plan_strategies,
+)
+from table_quality import evaluate_table_quality, score_table_quality
 
 # ロガー設定
 logger = logging.getLogger("extract_tables")
@@ -73,33 +90,98 @@ def extract_with_fallback(
     pdf_path: str,
     strategies: list[str] | None = None,
     quality_threshold: float = 0.6,
+    strategy_options: dict[str, dict] | None = None,
+    on_page: Callable[[str, int, list[ExtractedTable]], None] | None = None,
+    on_strategy_done: Callable[[str, bool], None] | None = None,
+    stats: StrategyStats | None = None,
+    profile: PdfProfile | None = None,
+    tried: list[str] | None = None,
 ) -> TableExtractionResult:
     """
     複数の表抽出方式をフォールバックで試行し、最良の結果を返す。
 
     Args:
         pdf_path: PDFファイルパス
-        strategies: 試行する戦略名リスト（デフォルト: ["pdfplumber", "pymupdf"]）
+        strategies: 試行する戦略名リスト。省略時は pdfplumber, pymupdf を
+                    stats の実績から期待所要時間が最小になる順に並べて試す
+                    （stats も無ければこの順のまま）。指定時は順序を変えない
         quality_threshold: この品質スコア以上で早期終了する閾値
+        strategy_options: 戦略名 → 戦略関数に渡す追加引数
+        on_page: ページ処理完了ごとに (戦略名, ページ番号, 品質スコア付きテーブル)
+                 で呼ばれるコールバック（逐次出力用）
+        on_strategy_done: 各戦略の採否が確定した時点で (戦略名, 採用されたか) で
+                 呼ばれるコールバック。閾値を満たした戦略はその場で、閾値未達で
+                 フォールバックした戦略は後続の戦略が閾値を満たすか全戦略の
+                 比較が終わった時点で通知される
+        stats: 戦略統計ストア。指定時は試した戦略ごとの平均品質・所要時間を記録する
+        profile: stats.profile(pdf_path) の計算済みの結果（省略時は stats から求める）
+        tried: 指定時は実際に試行した戦略名を試行順に追記する（失敗した戦略を含み、
+               早期終了で試さなかった戦略は含まない）
 
     Returns:
         最も品質スコアが高い TableExtractionResult
     """
-    if strategies is None:
-        strategies = ["pdfplumber", "pymupdf"]
+    if profile is None and stats is not None:
+        profile = stats.profile(pdf_path)
+    strategies, order = plan_strategies("tables", strategies, stats, profile, quality_threshold)
+    if order == "cost_model":
+        logger.info(
+            f"Strategy order (cost model, manufacturer={profile.manufacturer}, "
+            f"producer={profile.producer}): {strategies}"
+        )
 
     results: list[TableExtractionResult] = []
+    # 閾値未達でフォールバックし、採否がまだ確定していない戦略
+    pending: list[tuple[str, TableExtractionResult]] = []
+
+    def settle(accepted: TableExtractionResult | None) -> None:
+        """採否が未確定の戦略について、accepted を採用として通知する。"""
+        if on_strategy_done is not None:
+            for name, r in pending:
+                on_strategy_done(name, r is accepted)
+        pending.clear()
 
     for strategy_name in strategies:
+        if tried is not None:
+            tried.append(strategy_name)
         logger.info(f"Trying table strategy: {strategy_name}")
+        strategy_start = time.time()
         try:
-            result = run_table_strategy(strategy_name, pdf_path)
-
-            # 各テーブルの品質スコアリング
-            for table in result.tables:
-                table.quality_score = evaluate_table_quality(table)
+            # ページごとの品質スコアリング時間 (page, start, end)。結果の spans に後で追記する
+            quality_times: list[tuple[int, float, float]] = []
+
+            # 各テーブルの品質スコアリングはページ完了ごとに行う
+            def score_page(
+                page: int,
+                page_tables: list[ExtractedTable],
+                strategy_name: str = strategy_name,
+                quality_times: list[tuple[int, float, float]] = quality_times,
+            ) -> None:
+                quality_start = time.perf_counter()
+                with profile_region("quality"):
+                    for table in page_tables:
+                        table.quality_score = evaluate_table_quality(table)
+                quality_times.append((page, quality_start, time.perf_counter()))
+                if on_page is not None:
+                    on_page(strategy_name, page, page_tables)
+
+            options = (strategy_options or {}).get(strategy_name, {})
+            with profile_region(f"strategy:{strategy_name}"):
+                result = run_table_strategy(
+                    strategy_name, pdf_path, on_page=score_page, **options
+                )
+            for page, quality_start, quality_end in quality_times:
+                result.spans.add("quality", quality_start, page, end=quality_end)
 
             results.append(result)
+            pending.append((strategy_name, result))
+            if stats is not None:
+                # 早期終了と同じく平均品質で成功を判定する（テーブル無しは 0）
+                scores = [t.quality_score for t in result.tables]
+                stats.record(
+                    "tables", strategy_name, profile, result.page_count, result.elapsed_ms,
+                    sum(scores) / len(scores) if scores else 0.0,
+                )
 
             # 結果サマリーをログ出力
             if result.tables:
@@ -112,7 +194,8 @@ def extract_with_fallback(
                     f"  [{strategy_name}] tables={len(result.tables)}, "
                     f"avg_score={avg_score:.4f}, min_score={min_score:.4f}, "
                     f"above_threshold={above_threshold}/{len(result.tables)}, "
-                    f"elapsed={result.elapsed_ms}ms"
+                    f"elapsed={result.elapsed_ms}ms, "
+                    f"{result.usage.format()}"
                 )
 
                 # 各テーブルの詳細
@@ -133,11 +216,13 @@ def extract_with_fallback(
                         f"  Quality threshold met (avg={avg_score:.4f} >= {quality_threshold}). "
                         f"Using {strategy_name}."
                     )
+                    settle(result)
                     break
             else:
                 logger.info(
                     f"  [{strategy_name}] No tables found. "
-                    f"elapsed={result.elapsed_ms}ms"
+                    f"elapsed={result.elapsed_ms}ms, "
+                    f"{result.usage.format()}"
                 )
 
             if result.warnings:
@@ -150,8 +235,15 @@ def extract_with_fallback(
 
         except RuntimeError as e:
             logger.warning(f"  [{strategy_name}] skipped: {e}")
+            if on_strategy_done is not None:
+                on_strategy_done(strategy_name, False)
         except Exception as e:
             logger.error(f"  [{strategy_name}] failed: {e}", exc_info=True)
+            if on_strategy_done is not None:
+                on_strategy_done(strategy_name, False)
+            if stats is not None:
+                elapsed_ms = int((time.time() - strategy_start) * 1000)
+                stats.record("tables", strategy_name, profile, profile.page_count, elapsed_ms, None)
 
     if not results:
         logger.error("All table extraction strategies failed.")
@@ -168,6 +260,7 @@ def extract_with_fallback(
 
     if not results_with_tables:
         logger.warning("No tables found by any strategy.")
+        settle(results[0])
         return results[0]  # テーブルが見つからなかった結果を返す
 
     # 平均品質スコアで比較
@@ -177,6 +270,7 @@ def extract_with_fallback(
         return sum(t.quality_score for t in r.tables) / len(r.tables)
 
     best = max(results_with_tables, key=avg_quality)
+    settle(best)
 
     # 複数方式を試した場合はログに比較を出力
     if len(results_with_tables) > 1:
@@ -186,7 +280,8 @@ def extract_with_fallback(
             logger.info(
                 f"  {r.method}: tables={len(r.tables)}, "
                 f"avg_score={avg_quality(r):.4f}, "
-                f"elapsed={r.elapsed_ms}ms{marker}"
+                f"elapsed={r.elapsed_ms}ms, "
+                f"{r.usage.format(avg_quality(r))}{marker}"
             )
 
     logger.info(
@@ -197,21 +292,23 @@ def extract_with_fallback(
     return best
 
 
-def format_output(
+def format_table(table: ExtractedTable, columnar: bool = False) -> dict:
+    """1テーブルを出力用の辞書に整形する（品質詳細付き）。"""
+    table_dict = table.to_dict(columnar=columnar)
+    # スコアと内訳は同じマトリクスから求める（構築は1回）
+    table_dict["quality_score"], table_dict["quality_details"] = score_table_quality(table)
+    return table_dict
+
+
+def format_summary(
     result: TableExtractionResult,
     pdf_path: str,
     quality_threshold: float,
+    columnar: bool = False,
 ) -> dict:
     """
-    抽出結果をJSON出力用の辞書に整形する。
+    抽出結果のうちテーブル本体以外（メタ情報・品質サマリー）を整形する。
     """
-    tables_data = []
-    for table in result.tables:
-        table_dict = table.to_dict()
-        # 品質詳細も付与
-        table_dict["quality_details"] = table_quality_details(table)
-        tables_data.append(table_dict)
-
     # 品質サマリー
     scores = [t.quality_score for t in result.tables] if result.tables else []
     column_issues = []
@@ -237,17 +334,82 @@ def format_output(
 
     return {
         "pdf_path": os.path.basename(pdf_path),
+        "layout": "columnar" if columnar else "rows",
         "method": result.method,
         "page_count": result.page_count,
         "total_tables": len(result.tables),
         "elapsed_ms": result.elapsed_ms,
         "quality_threshold": quality_threshold,
         "quality_summary": quality_summary,
-        "tables": tables_data,
         "warnings": result.warnings,
     }
 
 
+def format_output(
+    result: TableExtractionResult,
+    pdf_path: str,
+    quality_threshold: float,
+    columnar: bool = False,
+) -> dict:
+    """
+    抽出結果をJSON出力用の辞書に整形する。
+
+    columnar=True の場合、各テーブルは rows/raw_rows の代わりに
+    列配列 (columns) のみで出力する。
+    """
+    output = format_summary(result, pdf_path, quality_threshold, columnar=columnar)
+    tables_data = [format_table(table, columnar=columnar) for table in result.tables]
+    # 従来のキー順 (quality_summary → tables → warnings) を保つ
+    warnings = output.pop("warnings")
+    output["tables"] = tables_data
+    output["warnings"] = warnings
+    return output
+
+
+class JsonlTableWriter:
+    """
+    テーブル抽出結果を JSON Lines で逐次書き出す。
+
+    各ページの処理完了ごとに {"type": "table", "strategy": ..., ...} を1行ずつ書き、
+    最後に {"type": "summary", ...} を1行書く。複数戦略を試行した場合は
+    全戦略のテーブルが流れるため、各戦略の採否が確定した時点で
+    {"type": "strategy_done", "strategy": ..., "accepted": ...} を書く。
+    accepted が false の戦略のテーブルは読み手側で破棄してよい。
+    """
+
+    def __init__(self, stream: TextIO, columnar: bool = False):
+        self.stream = stream
+        self.columnar = columnar
+        self.table_counts: dict[str, int] = {}
+
+    def write_page(self, strategy: str, page: int, tables: list[ExtractedTable]) -> None:
+        """1ページ分のテーブルを書き出してフラッシュする。"""
+        for table in tables:
+            record = {"type": "table", "strategy": strategy}
+            record.update(format_table(table, columnar=self.columnar))
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.table_counts[strategy] = self.table_counts.get(strategy, 0) + 1
+        if tables:
+            self.stream.flush()
+
+    def write_strategy_done(self, strategy: str, accepted: bool) -> None:
+        """戦略の採否レコードを書き出してフラッシュする。"""
+        record = {
+            "type": "strategy_done",
+            "strategy": strategy,
+            "accepted": accepted,
+            "tables": self.table_counts.get(strategy, 0),
+        }
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def write_summary(self, summary: dict) -> None:
+        """末尾のサマリーレコードを書き出す。"""
+        record = {"type": "summary", **summary, "streamed_tables": self.table_counts}
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
 def parse_args() -> argparse.Namespace:
     """コマンドライン引数をパースする。"""
     parser = argparse.ArgumentParser(
@@ -262,8 +424,12 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--strategies",
-        default="pdfplumber,pymupdf",
-        help="試行する戦略（カンマ区切り）。デフォルト: pdfplumber,pymupdf",
+        default=None,
+        help=(
+            "試行する戦略（カンマ区切り、この順で試す）。省略時は pdfplumber,pymupdf を "
+            "戦略統計から期待所要時間が最小になる順に並べる "
+            f"(利用可能: {','.join(TABLE_STRATEGIES)})"
+        ),
     )
     parser.add_argument(
         "--quality-threshold",
@@ -271,21 +437,82 @@ def parse_args() -> argparse.Namespace:
         default=0.6,
         help="品質スコア閾値（これ以上で早期終了）。デフォルト: 0.6",
     )
+    parser.add_argument(
+        "--format",
+        choices=["json", "jsonl"],
+        default="json",
+        help="出力形式。jsonl はページ完了ごとにテーブルを1行ずつ書き出し、末尾にサマリーを書く",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="テーブルを列形式 (headers + columns) のみで出力する（rows/raw_rows を省略）",
+    )
+    parser.add_argument(
+        "--page-window",
+        type=int,
+        default=None,
+        help="pdfplumber を開き直すページ間隔（0 で開き直さない）。デフォルト: 50",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=float,
+        default=None,
+        help="pdfplumber 処理中の RSS 上限 (MB)。超過時は文書を開き直してキャッシュを解放する",
+    )
+    parser.add_argument(
+        "--ocr-cache",
+        default=None,
+        help="OCR結果のキャッシュディレクトリ（extract_pdf_text.py と共有し、再OCRを避ける）",
+    )
     parser.add_argument(
         "--log-file",
         default=None,
         help="ログファイルパス（指定時はファイルにも出力）",
     )
+    parser.add_argument(
+        "--json-meta",
+        default=None,
+        help="メタ情報（ページ・段階別の所要時間を含む）をJSON形式で出力するファイルパス",
+    )
     parser.add_argument(
         "--verbose",
         "-v",
         action="store_true",
         help="詳細ログを出力する",
     )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="プロファイルを取り、出力ファイルの隣に <output>.<mode>profile.* として保存する",
+    )
+    parser.add_argument(
+        "--strategy-stats",
+        default=None,
+        help=f"戦略統計の SQLite ファイル。デフォルト: {default_stats_path()}",
+    )
+    parser.add_argument(
+        "--no-strategy-stats",
+        action="store_true",
+        help="戦略統計を記録・参照しない（省略時の試行順を pdfplumber,pymupdf に固定し、出力を再現可能にする）",
+    )
     return parser.parse_args()
 
 
+def _ensure_utf8_stdio() -> None:
+    """
+    Windows での stdout/stderr エンコーディングを UTF-8 に強制する。
+    インポート時ではなく main() で、ストリームを差し替えずに再設定する
+    （他のモジュールから読み込んだときや、出力を横取りしているときに影響しないように）。
+    """
+    for stream in (sys.stdout, sys.stderr):
+        if isinstance(stream, io.TextIOWrapper) and (stream.encoding or "").lower() != "utf-8":
+            stream.reconfigure(encoding="utf-8", errors="replace")
+
+
 def main() -> None:
+    _ensure_utf8_stdio()
     args = parse_args()
 
     # ログ設定
@@ -296,50 +523,152 @@ def main() -> None:
         logger.error(f"PDF file not found: {args.pdf_path}")
         sys.exit(1)
 
-    # 戦略リスト
-    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
-    for s in strategies:
-        if s not in TABLE_STRATEGIES:
-            logger.error(
-                f"Unknown table strategy: {s}. "
-                f"Available: {list(TABLE_STRATEGIES.keys())}"
-            )
-            sys.exit(1)
+    # 戦略リスト（省略時は戦略統計から試行順を決める）
+    strategies = None
+    if args.strategies:
+        strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+        for s in strategies:
+            if s not in TABLE_STRATEGIES:
+                logger.error(
+                    f"Unknown table strategy: {s}. "
+                    f"Available: {list(TABLE_STRATEGIES.keys())}"
+                )
+                sys.exit(1)
+    stats = None if args.no_strategy_stats else open_stats(args.strategy_stats)
+    profile = stats.profile(args.pdf_path) if stats is not None else None
+    strategies, strategy_order = plan_strategies(
+        "tables", strategies, stats, profile, args.quality_threshold
+    )
 
     logger.info(f"Input: {args.pdf_path}")
-    logger.info(f"Strategies: {strategies}")
+    if strategy_order == "cost_model":
+        logger.info(
+            f"Strategies: {strategies} (cost model order, manufacturer={profile.manufacturer}, "
+            f"producer={profile.producer})"
+        )
+    else:
+        logger.info(f"Strategies: {strategies} ({strategy_order} order)")
     logger.info(f"Quality threshold: {args.quality_threshold}")
 
-    total_start = time.time()
+    # pdfplumber のメモリ制御オプション
+    pdfplumber_options: dict = {}
+    if args.page_window is not None:
+        pdfplumber_options["page_window"] = args.page_window
+    if args.memory_budget_mb is not None:
+        pdfplumber_options["memory_budget_mb"] = args.memory_budget_mb
 
-    # フォールバック抽出
-    result = extract_with_fallback(
-        args.pdf_path,
-        strategies=strategies,
-        quality_threshold=args.quality_threshold,
-    )
-
-    total_elapsed = int((time.time() - total_start) * 1000)
+    strategy_options = {
+        "pdfplumber": pdfplumber_options,
+        "ocr": {"ocr_cache_dir": args.ocr_cache},
+    }
 
-    # JSON出力整形
-    output_data = format_output(result, args.pdf_path, args.quality_threshold)
-    output_data["total_elapsed_ms"] = total_elapsed
+    profile_base = profile_base_path(args.output_path, args.pdf_path)
+    strategies_tried: list[str] = []
+    with profile_session(args.profile, profile_base) as profiler:
+        total_start = time.time()
+
+        if args.format == "jsonl":
+            # JSON Lines: ページ完了ごとに逐次書き出す
+            stream = (
+                open(args.output_path, "w", encoding="utf-8")
+                if args.output_path
+                else sys.stdout
+            )
+            try:
+                writer = JsonlTableWriter(stream, columnar=args.columnar)
+
+                def write_page(strategy: str, page: int, tables: list[ExtractedTable]) -> None:
+                    with profile_region("serialize"):
+                        writer.write_page(strategy, page, tables)
+
+                result = extract_with_fallback(
+                    args.pdf_path,
+                    strategies=strategies,
+                    quality_threshold=args.quality_threshold,
+                    strategy_options=strategy_options,
+                    on_page=write_page,
+                    on_strategy_done=writer.write_strategy_done,
+                    stats=stats,
+                    profile=profile,
+                    tried=strategies_tried,
+                )
+                total_elapsed = int((time.time() - total_start) * 1000)
+                summary = format_summary(
+                    result, args.pdf_path, args.quality_threshold, columnar=args.columnar
+                )
+                summary["total_elapsed_ms"] = total_elapsed
+                with profile_region("serialize"):
+                    writer.write_summary(summary)
+            finally:
+                if stream is not sys.stdout:
+                    stream.close()
+            if args.output_path:
+                logger.info(f"Tables streamed to: {args.output_path}")
+        else:
+            # フォールバック抽出
+            result = extract_with_fallback(
+                args.pdf_path,
+                strategies=strategies,
+                quality_threshold=args.quality_threshold,
+                strategy_options=strategy_options,
+                stats=stats,
+                profile=profile,
+                tried=strategies_tried,
+            )
 
-    output_json = json.dumps(output_data, ensure_ascii=False, indent=2)
+            total_elapsed = int((time.time() - total_start) * 1000)
 
-    # ファイル出力 or 標準出力
-    if args.output_path:
-        with open(args.output_path, "w", encoding="utf-8") as f:
-            f.write(output_json)
-        logger.info(f"Tables extracted to: {args.output_path}")
-    else:
-        print(output_json)
+            with profile_region("serialize"):
+                # JSON出力整形
+                output_data = format_output(
+                    result, args.pdf_path, args.quality_threshold, columnar=args.columnar
+                )
+                output_data["total_elapsed_ms"] = total_elapsed
+
+                output_json = json.dumps(output_data, ensure_ascii=False, indent=2)
+
+                # ファイル出力 or 標準出力
+                if args.output_path:
+                    with open(args.output_path, "w", encoding="utf-8") as f:
+                        f.write(output_json)
+                    logger.info(f"Tables extracted to: {args.output_path}")
+                else:
+                    print(output_json)
+
+        if stats is not None:
+            stats.close()
+
+        # メタ情報JSON出力
+        if args.json_meta:
+            meta = {
+                "pdf_path": args.pdf_path,
+                "method": result.method,
+                "page_count": result.page_count,
+                "table_count": len(result.tables),
+                "warnings": result.warnings,
+                "elapsed_ms": result.elapsed_ms,
+                "total_elapsed_ms": total_elapsed,
+                "usage": asdict(result.usage),
+                "strategy_plan": strategies,
+                "strategy_order": strategy_order,
+                "strategies_tried": strategies_tried,
+                "timing": result.spans.to_dict(),
+            }
+            with profile_region("serialize"), open(args.json_meta, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+            logger.info(f"Metadata written to: {args.json_meta}")
+
+    if profiler is not None:
+        for path in profiler.written:
+            logger.info(f"Profile written to: {path}")
 
     logger.info(
         f"Done. method={result.method}, "
         f"tables={len(result.tables)}, "
         f"total_elapsed={total_elapsed}ms"
     )
+    if result.spans.spans:
+        logger.info(f"Slowest pages: {result.spans.format_slowest_pages()}")
 
     # テーブルが見つからなかった場合は警告
     if not result.tables:
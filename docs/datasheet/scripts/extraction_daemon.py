@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+ウォームな抽出デーモンと薄いクライアント
+
+extract_pdf_text.py / extract_tables.py を毎回起動すると、Python の起動と
+fitz / pdfminer / pdfplumber のインポートが抽出そのものと同程度にかかる
+（小さいダイオードやコンデンサのデータシートでは特に）。
+このデーモンはモジュールをインポート済みのワーカープロセスのプールを保持し、
+Unix ソケット経由で受け取ったジョブを CLI と同じ引数のまま実行する。
+
+ジョブは優先度付きのキューに入り、空いたワーカーに優先度の高い順
+（値が小さい順、同じ優先度なら到着順）に割り当てられる。対話的な
+単一PDFの抽出 (interactive) はバッチ実行 (batch) より先に処理される。
+
+ワーカーは --max-jobs-per-worker 件ごとに作り直す（長時間実行での
+メモリ増加を抑えるため。soak_test.py 参照）。
+
+使用方法:
+    python extraction_daemon.py serve --workers 4
+    python extraction_daemon.py text input.pdf output.txt --strategies pymupdf
+    python extraction_daemon.py --priority batch tables input.pdf tables.json
+    python extraction_daemon.py status
+    python extraction_daemon.py stop
+
+text / tables 以降の引数はそのまま extract_pdf_text.py / extract_tables.py に渡る。
+相対パスはクライアントのカレントディレクトリで解決される。
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import importlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+# クライアントのジョブ種別と対応する CLI モジュール
+CLI_MODULES = {
+    "text": "extract_pdf_text",
+    "tables": "extract_tables",
+}
+
+# ワーカー起動時に読み込んでおくモジュール
+WARM_IMPORTS = ["fitz", "pdfminer.high_level", "pdfplumber", *CLI_MODULES.values()]
+
+# 名前付きの優先度（値が小さいほど先に実行）
+PRIORITIES = {"interactive": 0, "batch": 10}
+
+DEFAULT_MAX_JOBS_PER_WORKER = 200
+SOCKET_ENV = "DATASHEET_EXTRACTD_SOCKET"
+# 1リクエストの最大サイズ (bytes)
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+def default_socket_path() -> str:
+    """環境変数か、ユーザーごとの一時ディレクトリのソケットパス。"""
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"datasheet-extractd-{uid}.sock")
+
+
+def parse_priority(value: str) -> int:
+    """"interactive" / "batch" または整数を優先度に変換する。"""
+    if value in PRIORITIES:
+        return PRIORITIES[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"priority must be one of {list(PRIORITIES)} or an integer: {value}"
+        )
+
+
+# =====================================================================
+# ワーカー
+# =====================================================================
+
+
+def _warm_worker() -> None:
+    """ワーカー起動時に抽出系のモジュールをインポートしておく。"""
+    for name in WARM_IMPORTS:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass  # 未インストールのバックエンドは使われたときにエラーになる
+
+
+def _worker_ready(_index: int) -> int:
+    return os.getpid()
+
+
+def run_cli_job(cli: str, argv: list[str], cwd: str) -> dict:
+    """
+    ワーカーで CLI の main() を argv で実行し、終了コードと出力を返す。
+    CLI はプロセス内で繰り返し呼ばれるため、main() が追加したログハンドラは外す。
+    """
+    module = importlib.import_module(CLI_MODULES[cli])
+    logger = module.logger
+    handlers = list(logger.handlers)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    saved_argv = sys.argv
+    start = time.perf_counter()
+    try:
+        os.chdir(cwd)
+        sys.argv = [module.__file__, *argv]
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                module.main()
+            except SystemExit as e:
+                if isinstance(e.code, int):
+                    exit_code = e.code
+                elif e.code is not None:
+                    print(e.code, file=sys.stderr)
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        sys.argv = saved_argv
+        for handler in logger.handlers[:]:
+            if handler not in handlers:
+                logger.removeHandler(handler)
+                handler.close()
+    return {
+        "exit_code": exit_code,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        "worker_pid": os.getpid(),
+    }
+
+
+# =====================================================================
+# デーモン
+# =====================================================================
+
+
+class ExtractionDaemon:
+    """優先度付きキューとウォームなワーカープールを持つジョブ実行器。"""
+
+    def __init__(self, workers: int, max_jobs_per_worker: int = DEFAULT_MAX_JOBS_PER_WORKER):
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            max_tasks_per_child=max_jobs_per_worker,
+        )
+        self._queue: list[tuple[int, int, dict, Future]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._running = True
+        self.started_at = time.time()
+        self.completed = 0
+        self.failed = 0
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+
+    def start(self) -> None:
+        """全ワーカーを起動してモジュールを読み込ませてから受付を始める。"""
+        list(self.pool.map(_worker_ready, range(self.workers)))
+        self._dispatcher.start()
+
+    def submit(self, job: dict, priority: int) -> Future:
+        """ジョブをキューに入れ、結果の Future を返す。"""
+        future: Future = Future()
+        job["queued_at"] = time.perf_counter()
+        with self._cond:
+            heapq.heappush(self._queue, (priority, next(self._seq), job, future))
+            self._cond.notify()
+        return future
+
+    def _dispatch_loop(self) -> None:
+        """
+        空きワーカーがあるときだけキューから取り出してプールに渡す。
+        プール側のキューに積まないことで、後から来た高優先度のジョブが先に実行される。
+        """
+        while True:
+            with self._cond:
+                while self._running and (not self._queue or self._in_flight >= self.workers):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                _, _, job, future = heapq.heappop(self._queue)
+                self._in_flight += 1
+            queue_ms = round((time.perf_counter() - job["queued_at"]) * 1000, 1)
+            try:
+                pool_future = self.pool.submit(run_cli_job, job["cli"], job["argv"], job["cwd"])
+            except Exception as e:
+                self._finish(future, {"exit_code": 1, "stdout": "", "stderr": f"{e}\n"}, queue_ms)
+                continue
+            pool_future.add_done_callback(
+                lambda f, fut=future, q=queue_ms: self._finish(
+                    fut,
+                    f.result() if not f.exception() else {
+                        "exit_code": 1, "stdout": "", "stderr": f"worker failed: {f.exception()}\n",
+                    },
+                    q,
+                )
+            )
+
+    def _finish(self, future: Future, result: dict, queue_ms: float) -> None:
+        result["queue_ms"] = queue_ms
+        with self._cond:
+            self._in_flight -= 1
+            self.completed += 1
+            if result["exit_code"] != 0:
+                self.failed += 1
+            self._cond.notify()
+        future.set_result(result)
+
+    def status(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "queued": len(self._queue),
+                "running": self._in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "uptime_s": round(time.time() - self.started_at, 1),
+            }
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._running = False
+            for _, _, _, future in self._queue:
+                future.set_result({"exit_code": 1, "stdout": "", "stderr": "daemon shutting down\n"})
+            self._queue.clear()
+            self._cond.notify_all()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """1接続1リクエスト: 改行終端の JSON を受け取り、JSON で応答する。"""
+
+    def handle(self) -> None:
+        daemon: ExtractionDaemon = self.server.daemon_state
+        try:
+            request = json.loads(self.rfile.readline(MAX_REQUEST_BYTES))
+        except ValueError:
+            self._reply({"exit_code": 2, "stdout": "", "stderr": "invalid request\n"})
+            return
+
+        cmd = request.get("cmd")
+        if cmd == "run":
+            if request.get("cli") not in CLI_MODULES:
+                self._reply({"exit_code": 2, "stdout": "", "stderr": f"unknown cli: {request.get('cli')}\n"})
+                return
+            job = {"cli": request["cli"], "argv": list(request.get("argv", [])), "cwd": request.get("cwd", ".")}
+            result = daemon.submit(job, int(request.get("priority", 0))).result()
+            self._reply(result)
+        elif cmd == "status":
+            self._reply(daemon.status())
+        elif cmd == "shutdown":
+            self._reply({"ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self._reply({"exit_code": 2, "stdout": "", "stderr": f"unknown cmd: {cmd}\n"})
+
+    def _reply(self, payload: dict) -> None:
+        self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: str, workers: int, max_jobs_per_worker: int) -> None:
+    """デーモンを起動し、stop されるまでリクエストを受け付ける。"""
+    if os.path.exists(socket_path):
+        try:
+            request(socket_path, {"cmd": "status"})
+        except OSError:
+            os.unlink(socket_path)  # 前回の異常終了で残ったソケット
+        else:
+            print(f"A daemon is already listening on {socket_path}")
+            sys.exit(1)
+
+    daemon = ExtractionDaemon(workers, max_jobs_per_worker)
+    start = time.perf_counter()
+    daemon.start()
+    print(f"Started {workers} warm worker(s) in {time.perf_counter() - start:.1f}s", flush=True)
+
+    server = _DaemonServer(socket_path, _RequestHandler)
+    server.daemon_state = daemon
+    os.chmod(socket_path, 0o600)
+    print(f"Listening on {socket_path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.shutdown()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("Daemon stopped", flush=True)
+
+
+# =====================================================================
+# クライアント
+# =====================================================================
+
+
+def request(socket_path: str, payload: dict, timeout: float | None = None) -> dict:
+    """デーモンに1リクエストを送り、応答を返す。接続できなければ OSError。"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("daemon closed the connection")
+    return json.loads(line)
+
+
+def run_remote(socket_path: str, cli: str, argv: list[str], priority: int) -> dict:
+    """CLI ジョブをデーモンで実行し、結果 (exit_code, stdout, stderr, ...) を返す。"""
+    return request(
+        socket_path,
+        {"cmd": "run", "cli": cli, "argv": argv, "cwd": os.getcwd(), "priority": priority},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="抽出 CLI をウォームなワーカープールで実行するデーモンとクライアント"
+    )
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help=f"Unix ソケットのパス（環境変数 {SOCKET_ENV} でも指定可）。デフォルト: {default_socket_path()}",
+    )
+    parser.add_argument(
+        "--priority",
+        type=parse_priority,
+        default=PRIORITIES["interactive"],
+        help="ジョブの優先度 (interactive / batch / 整数、小さいほど先)。デフォルト: interactive",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="デーモンを起動する")
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="ワーカープロセス数。デフォルト: CPU数",
+    )
+    serve_parser.add_argument(
+        "--max-jobs-per-worker",
+        type=int,
+        default=DEFAULT_MAX_JOBS_PER_WORKER,
+        help=f"ワーカーを作り直すまでのジョブ数。デフォルト: {DEFAULT_MAX_JOBS_PER_WORKER}",
+    )
+    for cli, module in CLI_MODULES.items():
+        subparsers.add_parser(cli, help=f"{module}.py をデーモンで実行する（以降の引数はそのまま渡す）")
+    subparsers.add_parser("status", help="キューとワーカーの状態を表示する")
+    subparsers.add_parser("stop", help="デーモンを停止する")
+
+    # text / tables 以降の引数は --help を含めてすべて CLI に渡す
+    argv = sys.argv[1:]
+    cli_index = next((i for i, token in enumerate(argv) if token in CLI_MODULES), None)
+    cli_args: list[str] = []
+    if cli_index is not None:
+        argv, cli_args = argv[:cli_index + 1], argv[cli_index + 1:]
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.socket, max(args.workers, 1), max(args.max_jobs_per_worker, 1))
+        return
+
+    try:
+        if args.command == "status":
+            print(json.dumps(request(args.socket, {"cmd": "status"}), indent=2))
+        elif args.command == "stop":
+            request(args.socket, {"cmd": "shutdown"})
+            print("Daemon stopping")
+        else:
+            result = run_remote(args.socket, args.command, cli_args, args.priority)
+            sys.stdout.write(result["stdout"])
+            sys.stderr.write(result["stderr"])
+            sys.exit(result["exit_code"])
+    except OSError as e:
+        print(
+            f"Cannot reach extraction daemon at {args.socket}: {e}\n"
+            f"Start it with: python {Path(__file__).name} serve",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
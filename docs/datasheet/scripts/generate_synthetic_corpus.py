@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+スケーリング検証用の合成データシートPDF生成スクリプト
+
+実コーパス (docs/datasheet/output/) は件数・ページ数が少なく、ページ数や表の密度、
+文字化けフォントに対する抽出器のスケーリングを確認できない。
+PyMuPDF で再現可能な合成PDFを生成し、ベンチマークやメモリ上限の検証に使う。
+
+生成されるページの要素:
+    - パラメータ表 (Parameter / Symbol / Conditions / Min / Typ / Max / Unit)
+      罫線あり・罫線なしの両方。表の上に "Table N. ..." のタイトルを置く
+    - 本文段落
+    - ラスタのみのページ（ページ全体を画像化して埋め込む。テキスト層なし）
+    - ToUnicode が壊れたフォントのページ（表示は正しいが抽出すると文字化けする）
+
+出力は <output_dir>/<id>/<id>.pdf の形式で、evaluate_extraction.py や
+benchmark_extraction.py の output_dir としてそのまま使える。ID は
+Synthetic_<ページ数>p_s<seed>_<生成比率のハッシュ> で、比率を変えた実行が
+同じディレクトリを上書きしないようにしている。
+各ページの種別・表の数は <output_dir>/synthetic_manifest.json に記録する
+（同じディレクトリへの実行ごとに ID 単位で追記・更新する）。
+同じ引数（--seed を含む）からは同じ内容のPDFが生成される。
+
+本文・表は Helvetica 相当の組み込みフォントを埋め込んで描く（Base14 のままでは
+WinAnsi の範囲外の θ・Ω などが欠落するため）。
+
+使用方法:
+    python generate_synthetic_corpus.py <output_dir>
+    python generate_synthetic_corpus.py /tmp/synthetic --pages 10,100,500,2000
+    python generate_synthetic_corpus.py /tmp/synthetic --pages 200 --raster-ratio 0.2 --broken-font-ratio 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+from dataclasses import asdict, dataclass, field
+
+try:
+    import fitz  # pymupdf
+except ImportError:
+    print("pymupdf is required. Install with: pip install pymupdf")
+    sys.exit(1)
+
+# 生成できるページ数の範囲
+MIN_PAGES = 1
+MAX_PAGES = 2000
+
+# ページレイアウト (pt, A4)
+PAGE_WIDTH, PAGE_HEIGHT = fitz.paper_size("a4")
+MARGIN = 50
+ROW_HEIGHT = 14
+FONT_SIZE = 8
+TITLE_FONT_SIZE = 10
+# ラスタページの解像度
+RASTER_DPI = 110
+# 本文・表に埋め込むフォント（θ・Ω・µ・° のグリフを持つ）
+TEXT_FONT_NAME = "FSYN"
+TEXT_FONT_SOURCE = "helv"
+
+# 表の列: (見出し, 幅の比率)
+TABLE_COLUMNS = [
+    ("Parameter", 0.26),
+    ("Symbol", 0.10),
+    ("Conditions", 0.26),
+    ("Min", 0.09),
+    ("Typ", 0.09),
+    ("Max", 0.09),
+    ("Unit", 0.11),
+]
+
+PARAMETERS = [
+    ("Supply Voltage", "VCC", "", "V"),
+    ("Supply Current", "ICC", "VCC = 3.3 V, no load", "mA"),
+    ("Standby Current", "ISB", "CE = VCC", "µA"),
+    ("Input High Voltage", "VIH", "", "V"),
+    ("Input Low Voltage", "VIL", "", "V"),
+    ("Output High Voltage", "VOH", "IOH = -2 mA", "V"),
+    ("Output Low Voltage", "VOL", "IOL = 2 mA", "V"),
+    ("Input Leakage Current", "ILI", "VIN = 0 V to VCC", "µA"),
+    ("Forward Voltage", "VF", "IF = 1 A", "V"),
+    ("Reverse Current", "IR", "VR = 40 V", "µA"),
+    ("Operating Temperature", "TA", "", "°C"),
+    ("Junction Temperature", "TJ", "", "°C"),
+    ("Clock Frequency", "fCLK", "", "MHz"),
+    ("Rise Time", "tr", "CL = 15 pF", "ns"),
+    ("Fall Time", "tf", "CL = 15 pF", "ns"),
+    ("Propagation Delay", "tPD", "VCC = 5 V", "ns"),
+    ("Input Capacitance", "CIN", "f = 1 MHz", "pF"),
+    ("Thermal Resistance", "RθJA", "", "°C/W"),
+    ("Power Dissipation", "PD", "TA = 25 °C", "mW"),
+    ("On-Resistance", "RDS(on)", "VGS = 10 V, ID = 1 A", "mΩ"),
+]
+
+TABLE_TITLES = [
+    "Electrical Characteristics",
+    "Absolute Maximum Ratings",
+    "Recommended Operating Conditions",
+    "DC Characteristics",
+    "AC Characteristics",
+    "Thermal Information",
+]
+
+PARAGRAPH_WORDS = (
+    "the device operates over the full industrial temperature range and provides "
+    "low power consumption with fast switching characteristics typical values are "
+    "measured at room temperature unless otherwise noted output drivers support "
+    "standard logic levels and inputs are tolerant to supply transients"
+).split()
+
+
+@dataclass
+class PageSpec:
+    """マニフェストに記録する1ページの構成。"""
+
+    page: int
+    kind: str  # "text" / "raster" / "broken_font"
+    tables: int = 0
+    ruled_tables: int = 0
+    table_rows: int = 0
+
+
+@dataclass
+class DocumentSpec:
+    """マニフェストに記録する1文書の構成。"""
+
+    datasheet_id: str
+    pdf_path: str
+    page_count: int
+    seed: str
+    pages: list[PageSpec] = field(default_factory=list)
+
+
+def _format_value(rng: random.Random) -> str:
+    """Min/Typ/Max 用の数値文字列。"""
+    magnitude = rng.choice([1, 10, 100])
+    value = rng.uniform(0.1, 9.9) * magnitude
+    if magnitude == 1:
+        return f"{value:.2f}"
+    return f"{value:.1f}" if magnitude == 10 else f"{value:.0f}"
+
+
+def _table_rows(rng: random.Random, n_rows: int) -> list[list[str]]:
+    """パラメータ表のデータ行を作る（Min/Typ/Max の一部は空欄）。"""
+    rows = []
+    for name, symbol, conditions, unit in rng.sample(PARAMETERS, n_rows):
+        values = sorted(float(_format_value(rng)) for _ in range(3))
+        cells = [f"{v:g}" for v in values]
+        # 実データシート同様に Min / Max の片方だけのことがある
+        blank = rng.random()
+        if blank < 0.2:
+            cells[0] = ""
+        elif blank < 0.35:
+            cells[2] = ""
+        elif blank < 0.5:
+            cells[1] = ""
+        rows.append([name, symbol, conditions, *cells, unit])
+    return rows
+
+
+def _draw_table(
+    page: "fitz.Page",
+    top: float,
+    title: str,
+    rows: list[list[str]],
+    ruled: bool,
+    fontname: str,
+) -> float:
+    """表を描画し、表の下端の y 座標を返す。"""
+    width = PAGE_WIDTH - 2 * MARGIN
+    xs = [MARGIN]
+    for _, ratio in TABLE_COLUMNS:
+        xs.append(xs[-1] + width * ratio)
+
+    page.insert_text((MARGIN, top + TITLE_FONT_SIZE), title, fontname=fontname, fontsize=TITLE_FONT_SIZE)
+    y = top + TITLE_FONT_SIZE + 8
+
+    header = [name for name, _ in TABLE_COLUMNS]
+    all_rows = [header, *rows]
+    for row in all_rows:
+        for col, text in enumerate(row):
+            if text:
+                page.insert_text((xs[col] + 2, y + ROW_HEIGHT - 4), text, fontname=fontname, fontsize=FONT_SIZE)
+        y += ROW_HEIGHT
+
+    if ruled:
+        table_top = top + TITLE_FONT_SIZE + 8
+        shape = page.new_shape()
+        for i in range(len(all_rows) + 1):
+            row_y = table_top + i * ROW_HEIGHT
+            shape.draw_line((xs[0], row_y), (xs[-1], row_y))
+        for x in xs:
+            shape.draw_line((x, table_top), (x, y))
+        shape.finish(width=0.5, color=(0, 0, 0))
+        shape.commit()
+    return y
+
+
+def _draw_paragraph(page: "fitz.Page", top: float, rng: random.Random, fontname: str) -> float:
+    """本文段落を描画し、下端の y 座標を返す。"""
+    lines = rng.randint(2, 5)
+    for _ in range(lines):
+        words = [rng.choice(PARAGRAPH_WORDS) for _ in range(rng.randint(10, 14))]
+        page.insert_text((MARGIN, top + FONT_SIZE + 1), " ".join(words), fontname=fontname, fontsize=FONT_SIZE + 1)
+        top += FONT_SIZE + 5
+    return top + 6
+
+
+def _fill_page(
+    page: "fitz.Page",
+    rng: random.Random,
+    spec: PageSpec,
+    tables_per_page: float,
+    ruled_ratio: float,
+    table_counter: list[int],
+    fontname: str,
+) -> None:
+    """1ページ分の段落と表を描画する。"""
+    y = MARGIN
+    page.insert_text((MARGIN, y), f"Synthetic Datasheet - page {spec.page}", fontname=fontname, fontsize=7)
+    y += 12
+    y = _draw_paragraph(page, y, rng, fontname)
+
+    # 平均 tables_per_page 個（整数部 + 小数部の確率で1つ追加）
+    n_tables = int(tables_per_page) + (1 if rng.random() < tables_per_page % 1 else 0)
+    for _ in range(n_tables):
+        n_rows = rng.randint(3, 10)
+        height = TITLE_FONT_SIZE + 8 + (n_rows + 1) * ROW_HEIGHT
+        if y + height > PAGE_HEIGHT - MARGIN:
+            break
+        table_counter[0] += 1
+        ruled = rng.random() < ruled_ratio
+        title = f"Table {table_counter[0]}. {rng.choice(TABLE_TITLES)}"
+        y = _draw_table(page, y, title, _table_rows(rng, n_rows), ruled, fontname) + 16
+        spec.tables += 1
+        spec.ruled_tables += int(ruled)
+        spec.table_rows += n_rows
+        if rng.random() < 0.5:
+            y = _draw_paragraph(page, y, rng, fontname)
+
+
+def _rasterize_page(doc: "fitz.Document", page_index: int) -> None:
+    """ページを画像化し、テキスト層のない画像のみのページに置き換える。"""
+    pix = doc[page_index].get_pixmap(dpi=RASTER_DPI)
+    doc.delete_page(page_index)
+    page = doc.new_page(page_index, width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_image(page.rect, pixmap=pix)
+
+
+def _break_tounicode(doc: "fitz.Document", font_xref: int, rng: random.Random) -> None:
+    """フォントの ToUnicode CMap を私用領域へのでたらめな対応に差し替える。"""
+    key_type, value = doc.xref_get_key(font_xref, "ToUnicode")
+    if key_type != "xref":
+        return
+    cmap_xref = int(value.split()[0])
+    entries = [
+        f"<{cid:04x}> <{0xE000 + rng.randrange(0x1000):04x}>"
+        for cid in range(0x200)
+    ]
+    blocks = []
+    for i in range(0, len(entries), 100):
+        chunk = entries[i:i + 100]
+        blocks.append(f"{len(chunk)} beginbfchar\n" + "\n".join(chunk) + "\nendbfchar")
+    cmap = (
+        "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+        "/CIDSystemInfo <</Registry(Adobe)/Ordering(UCS)/Supplement 0>> def\n"
+        "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+        "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+        + "\n".join(blocks)
+        + "\nendcmap\nCMapName currentdict /CIDSystemInfo get pop end\nend\n"
+    )
+    doc.update_stream(cmap_xref, cmap.encode("ascii"))
+
+
+def synthetic_id(
+    page_count: int,
+    seed: int,
+    tables_per_page: float = 1.0,
+    ruled_ratio: float = 0.5,
+    raster_ratio: float = 0.0,
+    broken_font_ratio: float = 0.0,
+) -> str:
+    """生成引数から合成データシートの ID を求める（比率は短いハッシュにして含める）。"""
+    ratios = f"{tables_per_page}-{ruled_ratio}-{raster_ratio}-{broken_font_ratio}"
+    digest = hashlib.sha1(ratios.encode("ascii")).hexdigest()[:6]
+    return f"Synthetic_{page_count}p_s{seed}_{digest}"
+
+
+def generate_document(
+    output_dir: str,
+    page_count: int,
+    seed: int,
+    tables_per_page: float = 1.0,
+    ruled_ratio: float = 0.5,
+    raster_ratio: float = 0.0,
+    broken_font_ratio: float = 0.0,
+) -> DocumentSpec:
+    """合成データシートを1つ生成し、その構成を返す。"""
+    if not MIN_PAGES <= page_count <= MAX_PAGES:
+        raise ValueError(f"page_count must be between {MIN_PAGES} and {MAX_PAGES}: {page_count}")
+
+    datasheet_id = synthetic_id(page_count, seed, tables_per_page, ruled_ratio, raster_ratio, broken_font_ratio)
+    doc_seed = f"{seed}-{page_count}-{tables_per_page}-{ruled_ratio}-{raster_ratio}-{broken_font_ratio}"
+    rng = random.Random(doc_seed)
+    spec = DocumentSpec(
+        datasheet_id=datasheet_id,
+        pdf_path=os.path.join(output_dir, datasheet_id, f"{datasheet_id}.pdf"),
+        page_count=page_count,
+        seed=doc_seed,
+    )
+
+    doc = fitz.open()
+    text_font_buffer = fitz.Font(TEXT_FONT_SOURCE).buffer
+    broken_font_buffer = fitz.Font("cour").buffer
+    broken_font_xref = 0
+    table_counter = [0]
+    raster_pages: list[int] = []
+
+    for page_num in range(1, page_count + 1):
+        roll = rng.random()
+        kind = "text"
+        if roll < raster_ratio:
+            kind = "raster"
+        elif roll < raster_ratio + broken_font_ratio:
+            kind = "broken_font"
+
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        fontname = TEXT_FONT_NAME
+        page.insert_font(fontname=fontname, fontbuffer=text_font_buffer)
+        if kind == "broken_font":
+            # 文字化けページ専用の埋め込みフォント（文書内で1つの xref を共有）
+            fontname = "FBRK"
+            broken_font_xref = page.insert_font(fontname=fontname, fontbuffer=broken_font_buffer)
+
+        page_spec = PageSpec(page=page_num, kind=kind)
+        _fill_page(page, rng, page_spec, tables_per_page, ruled_ratio, table_counter, fontname)
+        spec.pages.append(page_spec)
+        if kind == "raster":
+            raster_pages.append(page_num - 1)
+
+    for page_index in raster_pages:
+        _rasterize_page(doc, page_index)
+    if broken_font_xref:
+        _break_tounicode(doc, broken_font_xref, rng)
+
+    # 再現性のため日時などのメタデータを固定する
+    doc.set_metadata({
+        "title": datasheet_id,
+        "creator": "generate_synthetic_corpus.py",
+        "producer": "generate_synthetic_corpus.py",
+        "creationDate": "D:20240101000000Z",
+        "modDate": "D:20240101000000Z",
+    })
+    os.makedirs(os.path.dirname(spec.pdf_path), exist_ok=True)
+    doc.save(spec.pdf_path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+    return spec
+
+
+def parse_page_counts(value: str) -> list[int]:
+    """"10,100,500" または "10-2000:4"（範囲を対数的に4分割）をページ数リストにする。"""
+    if "-" in value:
+        span, _, steps = value.partition(":")
+        low, high = (int(v) for v in span.split("-", 1))
+        steps = int(steps) if steps else 2
+        if steps < 2:
+            return [low]
+        ratio = (high / low) ** (1 / (steps - 1))
+        return sorted({round(low * ratio ** i) for i in range(steps)})
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="スケーリング検証用の合成データシートPDFを生成する"
+    )
+    parser.add_argument("output_dir", help="出力ディレクトリ（<id>/<id>.pdf 形式で生成）")
+    parser.add_argument(
+        "--pages",
+        default="10,100,500",
+        help=(
+            "生成する文書のページ数（カンマ区切り、または 10-2000:5 で範囲を対数分割）。"
+            f"範囲: {MIN_PAGES}-{MAX_PAGES}。デフォルト: 10,100,500"
+        ),
+    )
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード。デフォルト: 0")
+    parser.add_argument(
+        "--tables-per-page",
+        type=float,
+        default=1.0,
+        help="1ページあたりの平均表数。デフォルト: 1.0",
+    )
+    parser.add_argument(
+        "--ruled-ratio",
+        type=float,
+        default=0.5,
+        help="罫線ありの表の割合。デフォルト: 0.5",
+    )
+    parser.add_argument(
+        "--raster-ratio",
+        type=float,
+        default=0.0,
+        help="画像のみ（テキスト層なし）のページの割合。デフォルト: 0.0",
+    )
+    parser.add_argument(
+        "--broken-font-ratio",
+        type=float,
+        default=0.0,
+        help="ToUnicode が壊れたフォントで描くページの割合。デフォルト: 0.0",
+    )
+    args = parser.parse_args()
+
+    try:
+        page_counts = parse_page_counts(args.pages)
+    except ValueError:
+        parser.error(f"invalid --pages: {args.pages}")
+    for count in page_counts:
+        if not MIN_PAGES <= count <= MAX_PAGES:
+            parser.error(f"page counts must be between {MIN_PAGES} and {MAX_PAGES}: {count}")
+    if args.raster_ratio + args.broken_font_ratio > 1:
+        parser.error("--raster-ratio + --broken-font-ratio must not exceed 1")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    specs: list[DocumentSpec] = []
+    for count in page_counts:
+        spec = generate_document(
+            args.output_dir,
+            count,
+            args.seed,
+            tables_per_page=args.tables_per_page,
+            ruled_ratio=args.ruled_ratio,
+            raster_ratio=args.raster_ratio,
+            broken_font_ratio=args.broken_font_ratio,
+        )
+        specs.append(spec)
+        tables = sum(p.tables for p in spec.pages)
+        size_kb = os.path.getsize(spec.pdf_path) / 1024
+        print(f"Generated: {spec.pdf_path} ({count} pages, {tables} tables, {size_kb:.0f} KB)")
+
+    manifest_path = os.path.join(args.output_dir, "synthetic_manifest.json")
+    documents: dict[str, dict] = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            documents = {d["datasheet_id"]: d for d in json.load(f).get("documents", [])}
+    for spec in specs:
+        documents[spec.datasheet_id] = asdict(spec)
+    manifest = {
+        "generator_args": vars(args),
+        "documents": sorted(documents.values(), key=lambda d: d["datasheet_id"]),
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"Manifest written to: {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
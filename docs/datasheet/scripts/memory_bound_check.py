@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+pdfplumber 表抽出のメモリ上限の検証
+
+大きな PDF で extract_tables_pdfplumber の RSS がページ数に比例して
+増えないこと（1ページ目から最終ページまで平坦なこと）を確認する。
+--pdf を省略すると generate_synthetic_corpus.py で 400 ページの合成データシートを
+一時ディレクトリに生成して使う。
+
+ページ処理完了ごとに現在の RSS を記録し、最初のウィンドウ（ページキャッシュや
+フォントの初期確保が済むまで）を除いた区間の最小二乗直線の傾きが
+--max-slope-mb（MB / 100 ページ）を超えた場合に失敗（終了コード 1）とする。
+
+使用方法:
+    python memory_bound_check.py
+    python memory_bound_check.py --pages 1000 -o rss_by_page.json
+    python memory_bound_check.py --pdf ../output/Micron_MT41K256M16HA-107_E_TR/Micron_MT41K256M16HA-107_E_TR.pdf
+    python memory_bound_check.py --page-window 0    # 開き直しなし（比較用）
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pdf_table_extractor import PDFPLUMBER_PAGE_WINDOW, extract_tables_pdfplumber
+from resource_usage import current_rss_mb
+from soak_test import slope
+
+DEFAULT_PAGES = 400
+# 失敗とする RSS の傾き (MB / 100 ページ)
+DEFAULT_MAX_SLOPE_MB = 2.0
+# 表示する RSS の標本点の間隔（ページ）
+REPORT_EVERY = 50
+
+
+def rss_by_page(
+    pdf_path: str, page_window: int, memory_budget_mb: float | None
+) -> tuple[list[float], list[str]]:
+    """表抽出を実行し、ページごとの処理完了時点の RSS (MB) と警告を返す。"""
+    samples: list[float] = []
+
+    def record(_page_num, _tables) -> None:
+        samples.append(current_rss_mb() or 0.0)
+
+    result = extract_tables_pdfplumber(
+        pdf_path, page_window=page_window, memory_budget_mb=memory_budget_mb, on_page=record
+    )
+    return samples, result.warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pdfplumber 表抽出の RSS がページ数に対して平坦か検証する")
+    parser.add_argument("--pdf", default=None, help="検証に使う PDF（省略時は合成PDFを生成）")
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=DEFAULT_PAGES,
+        help=f"生成する合成PDFのページ数。デフォルト: {DEFAULT_PAGES}",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="合成PDFの乱数シード。デフォルト: 0")
+    parser.add_argument(
+        "--page-window",
+        type=int,
+        default=PDFPLUMBER_PAGE_WINDOW,
+        help=f"文書を開き直すページ間隔（0 で開き直さない）。デフォルト: {PDFPLUMBER_PAGE_WINDOW}",
+    )
+    parser.add_argument("--memory-budget-mb", type=float, default=None, help="RSS の上限 (MB)")
+    parser.add_argument(
+        "--max-slope-mb",
+        type=float,
+        default=DEFAULT_MAX_SLOPE_MB,
+        help=f"失敗とする RSS の傾き (MB / 100 ページ)。デフォルト: {DEFAULT_MAX_SLOPE_MB}",
+    )
+    parser.add_argument("--output", "-o", default=None, help="ページごとの RSS を書き出す JSON パス")
+    args = parser.parse_args()
+
+    if current_rss_mb() is None:
+        print("RSS is not available on this platform")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            from generate_synthetic_corpus import generate_document
+
+            pdf_path = generate_document(tmp_dir, args.pages, args.seed).pdf_path
+            print(f"Generated {args.pages}-page synthetic PDF: {pdf_path}")
+
+        start = time.time()
+        samples, warnings = rss_by_page(pdf_path, args.page_window, args.memory_budget_mb)
+        elapsed = time.time() - start
+
+    # 最初のウィンドウは初期確保を含むので傾きの計算から除く
+    warmup = min(args.page_window or PDFPLUMBER_PAGE_WINDOW, len(samples) // 2)
+    rss_slope = slope(samples[warmup:]) * 100
+    passed = rss_slope <= args.max_slope_mb
+
+    print()
+    print("=" * 100)
+    print(f"pdfplumber RSS by page: {Path(pdf_path).name} (window={args.page_window}, {elapsed:.1f}s)")
+    print("=" * 100)
+    for page in range(1, len(samples) + 1):
+        if page == 1 or page % REPORT_EVERY == 0 or page == len(samples):
+            print(f"  page {page:>5d}: {samples[page - 1]:>8.1f} MB")
+    for warning in warnings:
+        if warning.startswith("RSS"):
+            print(f"  warning: {warning}")
+    print(
+        f"  slope after page {warmup}: {rss_slope:+.2f} MB / 100 pages "
+        f"(limit {args.max_slope_mb:.2f}) -> {'OK' if passed else 'FAIL'}"
+    )
+    print()
+
+    if args.output:
+        report = {
+            "pdf": pdf_path,
+            "page_window": args.page_window,
+            "memory_budget_mb": args.memory_budget_mb,
+            "warmup_pages": warmup,
+            "slope_mb_per_100_pages": round(rss_slope, 3),
+            "passed": passed,
+            "rss_mb_by_page": [round(v, 1) for v in samples],
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"RSS by page written to: {args.output}")
+
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
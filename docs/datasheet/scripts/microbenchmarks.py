@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+純 Python のホットな関数のマイクロベンチマーク
+
+PDF パース以外で CPU 時間の大半を占めるヘルパー関数を、固定の入力で
+個別に計測する。関数単体の最適化の効果をパイプライン全体のノイズなしで
+判断するためのもの。
+
+計測対象と単位:
+    normalize_text             ns/char   入力: 出力済み .txt
+    _remove_control_chars      ns/char   入力: 出力済み .txt
+    evaluate_quality           ns/char   入力: 出力済み .txt
+    _fix_concatenated_words    ns/char   入力: 抽出済みテーブルの全セル・ヘッダー
+    merge_multiline_headers    µs/cell   入力: 抽出時に記録した生の行列データ
+    detect_unit_column         µs/cell   入力: 抽出済みテーブル
+    evaluate_table_quality     µs/cell   入力: 抽出済みテーブル
+
+テーブルの入力は初回に --fixture-strategy でコーパスから抽出して
+--fixtures に保存し、以降は同じファイルを使う（抽出器を変更しても入力が
+変わらないように）。作り直すときは --refresh-fixtures を付ける。
+
+各ベンチマークは入力全体を1パスとして、1回あたり MIN_REPEAT_TIME_S 以上に
+なるようパス数を自動調整し、--repeat 回計測した中央値・最小値・相対的な
+ばらつき (MAD) を報告する。セル単位の lru_cache を使う関数は、パスごとに
+キャッシュを破棄してから計る値（uncached、既定の比較対象）と、1パス目で
+キャッシュを温めた後に計る値（cached、同じ入力が繰り返し現れる場合）を
+分けて報告する。キャッシュの破棄は計測区間の外で行う。
+
+使用方法:
+    python microbenchmarks.py [output_dir]
+    python microbenchmarks.py --only normalize_text,evaluate_quality --repeat 11
+    python microbenchmarks.py -o micro.json
+    python microbenchmarks.py --compare micro_baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pdf_table_extractor
+from benchmark_extraction import clear_caches
+from evaluate_extraction import find_pdfs
+from pdf_normalize import _remove_control_chars, normalize_text
+from pdf_quality import evaluate_quality
+from pdf_table_extractor import (
+    ExtractedTable,
+    _fix_concatenated_words,
+    detect_unit_column,
+    merge_multiline_headers,
+    run_table_strategy,
+)
+from table_quality import evaluate_table_quality
+
+# 1回の計測の最小時間（これに達するまでパス数を倍にする）
+MIN_REPEAT_TIME_S = 0.2
+DEFAULT_REPEAT = 7
+# 比較時に変化とみなす相対的なばらつきの倍数
+NOISE_SIGMAS = 2.0
+
+FIXTURES_VERSION = 1
+DEFAULT_FIXTURES = "microbench_fixtures.json"
+
+
+@dataclass
+class Fixtures:
+    """ベンチマークの固定入力。"""
+
+    texts: list[str]  # 出力済み .txt の内容
+    raw_tables: list[list[list[str]]]  # merge_multiline_headers に渡された生の行列
+    tables: list[ExtractedTable]
+
+
+@dataclass
+class Microbenchmark:
+    """1関数分のベンチマーク定義。run は入力全体を1パス処理する。"""
+
+    name: str
+    unit: str  # "ns/char" | "µs/cell"
+    run: Callable[[Fixtures], None]
+    size: Callable[[Fixtures], int]  # 1パスあたりの文字数またはセル数
+    cached: bool = False  # セル単位の lru_cache を使う（cached の値も計る）
+
+
+def _table_cells(table: ExtractedTable) -> int:
+    return len(table.headers) + sum(len(column) for column in table.columns)
+
+
+def _table_strings(fixtures: Fixtures) -> list[str]:
+    strings: list[str] = []
+    for table in fixtures.tables:
+        strings.extend(table.headers)
+        for column in table.columns:
+            strings.extend(column)
+    return strings
+
+
+def _run_fix_concatenated_words(fixtures: Fixtures) -> None:
+    for value in _table_strings(fixtures):
+        _fix_concatenated_words(value)
+
+
+BENCHMARKS = [
+    Microbenchmark(
+        "normalize_text",
+        "ns/char",
+        lambda f: [normalize_text(text) for text in f.texts],
+        lambda f: sum(len(text) for text in f.texts),
+    ),
+    Microbenchmark(
+        "_remove_control_chars",
+        "ns/char",
+        lambda f: [_remove_control_chars(text) for text in f.texts],
+        lambda f: sum(len(text) for text in f.texts),
+    ),
+    Microbenchmark(
+        "evaluate_quality",
+        "ns/char",
+        lambda f: [evaluate_quality(text) for text in f.texts],
+        lambda f: sum(len(text) for text in f.texts),
+    ),
+    Microbenchmark(
+        "_fix_concatenated_words",
+        "ns/char",
+        _run_fix_concatenated_words,
+        lambda f: sum(len(value) for value in _table_strings(f)),
+        cached=True,
+    ),
+    Microbenchmark(
+        "merge_multiline_headers",
+        "µs/cell",
+        lambda f: [merge_multiline_headers(raw) for raw in f.raw_tables],
+        lambda f: sum(len(row) for raw in f.raw_tables for row in raw),
+    ),
+    Microbenchmark(
+        "detect_unit_column",
+        "µs/cell",
+        lambda f: [detect_unit_column(t.headers, t.raw_rows) for t in f.tables],
+        lambda f: sum(_table_cells(t) for t in f.tables),
+        cached=True,
+    ),
+    Microbenchmark(
+        "evaluate_table_quality",
+        "µs/cell",
+        lambda f: [evaluate_table_quality(t) for t in f.tables],
+        lambda f: sum(_table_cells(t) for t in f.tables),
+        cached=True,
+    ),
+]
+
+_UNIT_SCALE = {"ns/char": 1e9, "µs/cell": 1e6}
+
+
+# =====================================================================
+# 固定入力
+# =====================================================================
+
+
+def _record_raw_tables(strategy: str, pdfs: list[tuple[str, str]]) -> tuple[list, list[ExtractedTable]]:
+    """
+    コーパスから表を抽出し、その過程で merge_multiline_headers に渡された
+    生の行列データも記録する。
+    """
+    raw_tables: list[list[list[str]]] = []
+    original = pdf_table_extractor.merge_multiline_headers
+
+    def recording(raw_table):
+        raw_tables.append([list(row) for row in raw_table])
+        return original(raw_table)
+
+    tables: list[ExtractedTable] = []
+    pdf_table_extractor.merge_multiline_headers = recording
+    try:
+        for datasheet_id, pdf_path in pdfs:
+            print(f"  extracting tables: {datasheet_id}", flush=True)
+            try:
+                tables.extend(run_table_strategy(strategy, pdf_path).tables)
+            except Exception as e:
+                print(f"    skipped: {e}")
+    finally:
+        pdf_table_extractor.merge_multiline_headers = original
+    return raw_tables, tables
+
+
+def build_fixtures(output_dir: str, strategy: str) -> dict:
+    """出力ディレクトリの .txt と PDF から固定入力を作る。"""
+    pdfs = find_pdfs(output_dir)
+    texts = []
+    for datasheet_id, pdf_path in pdfs:
+        txt_path = Path(pdf_path).with_suffix(".txt")
+        if txt_path.exists():
+            texts.append({"datasheet_id": datasheet_id, "text": txt_path.read_text(encoding="utf-8")})
+    raw_tables, tables = _record_raw_tables(strategy, pdfs)
+    return {
+        "version": FIXTURES_VERSION,
+        "strategy": strategy,
+        "texts": texts,
+        "raw_tables": raw_tables,
+        "tables": [
+            {
+                "page": t.page,
+                "title": t.title,
+                "headers": t.headers,
+                "raw_rows": t.raw_rows,
+                "method": t.method,
+            }
+            for t in tables
+        ],
+    }
+
+
+def load_fixtures(data: dict) -> Fixtures:
+    return Fixtures(
+        texts=[entry["text"] for entry in data["texts"]],
+        raw_tables=data["raw_tables"],
+        tables=[
+            ExtractedTable.from_rows(
+                t["page"], t["headers"], t["raw_rows"], title=t["title"], method=t["method"]
+            )
+            for t in data["tables"]
+        ],
+    )
+
+
+# =====================================================================
+# 計測
+# =====================================================================
+
+
+def _time_passes(bench: Microbenchmark, fixtures: Fixtures, passes: int, cached: bool = False) -> float:
+    """
+    passes 回分の実行時間 (秒)。計測中は GC を止める（timeit と同様）。
+    cached でなければパスごとに計測区間の外でキャッシュを破棄し、
+    cached なら計測前に1パス実行してキャッシュを温める。
+    """
+    clear_caches()
+    if cached:
+        bench.run(fixtures)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        elapsed = 0.0
+        for _ in range(passes):
+            if not cached:
+                clear_caches()
+            start = time.perf_counter()
+            bench.run(fixtures)
+            elapsed += time.perf_counter() - start
+        return elapsed
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _relative_mad(values: list[float]) -> float:
+    """MAD を標準偏差相当に換算した相対的なばらつき。"""
+    median = statistics.median(values)
+    if len(values) < 2 or median <= 0:
+        return 0.0
+    return 1.4826 * statistics.median(abs(v - median) for v in values) / median
+
+
+def _measure(bench: Microbenchmark, fixtures: Fixtures, repeat: int, cached: bool) -> dict:
+    """パス数を決めて repeat 回計測し、単位あたりの時間の統計を返す。"""
+    size = bench.size(fixtures)
+    # ウォームアップを兼ねてパス数を決める
+    passes = 1
+    while _time_passes(bench, fixtures, passes, cached) < MIN_REPEAT_TIME_S and passes < 1_000_000:
+        passes *= 2
+
+    scale = _UNIT_SCALE[bench.unit]
+    per_unit = []
+    for _ in range(repeat):
+        elapsed = _time_passes(bench, fixtures, passes, cached)
+        per_unit.append(elapsed / passes / max(size, 1) * scale)
+
+    return {
+        "passes": passes,
+        "samples": [round(v, 4) for v in per_unit],
+        "median": round(statistics.median(per_unit), 4),
+        "min": round(min(per_unit), 4),
+        "rel_noise": round(_relative_mad(per_unit), 4),
+    }
+
+
+def run_microbenchmark(bench: Microbenchmark, fixtures: Fixtures, repeat: int) -> dict:
+    """
+    1関数を計測し、単位あたりの時間の統計を返す。トップレベルの値はキャッシュなし、
+    lru_cache を使う関数は "cached" にキャッシュが効いた状態の値も入れる。
+    """
+    result = {
+        "name": bench.name,
+        "unit": bench.unit,
+        "size": bench.size(fixtures),
+        **_measure(bench, fixtures, repeat, cached=False),
+    }
+    if bench.cached:
+        result["cached"] = _measure(bench, fixtures, repeat, cached=True)
+    return result
+
+
+def print_results(results: list[dict], baseline: dict | None = None) -> None:
+    """結果を表示する。baseline があれば中央値の変化も表示する。"""
+    base = {r["name"]: r for r in baseline["results"]} if baseline else {}
+    print()
+    print("=" * 100)
+    print("Microbenchmarks")
+    print("=" * 100)
+    header = (
+        f"  {'function':<26s} {'median':>10s} {'min':>10s} {'unit':<8s} {'noise':>7s} {'size':>10s}"
+        f" {'cached':>10s}"
+    )
+    if base:
+        header += f" {'change':>9s}"
+    print(header)
+    for r in results:
+        line = (
+            f"  {r['name']:<26s} {r['median']:>10.3f} {r['min']:>10.3f} {r['unit']:<8s} "
+            f"{r['rel_noise']:>6.1%} {r['size']:>10d}"
+        )
+        line += f" {r['cached']['median']:>10.3f}" if "cached" in r else f" {'-':>10s}"
+        if r["name"] in base:
+            b = base[r["name"]]
+            change = r["median"] / b["median"] - 1 if b["median"] else 0.0
+            threshold = NOISE_SIGMAS * (r["rel_noise"] ** 2 + b["rel_noise"] ** 2) ** 0.5
+            verdict = "" if abs(change) <= threshold else (" faster" if change < 0 else " SLOWER")
+            line += f" {change:>+8.1%}{verdict}"
+        print(line)
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="純 Python のホットな関数を固定入力で個別に計測する"
+    )
+    parser.add_argument(
+        "output_dir",
+        nargs="?",
+        default=None,
+        help="docs/datasheet/output/ ディレクトリのパス（省略時は自動検出）",
+    )
+    parser.add_argument(
+        "--fixtures",
+        default=None,
+        help=f"固定入力の JSON パス。デフォルト: <output_dir>/{DEFAULT_FIXTURES}",
+    )
+    parser.add_argument(
+        "--refresh-fixtures",
+        action="store_true",
+        help="固定入力をコーパスから作り直す",
+    )
+    parser.add_argument(
+        "--fixture-strategy",
+        default="pdfplumber",
+        help="固定入力のテーブルを抽出する戦略。デフォルト: pdfplumber",
+    )
+    parser.add_argument(
+        "--only",
+        default=None,
+        help="計測する関数（カンマ区切り）。省略時は全て",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"計測の繰り返し回数。デフォルト: {DEFAULT_REPEAT}",
+    )
+    parser.add_argument("--output", "-o", default=None, help="結果 JSON の出力パス")
+    parser.add_argument(
+        "--compare",
+        default=None,
+        metavar="BASELINE",
+        help="ベースラインの結果 JSON と中央値を比較して表示する",
+    )
+    args = parser.parse_args()
+
+    if args.output_dir:
+        output_dir = args.output_dir
+    else:
+        script_dir = Path(__file__).parent
+        output_dir = str(script_dir.parent / "output")
+    fixtures_path = Path(args.fixtures or Path(output_dir) / DEFAULT_FIXTURES)
+
+    benchmarks = BENCHMARKS
+    if args.only:
+        wanted = {s.strip() for s in args.only.split(",") if s.strip()}
+        unknown = wanted - {b.name for b in BENCHMARKS}
+        if unknown:
+            parser.error(f"Unknown function(s): {sorted(unknown)}. Available: {[b.name for b in BENCHMARKS]}")
+        benchmarks = [b for b in BENCHMARKS if b.name in wanted]
+
+    data = None
+    if fixtures_path.exists() and not args.refresh_fixtures:
+        with open(fixtures_path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FIXTURES_VERSION:
+            print(f"Fixture version mismatch in {fixtures_path}; rebuilding")
+            data = None
+    if data is None:
+        print(f"Building fixtures from {output_dir} (strategy={args.fixture_strategy})...")
+        data = build_fixtures(output_dir, args.fixture_strategy)
+        with open(fixtures_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        print(f"Fixtures written to: {fixtures_path}")
+    fixtures = load_fixtures(data)
+    if not fixtures.texts or not fixtures.tables:
+        print(f"No fixtures available (texts={len(fixtures.texts)}, tables={len(fixtures.tables)})")
+        sys.exit(1)
+    print(
+        f"Fixtures: {len(fixtures.texts)} text(s), {len(fixtures.tables)} table(s), "
+        f"{len(fixtures.raw_tables)} raw table(s)"
+    )
+
+    results = []
+    for bench in benchmarks:
+        result = run_microbenchmark(bench, fixtures, max(args.repeat, 2))
+        results.append(result)
+        print(
+            f"  {bench.name}: {result['median']:.3f} {bench.unit} "
+            f"(x{result['passes']} pass(es), noise {result['rel_noise']:.1%})"
+            + (f", cached {result['cached']['median']:.3f} {bench.unit}" if "cached" in result else ""),
+            flush=True,
+        )
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        report = {"fixtures": str(fixtures_path), "repeat": args.repeat, "results": results}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Microbenchmark results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
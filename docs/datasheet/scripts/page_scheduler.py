@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+ページ範囲単位のワークスティーリング・スケジューラ
+
+400ページのメモリのデータシートと数十件の5ページのダイオードのデータシートを
+文書単位で並列に処理すると、最後は大きな PDF の終わりを待つ間ほかのコアが
+遊んでしまう。このスケジューラは各文書を --pages-per-task ページずつの
+ページ範囲タスクに分け、ワーカーごとのキューに配って実行する。
+
+    - 文書はページ数の多い順に、割り当て済みページ数が最も少ないワーカーの
+      キューに入れる（文書内の範囲は同じワーカーに連続して並ぶ）
+    - ワーカーは自分のキューの先頭から範囲を取る
+    - 自分のキューが空になったら、残りページ数が最大の文書を探し、その範囲を
+      持っているキューの後ろ半分を盗む
+
+各範囲は pdf_page_ranges.py で既存のフォールバック抽出をそのまま実行し、
+文書のすべての範囲が終わった時点でページ順に結合する（テキストは
+pdf_extractors の戦略、表は pdf_table_extractor の戦略のどちらでも動く）。
+--write を指定すると結合結果を work_queue.py と同じ形式で書き出す。
+
+--compare-per-document を指定すると、同じ文書を文書単位の並列（大きい順）でも
+実行し、処理時間と終盤のアイドル時間を並べて表示する。
+
+使用方法:
+    python page_scheduler.py [output_dir] --workers 8
+    python page_scheduler.py --kinds text,tables --pages-per-task 10 --write
+    python page_scheduler.py /tmp/synthetic --compare-per-document -o schedule.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+from batch_pipeline import find_pdfs
+from pdf_page_ranges import (
+    count_pages,
+    extract_tables_range,
+    extract_text_range,
+    merge_table_results,
+    merge_text_results,
+    split_page_ranges,
+)
+from work_queue import DEFAULT_STRATEGIES, QUALITY_THRESHOLDS, write_tables_output, write_text_output
+
+logger = logging.getLogger("page_scheduler")
+
+SCRIPT_DIR = Path(__file__).parent
+
+TASK_KINDS = ["text", "tables"]
+DEFAULT_PAGES_PER_TASK = 8
+
+
+@dataclass
+class Job:
+    """1文書 × 1種類（テキスト / 表）の抽出。"""
+
+    kind: str
+    datasheet_id: str
+    pdf_path: str
+    page_count: int
+    ranges: list[tuple[int, int]]
+    parts: dict[int, object] = field(default_factory=dict)  # 範囲の先頭ページ → 抽出結果
+    result: object | None = None  # 全範囲を結合した結果
+    error: str | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}:{self.datasheet_id}"
+
+
+@dataclass
+class RangeTask:
+    job: Job
+    first: int
+    last: int
+
+    @property
+    def pages(self) -> int:
+        return self.last - self.first + 1
+
+
+class WorkStealingScheduler:
+    """ワーカーごとの両端キューと、最大の残り文書からの後ろ半分の盗み。"""
+
+    name = "work-stealing"
+
+    def __init__(self, jobs: list[Job], workers: int):
+        self.queues: list[deque[RangeTask]] = [deque() for _ in range(workers)]
+        self.steals = 0
+        load = [0] * workers
+        for job in sorted(jobs, key=lambda j: j.page_count, reverse=True):
+            slot = min(range(workers), key=load.__getitem__)
+            self.queues[slot].extend(RangeTask(job, first, last) for first, last in job.ranges)
+            load[slot] += job.page_count
+
+    def next_task(self, slot: int) -> RangeTask | None:
+        if not self.queues[slot] and not self._steal(slot):
+            return None
+        return self.queues[slot].popleft()
+
+    def _steal(self, thief: int) -> bool:
+        remaining: dict[str, int] = {}
+        for queue in self.queues:
+            for task in queue:
+                remaining[task.job.key] = remaining.get(task.job.key, 0) + task.pages
+        if not remaining:
+            return False
+        target = max(remaining, key=remaining.__getitem__)
+        victim = max(
+            range(len(self.queues)),
+            key=lambda i: sum(t.pages for t in self.queues[i] if t.job.key == target),
+        )
+        candidates = [t for t in self.queues[victim] if t.job.key == target]
+        stolen = candidates[len(candidates) // 2:]
+        for task in stolen:
+            self.queues[victim].remove(task)
+        self.queues[thief].extend(stolen)
+        self.steals += 1
+        logger.debug(f"worker {thief} stole {len(stolen)} range(s) of {target} from worker {victim}")
+        return True
+
+
+class PerDocumentScheduler:
+    """比較用: 文書を分割せず、ページ数の多い順に空いたワーカーへ渡す。"""
+
+    name = "per-document"
+
+    def __init__(self, jobs: list[Job], workers: int):
+        self.queue = deque(
+            RangeTask(job, 1, job.page_count)
+            for job in sorted(jobs, key=lambda j: j.page_count, reverse=True)
+        )
+        self.steals = 0
+
+    def next_task(self, slot: int) -> RangeTask | None:
+        return self.queue.popleft() if self.queue else None
+
+
+# =====================================================================
+# 実行
+# =====================================================================
+
+
+def _run_range(
+    kind: str,
+    pdf_path: str,
+    first: int,
+    last: int,
+    strategies: list[str],
+    quality_threshold: float,
+    strategy_options: dict[str, dict],
+) -> tuple[object, float]:
+    """ワーカープロセスで1範囲を抽出し、(結果, 所要秒数) を返す。"""
+    start = time.perf_counter()
+    extract = extract_text_range if kind == "text" else extract_tables_range
+    result = extract(
+        pdf_path, first, last, strategies=strategies,
+        quality_threshold=quality_threshold, strategy_options=strategy_options,
+    )
+    return result, time.perf_counter() - start
+
+
+def build_jobs(pdfs: list[tuple[str, str]], kinds: list[str], pages_per_task: int) -> list[Job]:
+    jobs = []
+    for datasheet_id, pdf_path in pdfs:
+        page_count = count_pages(pdf_path)
+        for kind in kinds:
+            jobs.append(Job(
+                kind=kind,
+                datasheet_id=datasheet_id,
+                pdf_path=pdf_path,
+                page_count=page_count,
+                ranges=split_page_ranges(page_count, pages_per_task),
+            ))
+    return jobs
+
+
+def run_schedule(
+    scheduler: WorkStealingScheduler | PerDocumentScheduler,
+    jobs: list[Job],
+    workers: int,
+    strategies: dict[str, list[str]],
+    strategy_options: dict[str, dict] | None = None,
+    on_job_done=None,
+) -> dict:
+    """
+    ワーカーが空くたびにそのワーカーの次の範囲を投入し、文書の全範囲が
+    終わったら結合する。処理時間・稼働率・終盤のアイドル時間を返す。
+    on_job_done(job) は文書の結合後（失敗時も）に呼ばれる。
+    """
+    options = strategy_options or {}
+    busy = [0.0] * workers
+    last_finish = [0.0] * workers
+    tasks_run = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = {}
+
+        def submit(slot: int) -> None:
+            task = scheduler.next_task(slot)
+            if task is None:
+                return
+            if task.job.started_at is None:
+                task.job.started_at = time.perf_counter() - start
+            future = pool.submit(
+                _run_range, task.job.kind, task.job.pdf_path, task.first, task.last,
+                strategies[task.job.kind], QUALITY_THRESHOLDS[task.job.kind], options,
+            )
+            running[future] = (slot, task)
+
+        for slot in range(workers):
+            submit(slot)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                slot, task = running.pop(future)
+                job = task.job
+                tasks_run += 1
+                try:
+                    result, elapsed = future.result()
+                    busy[slot] += elapsed
+                    job.parts[task.first] = result
+                except Exception as e:
+                    logger.error(f"{job.key} pages {task.first}-{task.last} failed: {e}")
+                    job.error = job.error or f"pages {task.first}-{task.last}: {type(e).__name__}: {e}"
+                    job.parts[task.first] = None
+                last_finish[slot] = time.perf_counter() - start
+                if len(job.parts) == len(job.ranges):
+                    job.finished_at = time.perf_counter() - start
+                    if job.error is None:
+                        parts = [job.parts[first] for first in sorted(job.parts)]
+                        merge = merge_text_results if job.kind == "text" else merge_table_results
+                        job.result = merge(parts)
+                    job.parts = {}
+                    if on_job_done is not None:
+                        on_job_done(job)
+                submit(slot)
+
+    makespan = time.perf_counter() - start
+    return {
+        "scheduler": scheduler.name,
+        "workers": workers,
+        "tasks": tasks_run,
+        "steals": scheduler.steals,
+        "makespan_s": round(makespan, 3),
+        "utilization": round(sum(busy) / (workers * makespan), 3) if makespan > 0 else 0.0,
+        # 最後の範囲を終えてから全体が終わるまでの、ワーカーあたりの平均待ち時間
+        "tail_idle_s": round(sum(makespan - t for t in last_finish) / workers, 3),
+        "jobs": [
+            {
+                "job": job.key,
+                "pages": job.page_count,
+                "ranges": len(job.ranges),
+                "started_s": round(job.started_at or 0.0, 3),
+                "finished_s": round(job.finished_at or 0.0, 3),
+                "method": getattr(job.result, "method", ""),
+                "error": job.error,
+            }
+            for job in jobs
+        ],
+    }
+
+
+def print_report(stats_list: list[dict]) -> None:
+    print()
+    print("=" * 100)
+    print("Page Scheduler")
+    print("=" * 100)
+    for stats in stats_list:
+        print(
+            f"  {stats['scheduler']:<14s} workers={stats['workers']} tasks={stats['tasks']} "
+            f"steals={stats['steals']} makespan={stats['makespan_s']:.2f}s "
+            f"utilization={stats['utilization']:.0%} tail_idle={stats['tail_idle_s']:.2f}s/worker"
+        )
+    if len(stats_list) == 2 and stats_list[0]["makespan_s"] > 0:
+        print(f"  speedup vs per-document: {stats_list[1]['makespan_s'] / stats_list[0]['makespan_s']:.2f}x")
+
+    print()
+    print(f"  {'job':<40s} {'pages':>6s} {'ranges':>7s} {'start s':>8s} {'end s':>8s}  method")
+    for job in sorted(stats_list[0]["jobs"], key=lambda j: j["finished_s"]):
+        method = job["method"] if job["error"] is None else f"ERROR {job['error']}"
+        print(
+            f"  {job['job']:<40s} {job['pages']:>6d} {job['ranges']:>7d} "
+            f"{job['started_s']:>8.2f} {job['finished_s']:>8.2f}  {method}"
+        )
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="文書をページ範囲に分けてワークスティーリングで並列抽出する"
+    )
+    parser.add_argument(
+        "output_dir",
+        nargs="?",
+        default=None,
+        help="docs/datasheet/output/ ディレクトリのパス（省略時は自動検出）",
+    )
+    parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="ワーカープロセス数。デフォルト: CPU数",
+    )
+    parser.add_argument(
+        "--pages-per-task",
+        type=int,
+        default=DEFAULT_PAGES_PER_TASK,
+        help=f"1範囲タスクのページ数。デフォルト: {DEFAULT_PAGES_PER_TASK}",
+    )
+    parser.add_argument(
+        "--kinds",
+        default=",".join(TASK_KINDS),
+        help=f"抽出の種類（カンマ区切り）。デフォルト: {','.join(TASK_KINDS)}",
+    )
+    parser.add_argument(
+        "--datasheets",
+        default=None,
+        help="対象のデータシートID（カンマ区切り）。省略時は全件",
+    )
+    parser.add_argument(
+        "--text-strategies",
+        default=DEFAULT_STRATEGIES["text"],
+        help=f"テキスト抽出の戦略（カンマ区切り）。デフォルト: {DEFAULT_STRATEGIES['text']}",
+    )
+    parser.add_argument(
+        "--table-strategies",
+        default=DEFAULT_STRATEGIES["tables"],
+        help=f"表抽出の戦略（カンマ区切り）。デフォルト: {DEFAULT_STRATEGIES['tables']}",
+    )
+    parser.add_argument(
+        "--ocr-cache",
+        default=None,
+        help="OCR結果のキャッシュディレクトリ",
+    )
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help="結合結果を <id>.txt / <id>.tables.json とメタ情報 JSON に書き出す",
+    )
+    parser.add_argument(
+        "--compare-per-document",
+        action="store_true",
+        help="文書単位の並列でも実行して処理時間を比較する",
+    )
+    parser.add_argument("--output", "-o", default=None, help="統計の JSON 出力パス")
+    parser.add_argument("--verbose", "-v", action="store_true", help="盗みの詳細をログに出す")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    output_dir = args.output_dir or str(SCRIPT_DIR.parent / "output")
+    kinds = [s.strip() for s in args.kinds.split(",") if s.strip()]
+    unknown = [k for k in kinds if k not in TASK_KINDS]
+    if unknown:
+        parser.error(f"Unknown kind(s): {unknown}. Available: {TASK_KINDS}")
+    pdfs = find_pdfs(output_dir)
+    if args.datasheets:
+        wanted = {s.strip() for s in args.datasheets.split(",") if s.strip()}
+        pdfs = [(datasheet_id, path) for datasheet_id, path in pdfs if datasheet_id in wanted]
+    if not pdfs:
+        print(f"No PDFs found in {output_dir}")
+        sys.exit(1)
+
+    strategies = {
+        "text": [s.strip() for s in args.text_strategies.split(",") if s.strip()],
+        "tables": [s.strip() for s in args.table_strategies.split(",") if s.strip()],
+    }
+    strategy_options = {"ocr": {"ocr_cache_dir": args.ocr_cache}}
+    workers = max(args.workers, 1)
+    writer_id = f"page_scheduler.{os.getpid()}"
+
+    def write(job: Job) -> None:
+        if job.result is None:
+            return
+        if job.kind == "text":
+            write_text_output(job.pdf_path, job.result, strategies["text"], len(job.ranges), writer_id)
+        else:
+            write_tables_output(
+                job.pdf_path, job.result, strategies["tables"], QUALITY_THRESHOLDS["tables"],
+                len(job.ranges), writer_id,
+            )
+
+    stats_list = []
+    jobs = build_jobs(pdfs, kinds, args.pages_per_task)
+    print(
+        f"Scheduling {len(jobs)} job(s), {sum(j.page_count for j in jobs)} page(s), "
+        f"{sum(len(j.ranges) for j in jobs)} range task(s) on {workers} worker(s)"
+    )
+    stats_list.append(run_schedule(
+        WorkStealingScheduler(jobs, workers), jobs, workers, strategies, strategy_options,
+        on_job_done=write if args.write else None,
+    ))
+    if args.compare_per_document:
+        baseline_jobs = build_jobs(pdfs, kinds, 0)
+        stats_list.append(run_schedule(
+            PerDocumentScheduler(baseline_jobs, workers), baseline_jobs, workers, strategies,
+            strategy_options,
+        ))
+
+    print_report(stats_list)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(stats_list, f, ensure_ascii=False, indent=2)
+        print(f"Schedule statistics written to: {args.output}")
+    if any(job["error"] for job in stats_list[0]["jobs"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
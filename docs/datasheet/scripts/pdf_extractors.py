@@ -11,9 +11,16 @@ from __future__ import annotations
 import logging
 import time
 from dataclasses import dataclass, field
+from typing import Callable
+
+from resource_usage import ResourceUsage, measure_resources
+from timing_spans import SpanRecorder
 
 logger = logging.getLogger(__name__)
 
+# ページ処理完了ごとに (ページ番号 1始まり, ページテキスト) で呼ばれるコールバック
+TextPageCallback = Callable[[int, str], None]
+
 
 # =====================================================================
 # 共通データクラス
@@ -31,6 +38,8 @@ class ExtractionResult:
     warnings: list[str] = field(default_factory=list)  # 警告メッセージ
     page_texts: list[str] = field(default_factory=list)  # ページ別テキスト
     elapsed_ms: int = 0  # 処理時間 (ms)
+    spans: SpanRecorder = field(default_factory=SpanRecorder)  # ページ・段階別の所要時間
+    usage: ResourceUsage = field(default_factory=ResourceUsage)  # CPU・メモリ・I/O・ページ数
 
 
 # =====================================================================
@@ -38,10 +47,11 @@ class ExtractionResult:
 # =====================================================================
 
 
-def extract_pymupdf(pdf_path: str) -> ExtractionResult:
+def extract_pymupdf(pdf_path: str, on_page: TextPageCallback | None = None) -> ExtractionResult:
     """
     PyMuPDF (fitz) を使ったテキスト抽出。
     既存方式の改良版: フォント情報からエンコーディング問題を検出する。
+    on_page を指定した場合、ページ処理完了ごとに (ページ番号, テキスト) で呼ぶ。
     """
     try:
         import fitz  # pymupdf
@@ -50,16 +60,21 @@ def extract_pymupdf(pdf_path: str) -> ExtractionResult:
 
     start = time.time()
     warnings: list[str] = []
+    spans = SpanRecorder()
 
-    doc = fitz.open(pdf_path)
+    with spans.span("open"):
+        doc = fitz.open(pdf_path)
     page_texts: list[str] = []
 
     for page_num in range(len(doc)):
+        page_start = time.perf_counter()
         page = doc[page_num]
-        text = page.get_text("text")
+        with spans.span("get_text", page_num + 1):
+            text = page.get_text("text")
         page_texts.append(text)
 
         # フォント情報をチェックしてエンコーディング問題を検出
+        font_start = time.perf_counter()
         try:
             font_list = page.get_fonts(full=True)
             for font in font_list:
@@ -81,6 +96,11 @@ def extract_pymupdf(pdf_path: str) -> ExtractionResult:
                         )
         except Exception as e:
             warnings.append(f"Page {page_num + 1}: font check failed: {e}")
+        spans.add("font_check", font_start, page_num + 1)
+        spans.add("page", page_start, page_num + 1)
+
+        if on_page is not None:
+            on_page(page_num + 1, text)
 
     doc.close()
 
@@ -95,6 +115,7 @@ def extract_pymupdf(pdf_path: str) -> ExtractionResult:
         warnings=warnings,
         page_texts=page_texts,
         elapsed_ms=elapsed_ms,
+        spans=spans,
     )
 
 
@@ -103,10 +124,11 @@ def extract_pymupdf(pdf_path: str) -> ExtractionResult:
 # =====================================================================
 
 
-def extract_pdfminer(pdf_path: str) -> ExtractionResult:
+def extract_pdfminer(pdf_path: str, on_page: TextPageCallback | None = None) -> ExtractionResult:
     """
     pdfminer.six を使ったテキスト抽出。
     CMap/ToUnicode/フォントエンコーディング処理が PyMuPDF より強い。
+    on_page を指定した場合、ページ処理完了ごとに (ページ番号, テキスト) で呼ぶ。
     """
     try:
         from pdfminer.layout import LAParams
@@ -123,6 +145,8 @@ def extract_pdfminer(pdf_path: str) -> ExtractionResult:
     start = time.time()
     warnings: list[str] = []
     page_texts: list[str] = []
+    spans = SpanRecorder()
+    pages_skipped = 0
 
     laparams = LAParams(
         line_margin=0.5,
@@ -136,12 +160,15 @@ def extract_pdfminer(pdf_path: str) -> ExtractionResult:
         rsrcmgr = PDFResourceManager()
 
         with open(pdf_path, "rb") as f:
+            # ページの解析はイテレーション中に行われるため、前ページの完了から計る
+            page_start = time.perf_counter()
             for page_num, page in enumerate(PDFPage.get_pages(f)):
                 try:
                     output = io.StringIO()
                     device = TextConverter(rsrcmgr, output, laparams=laparams)
                     interpreter = PDFPageInterpreter(rsrcmgr, device)
-                    interpreter.process_page(page)
+                    with spans.span("process_page", page_num + 1):
+                        interpreter.process_page(page)
                     device.close()
                     page_text = output.getvalue()
                     page_texts.append(page_text)
@@ -150,6 +177,11 @@ def extract_pdfminer(pdf_path: str) -> ExtractionResult:
                         f"Page {page_num + 1}: pdfminer extraction failed: {e}"
                     )
                     page_texts.append("")
+                    pages_skipped += 1
+                spans.add("page", page_start, page_num + 1)
+                if on_page is not None:
+                    on_page(page_num + 1, page_texts[-1])
+                page_start = time.perf_counter()
 
     except Exception as e:
         raise RuntimeError(f"pdfminer extraction failed: {e}") from e
@@ -165,6 +197,8 @@ def extract_pdfminer(pdf_path: str) -> ExtractionResult:
         warnings=warnings,
         page_texts=page_texts,
         elapsed_ms=elapsed_ms,
+        spans=spans,
+        usage=ResourceUsage(pages_skipped=pages_skipped),
     )
 
 
@@ -173,60 +207,48 @@ def extract_pdfminer(pdf_path: str) -> ExtractionResult:
 # =====================================================================
 
 
-def extract_ocr(pdf_path: str, dpi: int = 300, lang: str = "eng") -> ExtractionResult:
+def extract_ocr(
+    pdf_path: str,
+    dpi: int = 300,
+    lang: str = "eng",
+    ocr_cache_dir: str | None = None,
+    on_page: TextPageCallback | None = None,
+) -> ExtractionResult:
     """
     OCRによるテキスト抽出。
     PyMuPDFでページを画像化し、pytesseractでOCRする。
     Tesseractが未インストールの場合はエラーを返す。
+
+    画像化と OCR は pdf_ocr.ocr_document に委譲し、表抽出の OCR 戦略と
+    結果を共有する（ocr_cache_dir 指定時はプロセス間でも共有）。
+    on_page を指定した場合、各ページの OCR 完了ごとに (ページ番号, テキスト) で呼ぶ。
     """
-    try:
-        import fitz  # pymupdf
-    except ImportError:
-        raise RuntimeError("pymupdf is required. Install with: pip install pymupdf")
+    from pdf_ocr import check_ocr_available, ocr_document
 
-    try:
-        import pytesseract
-        from PIL import Image
-    except ImportError:
-        raise RuntimeError(
-            "pytesseract and Pillow are required. "
-            "Install with: pip install pytesseract Pillow\n"
-            "Also ensure Tesseract OCR is installed on the system."
-        )
-
-    # Tesseract の存在確認
-    try:
-        pytesseract.get_tesseract_version()
-    except Exception:
-        raise RuntimeError(
-            "Tesseract OCR is not installed or not found in PATH. "
-            "Install from: https://github.com/tesseract-ocr/tesseract"
-        )
+    check_ocr_available()
 
     start = time.time()
     warnings: list[str] = []
     page_texts: list[str] = []
-
-    doc = fitz.open(pdf_path)
-    zoom = dpi / 72  # 72 DPI がデフォルト
-    matrix = fitz.Matrix(zoom, zoom)
-
-    for page_num in range(len(doc)):
-        try:
-            page = doc[page_num]
-            pix = page.get_pixmap(matrix=matrix)
-
-            # PyMuPDF pixmap → PIL Image
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-
-            # OCR実行
-            page_text = pytesseract.image_to_string(img, lang=lang)
-            page_texts.append(page_text)
-        except Exception as e:
-            warnings.append(f"Page {page_num + 1}: OCR failed: {e}")
-            page_texts.append("")
-
-    doc.close()
+    spans = SpanRecorder()
+    pages_skipped = 0
+    page_start = time.perf_counter()
+
+    def page_done(page_num: int, ocr_page) -> None:
+        # 画像化 + OCR は ocr_document 内で行われるため、前ページの完了から計る
+        nonlocal page_start
+        spans.add("page", page_start, page_num)
+        if on_page is not None:
+            on_page(page_num, ocr_page.text)
+        page_start = time.perf_counter()
+
+    for page_num, ocr_page in enumerate(
+        ocr_document(pdf_path, dpi=dpi, lang=lang, cache_dir=ocr_cache_dir, on_page=page_done)
+    ):
+        if ocr_page.error:
+            warnings.append(f"Page {page_num + 1}: OCR failed: {ocr_page.error}")
+            pages_skipped += 1
+        page_texts.append(ocr_page.text)
 
     elapsed_ms = int((time.time() - start) * 1000)
     full_text = "\n".join(page_texts)
@@ -239,6 +261,8 @@ def extract_ocr(pdf_path: str, dpi: int = 300, lang: str = "eng") -> ExtractionR
         warnings=warnings,
         page_texts=page_texts,
         elapsed_ms=elapsed_ms,
+        spans=spans,
+        usage=ResourceUsage(pages_skipped=pages_skipped),
     )
 
 
@@ -253,8 +277,17 @@ STRATEGIES = {
 }
 
 
-def run_strategy(name: str, pdf_path: str) -> ExtractionResult:
-    """名前指定で抽出戦略を実行する。"""
+def run_strategy(name: str, pdf_path: str, **options) -> ExtractionResult:
+    """
+    名前指定で抽出戦略を実行する。
+    options は戦略関数へそのまま渡す（例: ocr の ocr_cache_dir）。
+    結果の usage に CPU 時間・ピーク RSS 増分・読み込みバイト数・ページ数を記録する。
+    """
     if name not in STRATEGIES:
         raise ValueError(f"Unknown strategy: {name}. Available: {list(STRATEGIES.keys())}")
-    return STRATEGIES[name](pdf_path)
+    with measure_resources() as usage:
+        result = STRATEGIES[name](pdf_path, **options)
+    usage.pages_skipped = result.usage.pages_skipped
+    usage.pages_processed = result.page_count - usage.pages_skipped
+    result.usage = usage
+    return result
@@ -0,0 +1,232 @@
+"""
+OCR 共通処理 (PyMuPDF 画像化 + pytesseract)
+
+テキスト抽出 (pdf_extractors.extract_ocr) と表抽出
+(pdf_table_extractor.extract_tables_ocr) で同じページ画像・OCR結果を共有する。
+ページの画像化と Tesseract の実行は1ページにつき1回だけ行い、
+テキストと単語座標 (TSV) を同時に取得する。
+
+結果はプロセス内でキャッシュし、cache_dir を指定した場合はディスクにも保存して
+別プロセス（extract_pdf_text.py と extract_tables.py）の間でも再利用する。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# プロセス内キャッシュに保持する文書数
+OCR_CACHE_SIZE = 2
+
+_ocr_cache: "OrderedDict[tuple, list[OcrPage]]" = OrderedDict()
+
+
+@dataclass
+class OcrPage:
+    """1ページ分の OCR 結果。"""
+
+    text: str = ""  # image_to_string 相当のページテキスト
+    # 単語座標 (PDF座標系 pt)。PyMuPDF の get_text("words") と同じ並び:
+    # (x0, y0, x1, y1, word, block_no, line_no, word_no)
+    words: list[tuple] = field(default_factory=list)
+    error: str = ""  # OCR 失敗時のエラーメッセージ
+
+
+def check_ocr_available() -> None:
+    """OCR に必要なライブラリと Tesseract 本体の存在を確認する。"""
+    try:
+        import fitz  # noqa: F401  pymupdf
+    except ImportError:
+        raise RuntimeError("pymupdf is required. Install with: pip install pymupdf")
+
+    try:
+        import pytesseract
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        raise RuntimeError(
+            "pytesseract and Pillow are required. "
+            "Install with: pip install pytesseract Pillow\n"
+            "Also ensure Tesseract OCR is installed on the system."
+        )
+
+    # Tesseract の存在確認
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception:
+        raise RuntimeError(
+            "Tesseract OCR is not installed or not found in PATH. "
+            "Install from: https://github.com/tesseract-ocr/tesseract"
+        )
+
+
+def _parse_tsv_words(tsv: str, scale: float) -> list[tuple]:
+    """
+    Tesseract の TSV 出力から単語座標を取り出す。
+
+    Args:
+        tsv: image_to_data 形式の TSV
+        scale: 画像ピクセル → PDF座標 (pt) の変換係数
+    """
+    words: list[tuple] = []
+    line_ids: dict[tuple[str, str, str], int] = {}
+    lines = tsv.splitlines()
+    if not lines:
+        return words
+    header = lines[0].split("\t")
+    col = {name: i for i, name in enumerate(header)}
+    for line in lines[1:]:
+        cells = line.split("\t")
+        if len(cells) < len(header) or cells[col["level"]] != "5":
+            continue
+        text = cells[col["text"]].strip()
+        if not text:
+            continue
+        left = int(cells[col["left"]])
+        top = int(cells[col["top"]])
+        width = int(cells[col["width"]])
+        height = int(cells[col["height"]])
+        block = cells[col["block_num"]]
+        line_key = (block, cells[col["par_num"]], cells[col["line_num"]])
+        line_no = line_ids.setdefault(line_key, len(line_ids))
+        words.append((
+            left * scale,
+            top * scale,
+            (left + width) * scale,
+            (top + height) * scale,
+            text,
+            int(block),
+            line_no,
+            int(cells[col["word_num"]]),
+        ))
+    return words
+
+
+def _ocr_image(img, lang: str) -> tuple[str, str]:
+    """1枚の画像に Tesseract を1回だけ実行し、(テキスト, TSV) を返す。"""
+    import pytesseract
+
+    if hasattr(pytesseract, "run_and_get_multiple_output"):
+        text, tsv = pytesseract.run_and_get_multiple_output(
+            img, extensions=["txt", "tsv"], lang=lang
+        )
+        return text, tsv
+    # 古い pytesseract: 2回実行になるが結果は同じ
+    return (
+        pytesseract.image_to_string(img, lang=lang),
+        pytesseract.image_to_data(img, lang=lang),
+    )
+
+
+def _disk_cache_path(pdf_path: str, dpi: int, lang: str, cache_dir: str) -> str:
+    """PDF内容のハッシュと OCR 設定からディスクキャッシュのパスを作る。"""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return os.path.join(cache_dir, f"{digest.hexdigest()[:16]}-{dpi}-{lang}.ocr.json")
+
+
+def ocr_document(
+    pdf_path: str,
+    dpi: int = 300,
+    lang: str = "eng",
+    cache_dir: str | None = None,
+    on_page: "Callable[[int, OcrPage], None] | None" = None,
+) -> list[OcrPage]:
+    """
+    PDF の全ページを画像化して OCR し、ページごとのテキストと単語座標を返す。
+
+    同じ (PDF, dpi, lang) の結果はプロセス内でキャッシュされる。
+    cache_dir を指定した場合はディスクキャッシュも読み書きする。
+    ページ単位の OCR 失敗は OcrPage.error に記録し、例外にはしない。
+    on_page を指定した場合、各ページの完了ごとに (ページ番号 1始まり, OcrPage) で呼ぶ
+    （キャッシュヒット時はキャッシュ済みの全ページについて続けて呼ぶ）。
+    """
+    stat = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size, dpi, lang)
+    if key in _ocr_cache:
+        _ocr_cache.move_to_end(key)
+        logger.debug(f"OCR cache hit (memory): {pdf_path}")
+        return _replay(_ocr_cache[key], on_page)
+
+    disk_path = None
+    if cache_dir:
+        disk_path = _disk_cache_path(pdf_path, dpi, lang, cache_dir)
+        if os.path.exists(disk_path):
+            logger.debug(f"OCR cache hit (disk): {disk_path}")
+            with open(disk_path, encoding="utf-8") as f:
+                pages = [
+                    OcrPage(text=p["text"], words=[tuple(w) for w in p["words"]], error=p["error"])
+                    for p in json.load(f)
+                ]
+            _remember(key, pages)
+            return _replay(pages, on_page)
+
+    check_ocr_available()
+    import fitz  # pymupdf
+    from PIL import Image
+
+    pages: list[OcrPage] = []
+    zoom = dpi / 72  # 72 DPI がデフォルト
+    matrix = fitz.Matrix(zoom, zoom)
+
+    doc = fitz.open(pdf_path)
+    try:
+        for page_num in range(len(doc)):
+            try:
+                page = doc[page_num]
+                pix = page.get_pixmap(matrix=matrix)
+
+                # PyMuPDF pixmap → PIL Image
+                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+                # OCR実行 (テキストと単語座標を1回で取得)
+                text, tsv = _ocr_image(img, lang)
+                pages.append(OcrPage(text=text, words=_parse_tsv_words(tsv, 1 / zoom)))
+            except Exception as e:
+                pages.append(OcrPage(error=str(e)))
+            if on_page is not None:
+                on_page(page_num + 1, pages[-1])
+    finally:
+        doc.close()
+
+    # ページ単位の失敗を含む結果はディスクには保存しない
+    if disk_path and not any(p.error for p in pages):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{disk_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(p) for p in pages], f, ensure_ascii=False)
+        os.replace(tmp_path, disk_path)
+
+    _remember(key, pages)
+    return pages
+
+
+def _replay(
+    pages: list[OcrPage], on_page: "Callable[[int, OcrPage], None] | None"
+) -> list[OcrPage]:
+    """キャッシュ済みの結果について on_page を順に呼ぶ。"""
+    if on_page is not None:
+        for page_num, page in enumerate(pages, start=1):
+            on_page(page_num, page)
+    return pages
+
+
+def clear_ocr_cache() -> None:
+    """プロセス内の OCR キャッシュを破棄する（ベンチマークの反復計測用）。"""
+    _ocr_cache.clear()
+
+
+def _remember(key: tuple, pages: list[OcrPage]) -> None:
+    """プロセス内キャッシュに登録し、上限を超えた古い文書を捨てる。"""
+    _ocr_cache[key] = pages
+    _ocr_cache.move_to_end(key)
+    while len(_ocr_cache) > OCR_CACHE_SIZE:
+        _ocr_cache.popitem(last=False)
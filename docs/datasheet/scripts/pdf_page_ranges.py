@@ -0,0 +1,286 @@
+"""
+ページ範囲単位の抽出と結果の結合
+
+大きな PDF をページ範囲ごとのタスクに分けて別々のワーカーで抽出し、
+ページ順に1つの結果へ戻すための共通処理。
+
+抽出戦略はどれも PDF 全体を処理する作りなので、ページ範囲だけを含む
+一時 PDF を PyMuPDF で書き出して既存のフォールバック抽出をそのまま実行し、
+テーブルのページ番号・警告・タイミングのページ番号を元の PDF の番号に戻す。
+フォールバックの判定（品質閾値による早期終了）はページ範囲ごとに行う。
+
+結果は work_queue.py がファイルでやり取りできるよう、JSON 用の辞書との
+相互変換も提供する。
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Iterator
+
+from pdf_extractors import ExtractionResult
+from pdf_quality import evaluate_quality
+from pdf_table_extractor import ExtractedTable, TableExtractionResult
+from resource_usage import ResourceUsage
+from timing_spans import Span, SpanRecorder
+
+# 警告メッセージ先頭のページ番号 ("Page 12: ...")
+_PAGE_WARNING_RE = re.compile(r"^Page (\d+)")
+
+
+def count_pages(pdf_path: str) -> int:
+    """PDF のページ数。"""
+    import fitz  # pymupdf
+
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+def split_page_ranges(page_count: int, pages_per_task: int) -> list[tuple[int, int]]:
+    """
+    1..page_count を pages_per_task ページずつの (先頭, 末尾) に分ける（1始まり、両端含む）。
+    pages_per_task が 0 以下なら文書全体を1つの範囲にする。
+    """
+    if page_count <= 0:
+        return [(1, 0)]
+    if pages_per_task <= 0:
+        return [(1, page_count)]
+    return [
+        (first, min(first + pages_per_task - 1, page_count))
+        for first in range(1, page_count + 1, pages_per_task)
+    ]
+
+
+@contextmanager
+def page_range_pdf(pdf_path: str, first: int, last: int) -> Iterator[str]:
+    """
+    first..last ページだけを含む一時 PDF のパスを返す。
+    範囲が文書全体なら元の PDF をそのまま使う。
+    """
+    import fitz  # pymupdf
+
+    with fitz.open(pdf_path) as src:
+        whole = first <= 1 and last >= len(src)
+        if not whole:
+            fd, subset_path = tempfile.mkstemp(
+                prefix=f"{os.path.splitext(os.path.basename(pdf_path))[0]}.p{first}-{last}.",
+                suffix=".pdf",
+            )
+            os.close(fd)
+            with fitz.open() as subset:
+                subset.insert_pdf(src, from_page=first - 1, to_page=last - 1)
+                subset.save(subset_path)
+    if whole:
+        yield pdf_path
+        return
+    try:
+        yield subset_path
+    finally:
+        os.unlink(subset_path)
+
+
+def _offset_warnings(warnings: list[str], offset: int) -> list[str]:
+    if not offset:
+        return list(warnings)
+    return [
+        _PAGE_WARNING_RE.sub(lambda m: f"Page {int(m.group(1)) + offset}", w, count=1)
+        for w in warnings
+    ]
+
+
+def _offset_spans(spans: SpanRecorder, offset: int) -> SpanRecorder:
+    recorder = SpanRecorder(origin=spans.origin)
+    recorder.spans = [
+        Span(s.name, s.start_ms, s.duration_ms, s.page + offset if s.page is not None else None)
+        for s in spans.spans
+    ]
+    return recorder
+
+
+def extract_text_range(
+    pdf_path: str,
+    first: int,
+    last: int,
+    strategies: list[str] | None = None,
+    quality_threshold: float = 0.8,
+    strategy_options: dict[str, dict] | None = None,
+) -> ExtractionResult:
+    """first..last ページのテキストを extract_pdf_text.py と同じフォールバックで抽出する。"""
+    from extract_pdf_text import extract_with_fallback
+
+    with page_range_pdf(pdf_path, first, last) as path:
+        result = extract_with_fallback(
+            path, strategies=strategies, quality_threshold=quality_threshold,
+            strategy_options=strategy_options,
+        )
+    result.warnings = _offset_warnings(result.warnings, first - 1)
+    result.spans = _offset_spans(result.spans, first - 1)
+    return result
+
+
+def extract_tables_range(
+    pdf_path: str,
+    first: int,
+    last: int,
+    strategies: list[str] | None = None,
+    quality_threshold: float = 0.6,
+    strategy_options: dict[str, dict] | None = None,
+) -> TableExtractionResult:
+    """first..last ページの表を extract_tables.py と同じフォールバックで抽出する。"""
+    from extract_tables import extract_with_fallback
+
+    with page_range_pdf(pdf_path, first, last) as path:
+        result = extract_with_fallback(
+            path, strategies=strategies, quality_threshold=quality_threshold,
+            strategy_options=strategy_options,
+        )
+    for table in result.tables:
+        table.page += first - 1
+        table.warnings = _offset_warnings(table.warnings, first - 1)
+    result.warnings = _offset_warnings(result.warnings, first - 1)
+    result.spans = _offset_spans(result.spans, first - 1)
+    return result
+
+
+# =====================================================================
+# 結合
+# =====================================================================
+
+
+def _merged_method(methods: list[str]) -> str:
+    """範囲ごとに採用された方式名を、出現順の重複なしで "+" 連結する。"""
+    return "+".join(dict.fromkeys(m for m in methods if m)) or "none"
+
+
+def _merged_usage(usages: list[ResourceUsage]) -> ResourceUsage:
+    peaks = [u.peak_rss_delta_mb for u in usages if u.peak_rss_delta_mb is not None]
+    reads = [u.bytes_read for u in usages]
+    return ResourceUsage(
+        cpu_ms=sum(u.cpu_ms for u in usages),
+        peak_rss_delta_mb=max(peaks) if peaks else None,
+        bytes_read=None if not reads or None in reads else sum(reads),
+        pages_processed=sum(u.pages_processed for u in usages),
+        pages_skipped=sum(u.pages_skipped for u in usages),
+    )
+
+
+def _merged_spans(recorders: list[SpanRecorder]) -> SpanRecorder:
+    merged = SpanRecorder()
+    for recorder in recorders:
+        merged.spans.extend(recorder.spans)
+    return merged
+
+
+def merge_text_results(parts: list[ExtractionResult]) -> ExtractionResult:
+    """ページ順に並んだ範囲ごとのテキスト抽出結果を1つにまとめ、品質を付け直す。"""
+    page_texts = [text for part in parts for text in part.page_texts]
+    text = "\n".join(page_texts)
+    return ExtractionResult(
+        text=text,
+        method=_merged_method([p.method for p in parts]),
+        page_count=sum(p.page_count for p in parts),
+        quality_score=evaluate_quality(text, page_texts),
+        warnings=[w for p in parts for w in p.warnings],
+        page_texts=page_texts,
+        elapsed_ms=sum(p.elapsed_ms for p in parts),
+        spans=_merged_spans([p.spans for p in parts]),
+        usage=_merged_usage([p.usage for p in parts]),
+    )
+
+
+def merge_table_results(parts: list[TableExtractionResult]) -> TableExtractionResult:
+    """ページ順に並んだ範囲ごとの表抽出結果を1つにまとめる。"""
+    return TableExtractionResult(
+        tables=[table for part in parts for table in part.tables],
+        method=_merged_method([p.method for p in parts]),
+        page_count=sum(p.page_count for p in parts),
+        elapsed_ms=sum(p.elapsed_ms for p in parts),
+        warnings=[w for p in parts for w in p.warnings],
+        spans=_merged_spans([p.spans for p in parts]),
+        usage=_merged_usage([p.usage for p in parts]),
+    )
+
+
+# =====================================================================
+# JSON 変換
+# =====================================================================
+
+
+def _spans_from_list(items: list[dict]) -> SpanRecorder:
+    recorder = SpanRecorder()
+    recorder.spans = [Span(**item) for item in items]
+    return recorder
+
+
+def text_result_to_dict(result: ExtractionResult) -> dict:
+    """範囲ごとのテキスト抽出結果を JSON 用の辞書にする。"""
+    return {
+        "method": result.method,
+        "page_count": result.page_count,
+        "quality_score": result.quality_score,
+        "warnings": result.warnings,
+        "page_texts": result.page_texts,
+        "elapsed_ms": result.elapsed_ms,
+        "spans": [asdict(s) for s in result.spans.spans],
+        "usage": asdict(result.usage),
+    }
+
+
+def text_result_from_dict(data: dict) -> ExtractionResult:
+    return ExtractionResult(
+        text="\n".join(data["page_texts"]),
+        method=data["method"],
+        page_count=data["page_count"],
+        quality_score=data["quality_score"],
+        warnings=data["warnings"],
+        page_texts=data["page_texts"],
+        elapsed_ms=data["elapsed_ms"],
+        spans=_spans_from_list(data["spans"]),
+        usage=ResourceUsage(**data["usage"]),
+    )
+
+
+def table_result_to_dict(result: TableExtractionResult) -> dict:
+    """範囲ごとの表抽出結果を JSON 用の辞書にする（テーブルは生の行列で持つ）。"""
+    return {
+        "method": result.method,
+        "page_count": result.page_count,
+        "elapsed_ms": result.elapsed_ms,
+        "warnings": result.warnings,
+        "tables": [
+            {
+                "page": t.page,
+                "title": t.title,
+                "headers": t.headers,
+                "raw_rows": t.raw_rows,
+                "quality_score": t.quality_score,
+                "method": t.method,
+                "warnings": t.warnings,
+            }
+            for t in result.tables
+        ],
+        "spans": [asdict(s) for s in result.spans.spans],
+        "usage": asdict(result.usage),
+    }
+
+
+def table_result_from_dict(data: dict) -> TableExtractionResult:
+    return TableExtractionResult(
+        tables=[
+            ExtractedTable.from_rows(
+                t["page"], t["headers"], t["raw_rows"], title=t["title"],
+                quality_score=t["quality_score"], method=t["method"], warnings=t["warnings"],
+            )
+            for t in data["tables"]
+        ],
+        method=data["method"],
+        page_count=data["page_count"],
+        elapsed_ms=data["elapsed_ms"],
+        warnings=data["warnings"],
+        spans=_spans_from_list(data["spans"]),
+        usage=ResourceUsage(**data["usage"]),
+    )
@@ -7,14 +7,27 @@ Min/Max/Typ/Unit 等の列対応を正確に復元する。
 
 Strategy A: pdfplumber (PDF内部座標から罫線・セル境界を推定)
 Strategy B: PyMuPDF page.find_tables() (ビルトイン表検出)
+Strategy C: テキスト配置ベース (PyMuPDF 単語座標を NumPy でクラスタリング)
+Strategy D: OCR (テキスト抽出と共有の OCR 単語座標を Strategy C と同じ手法で表に復元)
 """
 
 from __future__ import annotations
 
+import bisect
+import functools
+import gc
 import logging
 import re
 import time
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from resource_usage import ResourceUsage, current_rss_mb, measure_resources
+from timing_spans import SpanRecorder
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -24,31 +37,130 @@ logger = logging.getLogger(__name__)
 # =====================================================================
 
 
+class TableRowsView(Sequence):
+    """
+    ExtractedTable の列データを {header: value} の行として見せる遅延ビュー。
+
+    行辞書は要素アクセス時に都度組み立て、保持しない。
+    値には単語連結の修正 (_fix_concatenated_words) を適用する。
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self, table: "ExtractedTable"):
+        self._table = table
+
+    def __len__(self) -> int:
+        return self._table.num_rows
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("row index out of range")
+        return self._table.row_dict(idx)
+
+
 @dataclass
 class ExtractedTable:
-    """抽出された1テーブルの構造化データ。"""
+    """
+    抽出された1テーブルの構造化データ。
+
+    セル値は列ごとの配列 (columns) に1回だけ保持する。
+    列数は max(ヘッダー数, 最大行長) で、短い行は "" で埋めて
+    元の行長を row_lengths に記録する（全行が同じ長さなら None）。
+    行辞書 (rows) と生の行列 (raw_rows) は columns から導出するビュー。
+    """
 
     page: int  # ページ番号 (1-indexed)
     title: str = ""  # テーブルタイトル (検出できた場合)
     headers: list[str] = field(default_factory=list)  # ヘッダー行
-    rows: list[dict[str, str]] = field(default_factory=list)  # 各行 {col_name: value}
-    raw_rows: list[list[str]] = field(default_factory=list)  # 生の行列データ
+    columns: list[list[str]] = field(default_factory=list)  # 列ごとの生の値配列
+    row_lengths: list[int] | None = None  # 各行の元のセル数 (不揃いな場合のみ)
     quality_score: float = 0.0  # 0.0-1.0
-    method: str = ""  # "pdfplumber" | "pymupdf"
+    method: str = ""  # "pdfplumber" | "pymupdf" | "textalign" | "ocr"
     warnings: list[str] = field(default_factory=list)
 
-    def to_dict(self) -> dict:
-        """JSON シリアライズ用の辞書表現。"""
+    @classmethod
+    def from_rows(cls, page: int, headers: list[str], raw_rows: list[list[str]], **kwargs) -> "ExtractedTable":
+        """行形式の生データから列形式のテーブルを構築する。"""
+        width = max([len(headers)] + [len(r) for r in raw_rows])
+        lengths = [len(r) for r in raw_rows]
+        columns = [
+            [row[c] if c < len(row) else "" for row in raw_rows]
+            for c in range(width)
+        ]
+        return cls(
+            page=page,
+            headers=headers,
+            columns=columns,
+            row_lengths=None if all(n == width for n in lengths) else lengths,
+            **kwargs,
+        )
+
+    @property
+    def num_rows(self) -> int:
+        """データ行数。"""
+        return len(self.columns[0]) if self.columns else 0
+
+    def row_dict(self, idx: int) -> dict[str, str]:
+        """idx 行目を {header: value} の辞書として返す。"""
+        n = self.row_lengths[idx] if self.row_lengths is not None else len(self.columns)
         return {
+            header: _fix_concatenated_words(self.columns[c][idx]) if c < n else ""
+            for c, header in enumerate(self.headers)
+        }
+
+    def column_values(self, idx: int) -> list[str]:
+        """idx 列目の値（単語連結の修正済み、ヘッダー列のみ）を返す。"""
+        if self.row_lengths is None:
+            return [_fix_concatenated_words(v) for v in self.columns[idx]]
+        return [
+            _fix_concatenated_words(v) if idx < n else ""
+            for v, n in zip(self.columns[idx], self.row_lengths)
+        ]
+
+    @property
+    def rows(self) -> TableRowsView:
+        """各行 {col_name: value} の遅延ビュー。"""
+        return TableRowsView(self)
+
+    @property
+    def raw_rows(self) -> list[list[str]]:
+        """生の行列データ（元の行長のまま）。"""
+        rows = [list(r) for r in zip(*self.columns)]
+        if self.row_lengths is not None:
+            rows = [r[:n] for r, n in zip(rows, self.row_lengths)]
+        return rows
+
+    def to_dict(self, columnar: bool = False) -> dict:
+        """
+        JSON シリアライズ用の辞書表現。
+
+        columnar=True の場合は rows/raw_rows の代わりに、ヘッダー順の
+        列配列 (columns) のみを出力する。値は rows と同じく修正済み。
+        """
+        data: dict = {
             "page": self.page,
             "title": self.title,
             "headers": self.headers,
-            "rows": self.rows,
-            "raw_rows": self.raw_rows,
-            "quality_score": self.quality_score,
-            "method": self.method,
-            "warnings": self.warnings,
         }
+        if columnar:
+            data["columns"] = [self.column_values(c) for c in range(len(self.headers))]
+        else:
+            data["rows"] = list(self.rows)
+            data["raw_rows"] = self.raw_rows
+        data["quality_score"] = self.quality_score
+        data["method"] = self.method
+        data["warnings"] = self.warnings
+        return data
+
+
+# ページ単位の進捗通知: (ページ番号 1-indexed, そのページで抽出したテーブル)
+PageCallback = Callable[[int, "list[ExtractedTable]"], None]
 
 
 @dataclass
@@ -60,6 +172,26 @@ class TableExtractionResult:
     page_count: int = 0
     elapsed_ms: int = 0
     warnings: list[str] = field(default_factory=list)
+    spans: SpanRecorder = field(default_factory=SpanRecorder)  # ページ・段階別の所要時間
+    usage: ResourceUsage = field(default_factory=ResourceUsage)  # CPU・メモリ・I/O・ページ数
+
+
+# =====================================================================
+# セル分類用のコンパイル済みパターン
+# =====================================================================
+
+# 同じセル文字列（"V", "-", "25" 等）は表内・表間で何度も現れるため、
+# 文字列 → 判定結果 を上限付き LRU でメモ化する
+CELL_CACHE_SIZE = 8192
+
+_ANNOTATION_SUFFIX_RE = re.compile(r"\s*\(\d+\)\s*$")  # 注釈 (1), (2)
+_SIGN_CHARS_RE = re.compile(r"[±+\-]")
+_NUMERIC_BODY_RE = re.compile(r"^[\d.]+$")
+_ALPHA_RUN_RE = re.compile(r"[a-zA-Z]{3,}")
+_NEWLINE_WS_RE = re.compile(r"\s*\n\s*")
+_MULTI_WS_RE = re.compile(r"\s{2,}")
+_CID_REF_RE = re.compile(r"\(cid:\d+\)")
+_CAMEL_BOUNDARY_RE = re.compile(r"([a-z])([A-Z])")
 
 
 # =====================================================================
@@ -91,6 +223,7 @@ HEADER_NORMALIZE_MAP: dict[str, str] = {
 }
 
 
+@functools.lru_cache(maxsize=CELL_CACHE_SIZE)
 def normalize_header(header: str) -> str:
     """
     ヘッダー文字列を正規化する。
@@ -100,7 +233,7 @@ def normalize_header(header: str) -> str:
         return ""
     stripped = header.strip()
     # 注釈 (1), (2) 等を除去
-    stripped = re.sub(r"\s*\(\d+\)\s*$", "", stripped)
+    stripped = _ANNOTATION_SUFFIX_RE.sub("", stripped)
     key = stripped.lower().strip()
     return HEADER_NORMALIZE_MAP.get(key, stripped)
 
@@ -269,6 +402,7 @@ UNIT_PATTERN = re.compile(
 )
 
 
+@functools.lru_cache(maxsize=CELL_CACHE_SIZE)
 def is_unit_value(value: str) -> bool:
     """値が単位文字列かどうかを判定する。"""
     if not value or not value.strip():
@@ -326,6 +460,7 @@ def detect_unit_column(headers: list[str], rows: list[list[str]]) -> int | None:
 # =====================================================================
 
 
+@functools.lru_cache(maxsize=CELL_CACHE_SIZE)
 def _is_numeric_cell(value: str) -> bool:
     """セル値が数値的かどうか判定する。"""
     if not value or not value.strip():
@@ -334,18 +469,18 @@ def _is_numeric_cell(value: str) -> bool:
     # 符号、小数点、スペース区切りの数値
     cleaned = stripped.replace(" ", "").replace(",", "").replace("−", "-").replace("–", "-")
     # ± を含む場合
-    cleaned = re.sub(r"[±+\-]", "", cleaned)
+    cleaned = _SIGN_CHARS_RE.sub("", cleaned)
     # "to" 区切りの範囲
     if " to " in stripped.lower():
         parts = stripped.lower().split(" to ")
         return all(_is_numeric_cell(p.strip()) for p in parts if p.strip())
     # 数値パターン
-    return bool(re.match(r"^[\d.]+$", cleaned)) and len(cleaned) > 0
+    return bool(_NUMERIC_BODY_RE.match(cleaned)) and len(cleaned) > 0
 
 
 def validate_min_max_columns(
     headers: list[str],
-    rows: list[dict[str, str]],
+    rows: Sequence[dict[str, str]],
 ) -> list[str]:
     """
     Min/Max 列の対応を検証する。
@@ -374,7 +509,7 @@ def validate_min_max_columns(
 
     # Min 列に英字が多い場合 → 列崩れの兆候
     for label, col_key in [("Min", "Min"), ("Max", "Max"), ("Typ", "Typ")]:
-        if col_key not in [normalize_header(h) for h in headers]:
+        if col_key not in norm_headers:
             continue
         values = [row.get(col_key, "") for row in rows]
         non_empty = [v for v in values if v and v.strip()]
@@ -382,7 +517,7 @@ def validate_min_max_columns(
             continue
         alpha_count = sum(
             1 for v in non_empty
-            if re.search(r"[a-zA-Z]{3,}", v.strip())
+            if _ALPHA_RUN_RE.search(v.strip())
         )
         alpha_ratio = alpha_count / len(non_empty)
         if alpha_ratio > 0.5:
@@ -424,15 +559,16 @@ def _clean_cell(value) -> str:
         return ""
     s = str(value).strip()
     # 改行をスペースに変換
-    s = re.sub(r"\s*\n\s*", " ", s)
+    s = _NEWLINE_WS_RE.sub(" ", s)
     # 連続空白を1つに
-    s = re.sub(r"\s{2,}", " ", s)
+    s = _MULTI_WS_RE.sub(" ", s)
     # CID参照 (cid:XX) を除去
-    s = re.sub(r"\(cid:\d+\)", "", s)
+    s = _CID_REF_RE.sub("", s)
     s = s.strip()
     return s
 
 
+@functools.lru_cache(maxsize=CELL_CACHE_SIZE)
 def _fix_concatenated_words(text: str) -> str:
     """
     pdfplumber が単語を連結してしまった場合の修正。
@@ -447,7 +583,7 @@ def _fix_concatenated_words(text: str) -> str:
     if text.isupper() or " " in text:
         return text
     # 小文字→大文字の境界にスペースを挿入
-    result = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    result = _CAMEL_BOUNDARY_RE.sub(r"\1 \2", text)
     # ただし数値の前後は分割しない
     return result
 
@@ -457,30 +593,199 @@ def _fix_concatenated_words(text: str) -> str:
 # =====================================================================
 
 
-def _detect_table_title(page_text: str, table_bbox: tuple | None) -> str:
+# "Table N. Title" / "表 N Title" パターン
+TABLE_TITLE_PATTERNS = [
+    re.compile(r"(Table\s+\d+[\.:]\s*[^\n]+)", re.IGNORECASE),
+    re.compile(r"(表\s*\d+[\.:．]\s*[^\n]+)", re.IGNORECASE),
+]
+
+
+# タイトル上端が表上端からこの距離 (pt) 以内なら「表の上」とみなす
+TITLE_BBOX_TOLERANCE = 2.0
+# 表の bbox がタイトル行を含んで検出された場合に、bbox 内でタイトルを探す
+# 上端からの範囲 (pt)。行の高さが分かる場合は1行分を使う
+TITLE_IN_TABLE_BAND = 16.0
+
+
+@dataclass
+class TitleCandidate:
+    """ページ内のテーブルタイトル候補。"""
+
+    text: str
+    bbox: tuple[float, float, float, float] | None = None  # (x0, top, x1, bottom)
+
+
+def find_title_texts(page_text: str) -> list[str]:
+    """ページテキストからタイトル候補文字列を出現順に列挙する。"""
+    if not page_text:
+        return []
+    matches: list[tuple[int, str]] = []
+    for pat in TABLE_TITLE_PATTERNS:
+        for m in pat.finditer(page_text):
+            matches.append((m.start(), m.group(1).strip()))
+    return [text for _, text in sorted(matches)]
+
+
+def _is_vertical(bbox: tuple) -> bool:
+    """bbox が縦長（回転したテキスト）か。"""
+    return bbox[3] - bbox[1] > bbox[2] - bbox[0]
+
+
+class PageTitleIndex:
+    """
+    1ページ分のタイトル候補インデックス。
+
+    ページごとに1回だけ構築し、各表は bbox の直上にある最も近い候補を
+    二分探索で引く。位置情報の無い候補しか無い場合や表の bbox が不明な場合は、
+    ページ内で最後に出現した候補を返す（従来の挙動）。
+    表の bbox がタイトル行を含んで検出された場合（pdfplumber の罫線表で多い）は、
+    bbox の最初の行の範囲にある候補をその表のタイトルとして優先する。
+    直上に候補が無い表では、bbox の範囲内で最も上にある候補を使う。
+    位置を特定できなかった候補（search_for で見つからなかった等）や縦書きの候補も
+    捨てず、該当する位置付きの候補が無いときのページ単位の代替として使う。
     """
-    テーブルの直前テキストからタイトルを検出する。
 
-    一般的なパターン: "Table N. Title" や "表 N Title"
+    def __init__(self, candidates: list[TitleCandidate]):
+        self._fallback = candidates[-1].text if candidates else ""
+        # 縦書き（横向きページの余白に回転して置かれたタイトル）は上下関係で
+        # 表と対応付けられないため、位置の無い候補と同じに扱う
+        unpositioned = [c.text for c in candidates if c.bbox is None or _is_vertical(c.bbox)]
+        self._unpositioned_fallback = unpositioned[-1] if unpositioned else ""
+        self._positioned = sorted(
+            (c for c in candidates if c.bbox is not None and not _is_vertical(c.bbox)),
+            key=lambda c: c.bbox[1],
+        )
+        # タイトル文字列が次の行に掛かる場合もあるため、上端で位置を比較する
+        self._tops = [c.bbox[1] for c in self._positioned]
+
+    @classmethod
+    def from_page_text(cls, page_text: str) -> "PageTitleIndex":
+        """位置情報なしのインデックスを構築する。"""
+        return cls([TitleCandidate(text) for text in find_title_texts(page_text)])
+
+    def title_for(self, table_bbox: tuple | None, row_height: float | None = None) -> str:
+        """
+        表の bbox に対応するタイトルを返す。見つからなければ空文字列。
+        row_height は表の1行の高さ (pt)。bbox 内の先頭行にあるタイトルの判定に使う。
+        """
+        if table_bbox is None or not self._positioned:
+            return self._fallback
+
+        x0, top, x1 = table_bbox[0], table_bbox[1], table_bbox[2]
+        idx = bisect.bisect_right(self._tops, top + TITLE_BBOX_TOLERANCE)
+
+        # bbox の先頭行に含まれるタイトル（表がタイトル行ごと検出された場合）
+        band_end = bisect.bisect_right(
+            self._tops, top + max(row_height or TITLE_IN_TABLE_BAND, TITLE_BBOX_TOLERANCE)
+        )
+        for cand in self._positioned[idx:band_end]:
+            cx0, _, cx1, _ = cand.bbox
+            if cx0 < x1 and cx1 > x0:
+                return cand.text
+
+        if idx == 0:
+            # 直上に候補が無い: 表の範囲内にある最も上の候補（テキスト配置で
+            # 検出したページ全体の表などがタイトルを内包する場合）
+            bottom = table_bbox[3]
+            for cand in self._positioned[band_end:]:
+                if cand.bbox[1] >= bottom:
+                    break
+                cx0, _, cx1, _ = cand.bbox
+                if cx0 < x1 and cx1 > x0:
+                    return cand.text
+            return self._unpositioned_fallback
+
+        # 直上から遡り、水平方向に表と重なる候補を優先（段組みページ対策）
+        for cand in reversed(self._positioned[:idx]):
+            cx0, _, cx1, _ = cand.bbox
+            if cx0 < x1 and cx1 > x0:
+                return cand.text
+        return self._positioned[idx - 1].text
+
+
+def _title_index_pymupdf(page, page_text: str) -> PageTitleIndex:
+    """PyMuPDF ページのタイトル候補を位置付きで収集する。"""
+    candidates: list[TitleCandidate] = []
+    for text in dict.fromkeys(find_title_texts(page_text)):
+        rects = page.search_for(text)
+        if not rects:
+            candidates.append(TitleCandidate(text))
+            continue
+        for r in rects:
+            candidates.append(TitleCandidate(text, (r.x0, r.y0, r.x1, r.y1)))
+    return PageTitleIndex(candidates)
+
+
+def _title_index_pdfplumber(page) -> PageTitleIndex:
+    """pdfplumber ページのタイトル候補を位置付きで収集する。"""
+    candidates: list[TitleCandidate] = []
+    for pat in TABLE_TITLE_PATTERNS:
+        for m in page.search(pat, return_chars=False):
+            candidates.append(
+                TitleCandidate(
+                    m["text"].strip(),
+                    (m["x0"], m["top"], m["x1"], m["bottom"]),
+                )
+            )
+    return PageTitleIndex(candidates)
+
+
+# =====================================================================
+# 生データ → ExtractedTable 変換 (全戦略共通)
+# =====================================================================
+
+
+def _build_extracted_table(
+    raw_data: list[list],
+    page: int,
+    title_index: PageTitleIndex,
+    table_bbox: tuple | None,
+    method: str,
+) -> ExtractedTable | None:
     """
-    if not page_text:
-        return ""
+    戦略が検出した生の行列データを ExtractedTable に変換する。
 
-    # "Table N." パターンを検索
-    patterns = [
-        r"(Table\s+\d+[\.:]\s*[^\n]+)",
-        r"(表\s*\d+[\.:．]\s*[^\n]+)",
-    ]
-    matches = []
-    for pat in patterns:
-        for m in re.finditer(pat, page_text, re.IGNORECASE):
-            matches.append(m.group(1).strip())
+    セル値クリーンアップ → ヘッダー統合/正規化 → 列形式への格納 →
+    タイトル検出 → Min/Max 検証 までを全戦略共通で行う。
+    表として成立しない場合は None を返す。
+    """
+    # セル値をクリーンアップ
+    cleaned = [[_clean_cell(cell) for cell in row] for row in raw_data]
+
+    # 完全に空の行を除去
+    cleaned = [row for row in cleaned if any(c for c in row)]
+    if not cleaned or len(cleaned) < 2:
+        return None
+
+    # ヘッダー統合
+    raw_headers, data_rows = merge_multiline_headers(cleaned)
+    headers = normalize_headers(raw_headers)
 
-    if matches:
-        # 最後に検出されたものを返す（テーブルに最も近い）
-        return matches[-1] if len(matches) == 1 else matches[-1]
+    if not headers or not data_rows:
+        return None
+
+    # ヘッダーの連結単語も修正
+    headers = [_fix_concatenated_words(h) for h in headers]
+    # 修正後のヘッダーを再正規化
+    headers = normalize_headers(headers)
+
+    # bbox の1行あたりの高さ（bbox 内の先頭行にあるタイトルの判定用）
+    row_height = (table_bbox[3] - table_bbox[1]) / len(raw_data) if table_bbox and raw_data else None
+
+    # 列形式で保持（行辞書は rows ビューで単語連結の修正を適用して導出）
+    table = ExtractedTable.from_rows(
+        page,
+        headers,
+        data_rows,
+        title=title_index.title_for(table_bbox, row_height),  # テーブルタイトル検出
+        quality_score=0.0,  # 後で品質評価で上書き
+        method=method,
+    )
+
+    # Min/Max 検証
+    table.warnings = validate_min_max_columns(headers, table.rows)
 
-    return ""
+    return table
 
 
 # =====================================================================
@@ -488,10 +793,109 @@ def _detect_table_title(page_text: str, table_bbox: tuple | None) -> str:
 # =====================================================================
 
 
-def extract_tables_pdfplumber(pdf_path: str) -> TableExtractionResult:
+# 何ページごとに pdfplumber を開き直すか（pdfminer のオブジェクトキャッシュを解放する）
+PDFPLUMBER_PAGE_WINDOW = 50
+# メモリ上限でウィンドウ途中に開き直すときの最小ページ数
+# （開き直すたびにページツリー全体を解析し直すため、毎ページ開き直すと O(n²) になる）
+PDFPLUMBER_MIN_REOPEN_PAGES = 10
+
+
+def _extract_page_tables_pdfplumber(
+    page, page_num: int, spans: SpanRecorder
+) -> tuple[list[ExtractedTable], list[str]]:
+    """pdfplumber の1ページから表を抽出する。find_tables は設定ごとに計時する。"""
+    tables: list[ExtractedTable] = []
+    warnings: list[str] = []
+
+    # 複数の設定を段階的に試行
+    # 1) lines_strict: 明確な罫線のみ使用（最も信頼性が高い）
+    # 2) lines: 推定罫線も含む（やや緩い）
+    # 3) text: テキスト位置ベース（最もフォールバック）
+    strategy_configs = [
+        {
+            "vertical_strategy": "lines_strict",
+            "horizontal_strategy": "lines_strict",
+            "snap_tolerance": 5,
+            "join_tolerance": 5,
+        },
+        {
+            "vertical_strategy": "lines",
+            "horizontal_strategy": "lines",
+            "snap_tolerance": 5,
+            "join_tolerance": 5,
+        },
+        {
+            "vertical_strategy": "text",
+            "horizontal_strategy": "text",
+            "snap_tolerance": 5,
+            "join_tolerance": 5,
+            "min_words_vertical": 3,
+            "min_words_horizontal": 1,
+        },
+    ]
+
+    page_tables = []
+    for cfg in strategy_configs:
+        try:
+            with spans.span(f"find_tables:{cfg['vertical_strategy']}", page_num + 1):
+                page_tables = page.find_tables(table_settings=cfg)
+            if page_tables:
+                break
+        except Exception:
+            continue
+
+    with spans.span("title_index", page_num + 1):
+        title_index = _title_index_pdfplumber(page)
+
+    build_start = time.perf_counter()
+    for tbl_idx, tbl in enumerate(page_tables):
+        try:
+            raw_data = tbl.extract()
+            if not raw_data or len(raw_data) < 2:
+                continue
+
+            extracted = _build_extracted_table(
+                raw_data,
+                page=page_num + 1,
+                title_index=title_index,
+                table_bbox=tbl.bbox if hasattr(tbl, "bbox") else None,
+                method="pdfplumber",
+            )
+            if extracted is not None:
+                tables.append(extracted)
+
+        except Exception as e:
+            warnings.append(
+                f"Page {page_num + 1}, Table {tbl_idx + 1}: "
+                f"extraction failed: {e}"
+            )
+    spans.add("build_tables", build_start, page_num + 1)
+
+    return tables, warnings
+
+
+def extract_tables_pdfplumber(
+    pdf_path: str,
+    page_window: int | None = PDFPLUMBER_PAGE_WINDOW,
+    memory_budget_mb: float | None = None,
+    on_page: PageCallback | None = None,
+) -> TableExtractionResult:
     """
     pdfplumber を使った表構造抽出。
     PDF内部の座標情報から罫線・セル境界を推定し、行列構造を復元する。
+
+    大きなPDFでもメモリが増え続けないよう、処理済みページのキャッシュは
+    即座に解放し、page_window ページごとに文書を開き直す。
+    memory_budget_mb を指定した場合は、RSS が上限を超えた時点で
+    ウィンドウの途中でも文書を開き直す（ただし PDFPLUMBER_MIN_REOPEN_PAGES
+    ページ以上処理してから）。開き直しても上限を下回らなかった場合は、
+    次のウィンドウでは途中で開き直さない。
+
+    Args:
+        pdf_path: PDFファイルパス
+        page_window: 文書を開き直すページ間隔（None または 0 で開き直さない）
+        memory_budget_mb: RSS の上限 (MB)。None で無制限
+        on_page: ページ処理完了ごとに (ページ番号, テーブル) で呼ばれるコールバック
     """
     try:
         import pdfplumber
@@ -503,236 +907,571 @@ def extract_tables_pdfplumber(pdf_path: str) -> TableExtractionResult:
     start = time.time()
     warnings: list[str] = []
     tables: list[ExtractedTable] = []
+    spans = SpanRecorder()
+    pages_skipped = 0
 
     try:
-        pdf = pdfplumber.open(pdf_path)
+        with pdfplumber.open(pdf_path) as pdf:
+            page_count = len(pdf.pages)
     except Exception as e:
         raise RuntimeError(f"pdfplumber failed to open PDF: {e}") from e
 
-    page_count = len(pdf.pages)
+    window = page_window if page_window and page_window > 0 else max(page_count, 1)
+    budget_warned = False
+    # 直前の開き直しで RSS が上限を下回ったか（下回らなければ途中の開き直しを控える）
+    budget_reopen = True
+    page_num = 0
 
-    for page_num, page in enumerate(pdf.pages):
+    while page_num < page_count:
+        window_start = page_num
+        window_end = min(page_count, page_num + window)
+        try:
+            # pages は 1-indexed のページ番号リスト
+            with spans.span("open"):
+                pdf = pdfplumber.open(pdf_path, pages=list(range(page_num + 1, window_end + 1)))
+        except Exception as e:
+            raise RuntimeError(f"pdfplumber failed to open PDF: {e}") from e
         try:
-            # 複数の設定を段階的に試行
-            # 1) lines_strict: 明確な罫線のみ使用（最も信頼性が高い）
-            # 2) lines: 推定罫線も含む（やや緩い）
-            # 3) text: テキスト位置ベース（最もフォールバック）
-            strategy_configs = [
-                {
-                    "vertical_strategy": "lines_strict",
-                    "horizontal_strategy": "lines_strict",
-                    "snap_tolerance": 5,
-                    "join_tolerance": 5,
-                },
-                {
-                    "vertical_strategy": "lines",
-                    "horizontal_strategy": "lines",
-                    "snap_tolerance": 5,
-                    "join_tolerance": 5,
-                },
-                {
-                    "vertical_strategy": "text",
-                    "horizontal_strategy": "text",
-                    "snap_tolerance": 5,
-                    "join_tolerance": 5,
-                    "min_words_vertical": 3,
-                    "min_words_horizontal": 1,
-                },
-            ]
-
-            page_tables = []
-            for cfg in strategy_configs:
+            for page in pdf.pages:
+                page_start = time.perf_counter()
+                page_tables: list[ExtractedTable] = []
                 try:
-                    page_tables = page.find_tables(table_settings=cfg)
-                    if page_tables:
+                    page_tables, page_warnings = _extract_page_tables_pdfplumber(
+                        page, page_num, spans
+                    )
+                    tables.extend(page_tables)
+                    warnings.extend(page_warnings)
+                except Exception as e:
+                    warnings.append(f"Page {page_num + 1}: pdfplumber table detection failed: {e}")
+                    pages_skipped += 1
+                finally:
+                    # ページ単位のキャッシュ (chars, objects, textmap) を解放
+                    page.close()
+                spans.add("page", page_start, page_num + 1)
+                page_num += 1
+                if on_page is not None:
+                    on_page(page_num, page_tables)
+
+                # メモリ上限を超えたらウィンドウ途中でも開き直す
+                if (
+                    memory_budget_mb
+                    and budget_reopen
+                    and page_num < window_end
+                    and page_num - window_start >= PDFPLUMBER_MIN_REOPEN_PAGES
+                ):
+                    rss = current_rss_mb()
+                    if rss is not None and rss > memory_budget_mb:
+                        logger.debug(
+                            f"RSS {rss:.0f}MB exceeds budget {memory_budget_mb:.0f}MB "
+                            f"after page {page_num}; reopening PDF"
+                        )
                         break
-                except Exception:
-                    continue
+        finally:
+            pdf.close()
+            gc.collect()
+
+        if memory_budget_mb:
+            rss = current_rss_mb()
+            budget_reopen = rss is None or rss <= memory_budget_mb
+            if not budget_reopen and not budget_warned:
+                warnings.append(
+                    f"RSS {rss:.0f}MB still exceeds memory budget "
+                    f"{memory_budget_mb:.0f}MB after releasing page caches"
+                )
+                budget_warned = True
 
-            page_text = page.extract_text() or ""
+    elapsed_ms = int((time.time() - start) * 1000)
 
-            for tbl_idx, tbl in enumerate(page_tables):
-                try:
-                    raw_data = tbl.extract()
-                    if not raw_data or len(raw_data) < 2:
-                        continue
+    return TableExtractionResult(
+        tables=tables,
+        method="pdfplumber",
+        page_count=page_count,
+        elapsed_ms=elapsed_ms,
+        warnings=warnings,
+        spans=spans,
+        usage=ResourceUsage(pages_skipped=pages_skipped),
+    )
 
-                    # セル値をクリーンアップ
-                    cleaned = [[_clean_cell(cell) for cell in row] for row in raw_data]
 
-                    # 完全に空の行を除去
-                    cleaned = [row for row in cleaned if any(c for c in row)]
-                    if not cleaned or len(cleaned) < 2:
-                        continue
+# =====================================================================
+# Strategy B: PyMuPDF find_tables()
+# =====================================================================
 
-                    # ヘッダー統合
-                    raw_headers, data_rows = merge_multiline_headers(cleaned)
-                    headers = normalize_headers(raw_headers)
 
-                    if not headers or not data_rows:
-                        continue
+def extract_tables_pymupdf(
+    pdf_path: str,
+    on_page: PageCallback | None = None,
+) -> TableExtractionResult:
+    """
+    PyMuPDF の page.find_tables() を使った表構造抽出。
+    PyMuPDF 1.23.0+ で追加されたビルトイン表検出機能。
+
+    on_page を指定した場合、ページ処理完了ごとに (ページ番号, テーブル) で呼ぶ。
+    """
+    try:
+        import fitz  # pymupdf
+    except ImportError:
+        raise RuntimeError("pymupdf is required. Install with: pip install pymupdf")
+
+    # find_tables() の存在確認
+    if not hasattr(fitz, "version") or not hasattr(fitz.Page, "find_tables"):
+        raise RuntimeError(
+            "PyMuPDF >= 1.23.0 is required for find_tables(). "
+            f"Current version: {getattr(fitz, 'version', 'unknown')}"
+        )
 
-                    # 行を辞書化（単語連結の修正も適用）
-                    dict_rows: list[dict[str, str]] = []
-                    for row in data_rows:
-                        row_dict: dict[str, str] = {}
-                        for col_idx, header in enumerate(headers):
-                            val = row[col_idx] if col_idx < len(row) else ""
-                            val = _fix_concatenated_words(val)
-                            row_dict[header] = val
-                        dict_rows.append(row_dict)
+    start = time.time()
+    warnings: list[str] = []
+    tables: list[ExtractedTable] = []
 
-                    # ヘッダーの連結単語も修正
-                    headers = [_fix_concatenated_words(h) for h in headers]
-                    # 修正後のヘッダーを再正規化
-                    headers = normalize_headers(headers)
+    spans = SpanRecorder()
+    pages_skipped = 0
+    with spans.span("open"):
+        doc = fitz.open(pdf_path)
+    page_count = len(doc)
 
-                    # テーブルタイトル検出
-                    title = _detect_table_title(page_text, tbl.bbox if hasattr(tbl, "bbox") else None)
+    for page_num in range(page_count):
+        page_clock = time.perf_counter()
+        page = doc[page_num]
+        page_start = len(tables)
+        try:
+            with spans.span("find_tables", page_num + 1):
+                tab_finder = page.find_tables()
+            with spans.span("title_index", page_num + 1):
+                title_index = _title_index_pymupdf(page, page.get_text("text"))
 
-                    # Min/Max 検証
-                    mm_warnings = validate_min_max_columns(headers, dict_rows)
+            build_start = time.perf_counter()
+            for tbl_idx, tbl in enumerate(tab_finder.tables):
+                try:
+                    # PyMuPDF の extract() は list[list[str|None]] を返す
+                    raw_data = tbl.extract()
+                    if not raw_data or len(raw_data) < 2:
+                        continue
 
-                    extracted = ExtractedTable(
+                    extracted = _build_extracted_table(
+                        raw_data,
                         page=page_num + 1,
-                        title=title,
-                        headers=headers,
-                        rows=dict_rows,
-                        raw_rows=[row for row in data_rows],
-                        quality_score=0.0,  # 後で品質評価で上書き
-                        method="pdfplumber",
-                        warnings=mm_warnings,
+                        title_index=title_index,
+                        table_bbox=tuple(tbl.bbox),
+                        method="pymupdf",
                     )
-                    tables.append(extracted)
+                    if extracted is not None:
+                        tables.append(extracted)
 
                 except Exception as e:
                     warnings.append(
                         f"Page {page_num + 1}, Table {tbl_idx + 1}: "
                         f"extraction failed: {e}"
                     )
+            spans.add("build_tables", build_start, page_num + 1)
 
         except Exception as e:
-            warnings.append(f"Page {page_num + 1}: pdfplumber table detection failed: {e}")
+            warnings.append(f"Page {page_num + 1}: PyMuPDF table detection failed: {e}")
+            pages_skipped += 1
+        spans.add("page", page_clock, page_num + 1)
 
-    pdf.close()
+        if on_page is not None:
+            on_page(page_num + 1, tables[page_start:])
+
+    doc.close()
     elapsed_ms = int((time.time() - start) * 1000)
 
     return TableExtractionResult(
         tables=tables,
-        method="pdfplumber",
+        method="pymupdf",
         page_count=page_count,
         elapsed_ms=elapsed_ms,
         warnings=warnings,
+        spans=spans,
+        usage=ResourceUsage(pages_skipped=pages_skipped),
     )
 
 
 # =====================================================================
-# Strategy B: PyMuPDF find_tables()
+# Strategy C: テキスト配置ベース (PyMuPDF words + NumPy クラスタリング)
 # =====================================================================
 
+# 列の隙間とみなす被覆数の許容割合（スパニングセルによる隙間の塞がりを許容）
+TEXTALIGN_GUTTER_TOLERANCE = 0.1
+# 表の1行とみなす最小セグメント（列）数
+TEXTALIGN_MIN_COLUMNS = 3
+# 表とみなす最小行数
+TEXTALIGN_MIN_ROWS = 3
+
 
-def extract_tables_pymupdf(pdf_path: str) -> TableExtractionResult:
+def _cluster_rows(y: "np.ndarray", tolerance: float) -> "np.ndarray":
     """
-    PyMuPDF の page.find_tables() を使った表構造抽出。
-    PyMuPDF 1.23.0+ で追加されたビルトイン表検出機能。
+    ベースライン座標を行クラスタに分ける。
+
+    Args:
+        y: 単語ベースライン (y1) の配列（昇順ソート済み）
+        tolerance: 同一行とみなす最大差
+
+    Returns:
+        各要素の行 ID 配列
+    """
+    import numpy as np
+
+    if len(y) == 0:
+        return np.zeros(0, dtype=np.int64)
+    breaks = np.diff(y) > tolerance
+    return np.concatenate(([0], np.cumsum(breaks)))
+
+
+def _column_boundaries(x0: "np.ndarray", x1: "np.ndarray", n_rows: int) -> "np.ndarray":
+    """
+    セグメントの x 範囲の被覆数から列の隙間（ガター）を求め、列境界を返す。
+
+    被覆数が行数の TEXTALIGN_GUTTER_TOLERANCE 以下の区間を隙間とみなし、
+    その中点を列境界とする。
+
+    Returns:
+        列境界 x 座標の昇順配列
+    """
+    import numpy as np
+
+    left = int(np.floor(x0.min()))
+    right = int(np.ceil(x1.max()))
+    width = right - left + 2
+    # 1pt 解像度の差分配列で被覆数を計算
+    delta = np.zeros(width, dtype=np.int64)
+    np.add.at(delta, np.floor(x0).astype(np.int64) - left, 1)
+    np.add.at(delta, np.ceil(x1).astype(np.int64) - left, -1)
+    coverage = np.cumsum(delta)[:-1]
+
+    limit = int(n_rows * TEXTALIGN_GUTTER_TOLERANCE)
+    is_gap = coverage <= limit
+    # 隙間区間の開始/終了位置を差分で検出
+    edges = np.diff(is_gap.astype(np.int8))
+    gap_starts = np.flatnonzero(edges == 1) + 1
+    gap_ends = np.flatnonzero(edges == -1) + 1
+    if len(gap_ends) and len(gap_starts) and gap_ends[0] <= gap_starts[0]:
+        gap_ends = gap_ends[1:]
+    n = min(len(gap_starts), len(gap_ends))
+    return (gap_starts[:n] + gap_ends[:n]) / 2.0 + left
+
+
+def _find_textalign_tables(words: list[tuple]) -> list[tuple[list[list[str]], tuple]]:
+    """
+    1ページ分の単語リストから、テキスト配置に基づいて表を推定する。
+
+    Args:
+        words: PyMuPDF page.get_text("words") の出力
+               (x0, y0, x1, y1, word, block_no, line_no, word_no)
+
+    Returns:
+        [(raw_data, bbox), ...] 各表の生の行列データと外接矩形
+    """
+    import numpy as np
+
+    if not words:
+        return []
+
+    x0 = np.array([w[0] for w in words], dtype=np.float64)
+    y0 = np.array([w[1] for w in words], dtype=np.float64)
+    x1 = np.array([w[2] for w in words], dtype=np.float64)
+    y1 = np.array([w[3] for w in words], dtype=np.float64)
+    text = np.array([w[4] for w in words], dtype=object)
+
+    heights = y1 - y0
+    line_height = float(np.median(heights)) if len(heights) else 0.0
+    if line_height <= 0:
+        return []
+
+    # --- 1. ベースラインで行にクラスタリング ---
+    order = np.lexsort((x0, y1))
+    x0, y0, x1, y1, text = x0[order], y0[order], x1[order], y1[order], text[order]
+    row_of_sorted_y = _cluster_rows(y1, line_height * 0.4)
+    # 行内は x 順に並べ直す
+    order = np.lexsort((x0, row_of_sorted_y))
+    x0, y0, x1, y1, text = x0[order], y0[order], x1[order], y1[order], text[order]
+    row_id = row_of_sorted_y[order]
+
+    # --- 2. 行内で近接する単語をセグメント（セル候補）に結合 ---
+    gap = np.empty_like(x0)
+    gap[0] = np.inf
+    gap[1:] = x0[1:] - x1[:-1]
+    new_row = np.empty(len(row_id), dtype=bool)
+    new_row[0] = True
+    new_row[1:] = row_id[1:] != row_id[:-1]
+    seg_start = new_row | (gap > line_height * 0.8)
+    seg_id = np.cumsum(seg_start) - 1
+    n_segs = int(seg_id[-1]) + 1
+
+    seg_x0 = np.full(n_segs, np.inf)
+    seg_x1 = np.full(n_segs, -np.inf)
+    seg_y0 = np.full(n_segs, np.inf)
+    seg_y1 = np.full(n_segs, -np.inf)
+    np.minimum.at(seg_x0, seg_id, x0)
+    np.maximum.at(seg_x1, seg_id, x1)
+    np.minimum.at(seg_y0, seg_id, y0)
+    np.maximum.at(seg_y1, seg_id, y1)
+    seg_row = row_id[seg_start]
+    starts = np.flatnonzero(seg_start)
+    seg_text = [" ".join(chunk) for chunk in np.split(text, starts[1:])]
+
+    # --- 3. 行ごとのセグメント数から表の行ブロックを検出 ---
+    n_rows = int(row_id[-1]) + 1
+    segs_per_row = np.bincount(seg_row, minlength=n_rows)
+    row_top = np.full(n_rows, np.inf)
+    row_bottom = np.full(n_rows, -np.inf)
+    np.minimum.at(row_top, seg_row, seg_y0)
+    np.maximum.at(row_bottom, seg_row, seg_y1)
+
+    is_table_row = segs_per_row >= TEXTALIGN_MIN_COLUMNS
+    # 行間が大きく空いている箇所ではブロックを分割
+    vgap = np.empty(n_rows)
+    vgap[0] = np.inf
+    vgap[1:] = row_top[1:] - row_bottom[:-1]
+    block_start = is_table_row & (~np.roll(is_table_row, 1) | (vgap > line_height * 2.5))
+    block_start[0] = is_table_row[0]
+
+    results: list[tuple[list[list[str]], tuple]] = []
+    for start_row in np.flatnonzero(block_start):
+        end_row = start_row
+        while end_row + 1 < n_rows and is_table_row[end_row + 1] and not block_start[end_row + 1]:
+            end_row += 1
+        block_rows = end_row - start_row + 1
+        if block_rows < TEXTALIGN_MIN_ROWS:
+            continue
+
+        mask = (seg_row >= start_row) & (seg_row <= end_row)
+        bx0, bx1 = seg_x0[mask], seg_x1[mask]
+        boundaries = _column_boundaries(bx0, bx1, block_rows)
+        n_cols = len(boundaries) + 1
+        if n_cols < TEXTALIGN_MIN_COLUMNS:
+            continue
+
+        # --- 4. セグメント中心を列境界で列に割り当て ---
+        centers = (bx0 + bx1) / 2.0
+        col_idx = np.searchsorted(boundaries, centers)
+        grid = [[""] * n_cols for _ in range(block_rows)]
+        for seg_i, r, c in zip(np.flatnonzero(mask), seg_row[mask] - start_row, col_idx):
+            cell = grid[int(r)][int(c)]
+            grid[int(r)][int(c)] = f"{cell} {seg_text[seg_i]}" if cell else seg_text[seg_i]
+
+        bbox = (
+            float(bx0.min()),
+            float(row_top[start_row]),
+            float(bx1.max()),
+            float(row_bottom[end_row]),
+        )
+        results.append((grid, bbox))
+
+    return results
+
+
+def extract_tables_textalign(
+    pdf_path: str,
+    on_page: PageCallback | None = None,
+) -> TableExtractionResult:
+    """
+    テキスト配置ベースの表構造抽出。
+
+    PyMuPDF の単語座標を NumPy でベクトル化処理し、ベースラインで行、
+    x 方向の被覆の隙間で列境界を推定する。罫線の無いパラメータ表向けで、
+    pdfplumber の text 戦略より高速かつ列分割が安定する。
+
+    on_page を指定した場合、ページ処理完了ごとに (ページ番号, テーブル) で呼ぶ。
     """
     try:
         import fitz  # pymupdf
     except ImportError:
         raise RuntimeError("pymupdf is required. Install with: pip install pymupdf")
 
-    # find_tables() の存在確認
-    if not hasattr(fitz, "version") or not hasattr(fitz.Page, "find_tables"):
-        raise RuntimeError(
-            "PyMuPDF >= 1.23.0 is required for find_tables(). "
-            f"Current version: {getattr(fitz, 'version', 'unknown')}"
-        )
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise RuntimeError("numpy is required. Install with: pip install numpy")
 
     start = time.time()
     warnings: list[str] = []
     tables: list[ExtractedTable] = []
 
-    doc = fitz.open(pdf_path)
+    spans = SpanRecorder()
+    pages_skipped = 0
+    with spans.span("open"):
+        doc = fitz.open(pdf_path)
     page_count = len(doc)
 
     for page_num in range(page_count):
+        page_clock = time.perf_counter()
         page = doc[page_num]
+        page_start = len(tables)
         try:
-            tab_finder = page.find_tables()
-            page_text = page.get_text("text")
-
-            for tbl_idx, tbl in enumerate(tab_finder.tables):
+            with spans.span("get_words", page_num + 1):
+                words = page.get_text("words")
+            with spans.span("title_index", page_num + 1):
+                title_index = _title_index_pymupdf(page, page.get_text("text"))
+            with spans.span("detect_tables", page_num + 1):
+                found = _find_textalign_tables(words)
+
+            build_start = time.perf_counter()
+            for tbl_idx, (raw_data, bbox) in enumerate(found):
                 try:
-                    # PyMuPDF の extract() は list[list[str|None]] を返す
-                    raw_data = tbl.extract()
-                    if not raw_data or len(raw_data) < 2:
-                        continue
+                    extracted = _build_extracted_table(
+                        raw_data,
+                        page=page_num + 1,
+                        title_index=title_index,
+                        table_bbox=bbox,
+                        method="textalign",
+                    )
+                    if extracted is not None:
+                        tables.append(extracted)
 
-                    # セル値をクリーンアップ
-                    cleaned = [[_clean_cell(cell) for cell in row] for row in raw_data]
+                except Exception as e:
+                    warnings.append(
+                        f"Page {page_num + 1}, Table {tbl_idx + 1}: "
+                        f"extraction failed: {e}"
+                    )
+            spans.add("build_tables", build_start, page_num + 1)
 
-                    # 完全に空の行を除去
-                    cleaned = [row for row in cleaned if any(c for c in row)]
-                    if not cleaned or len(cleaned) < 2:
-                        continue
+        except Exception as e:
+            warnings.append(f"Page {page_num + 1}: text-alignment table detection failed: {e}")
+            pages_skipped += 1
+        spans.add("page", page_clock, page_num + 1)
 
-                    # ヘッダー統合
-                    raw_headers, data_rows = merge_multiline_headers(cleaned)
-                    headers = normalize_headers(raw_headers)
+        if on_page is not None:
+            on_page(page_num + 1, tables[page_start:])
 
-                    if not headers or not data_rows:
-                        continue
+    doc.close()
+    elapsed_ms = int((time.time() - start) * 1000)
 
-                    # 行を辞書化（単語連結の修正も適用）
-                    dict_rows: list[dict[str, str]] = []
-                    for row in data_rows:
-                        row_dict: dict[str, str] = {}
-                        for col_idx, header in enumerate(headers):
-                            val = row[col_idx] if col_idx < len(row) else ""
-                            val = _fix_concatenated_words(val)
-                            row_dict[header] = val
-                        dict_rows.append(row_dict)
+    return TableExtractionResult(
+        tables=tables,
+        method="textalign",
+        page_count=page_count,
+        elapsed_ms=elapsed_ms,
+        warnings=warnings,
+        spans=spans,
+        usage=ResourceUsage(pages_skipped=pages_skipped),
+    )
 
-                    # ヘッダーの連結単語も修正
-                    headers = [_fix_concatenated_words(h) for h in headers]
-                    headers = normalize_headers(headers)
 
-                    # テーブルタイトル検出
-                    title = _detect_table_title(page_text, None)
+# =====================================================================
+# Strategy D: OCR (スキャン/文字化けPDF向け)
+# =====================================================================
 
-                    # Min/Max 検証
-                    mm_warnings = validate_min_max_columns(headers, dict_rows)
 
-                    extracted = ExtractedTable(
+def _title_index_from_words(words: list[tuple]) -> PageTitleIndex:
+    """
+    単語座標 (x0, y0, x1, y1, word, block_no, line_no, word_no) から
+    行を組み立て、位置付きのタイトル候補を収集する。
+    """
+    lines: dict[int, list[tuple]] = {}
+    for w in words:
+        lines.setdefault(w[6], []).append(w)
+
+    candidates: list[TitleCandidate] = []
+    for line_words in lines.values():
+        line_words.sort(key=lambda w: w[0])
+        line_text = " ".join(w[4] for w in line_words)
+        for text in find_title_texts(line_text):
+            candidates.append(
+                TitleCandidate(
+                    text,
+                    (
+                        min(w[0] for w in line_words),
+                        min(w[1] for w in line_words),
+                        max(w[2] for w in line_words),
+                        max(w[3] for w in line_words),
+                    ),
+                )
+            )
+    return PageTitleIndex(candidates)
+
+
+def extract_tables_ocr(
+    pdf_path: str,
+    dpi: int = 300,
+    lang: str = "eng",
+    ocr_cache_dir: str | None = None,
+    on_page: PageCallback | None = None,
+) -> TableExtractionResult:
+    """
+    OCR の単語座標から表構造を復元する。
+
+    テキストレイヤーが無い/文字化けしているPDFでは pdfplumber や
+    find_tables() が機能しないため、テキスト抽出の OCR 戦略と同じ
+    ページ画像・Tesseract 結果 (pdf_ocr.ocr_document) を再利用し、
+    単語座標を textalign 戦略と同じ NumPy クラスタリングで表に組み立てる。
+    ページの再描画・再OCRは行わない。
+
+    on_page を指定した場合、ページ処理完了ごとに (ページ番号, テーブル) で呼ぶ。
+    """
+    from pdf_ocr import check_ocr_available, ocr_document
+
+    check_ocr_available()
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise RuntimeError("numpy is required. Install with: pip install numpy")
+
+    start = time.time()
+    warnings: list[str] = []
+    tables: list[ExtractedTable] = []
+
+    spans = SpanRecorder()
+    pages_skipped = 0
+    # 画像化 + OCR は文書単位で先に行う（キャッシュヒット時はほぼ 0）
+    with spans.span("ocr"):
+        ocr_pages = ocr_document(pdf_path, dpi=dpi, lang=lang, cache_dir=ocr_cache_dir)
+    page_count = len(ocr_pages)
+
+    for page_num, ocr_page in enumerate(ocr_pages):
+        page_clock = time.perf_counter()
+        page_start = len(tables)
+        # OCR と表検出の両方が失敗しても1ページとして数える
+        skipped = False
+        if ocr_page.error:
+            warnings.append(f"Page {page_num + 1}: OCR failed: {ocr_page.error}")
+            skipped = True
+        try:
+            with spans.span("title_index", page_num + 1):
+                title_index = _title_index_from_words(ocr_page.words)
+            with spans.span("detect_tables", page_num + 1):
+                found = _find_textalign_tables(ocr_page.words)
+
+            build_start = time.perf_counter()
+            for tbl_idx, (raw_data, bbox) in enumerate(found):
+                try:
+                    extracted = _build_extracted_table(
+                        raw_data,
                         page=page_num + 1,
-                        title=title,
-                        headers=headers,
-                        rows=dict_rows,
-                        raw_rows=[row for row in data_rows],
-                        quality_score=0.0,
-                        method="pymupdf",
-                        warnings=mm_warnings,
+                        title_index=title_index,
+                        table_bbox=bbox,
+                        method="ocr",
                     )
-                    tables.append(extracted)
+                    if extracted is not None:
+                        tables.append(extracted)
 
                 except Exception as e:
                     warnings.append(
                         f"Page {page_num + 1}, Table {tbl_idx + 1}: "
                         f"extraction failed: {e}"
                     )
+            spans.add("build_tables", build_start, page_num + 1)
 
         except Exception as e:
-            warnings.append(f"Page {page_num + 1}: PyMuPDF table detection failed: {e}")
+            warnings.append(f"Page {page_num + 1}: OCR table detection failed: {e}")
+            skipped = True
+        pages_skipped += skipped
+        spans.add("page", page_clock, page_num + 1)
+
+        if on_page is not None:
+            on_page(page_num + 1, tables[page_start:])
 
-    doc.close()
     elapsed_ms = int((time.time() - start) * 1000)
 
     return TableExtractionResult(
         tables=tables,
-        method="pymupdf",
+        method="ocr",
         page_count=page_count,
         elapsed_ms=elapsed_ms,
         warnings=warnings,
+        spans=spans,
+        usage=ResourceUsage(pages_skipped=pages_skipped),
     )
 
 
@@ -743,14 +1482,26 @@ def extract_tables_pymupdf(pdf_path: str) -> TableExtractionResult:
 TABLE_STRATEGIES = {
     "pdfplumber": extract_tables_pdfplumber,
     "pymupdf": extract_tables_pymupdf,
+    "textalign": extract_tables_textalign,
+    "ocr": extract_tables_ocr,
 }
 
 
-def run_table_strategy(name: str, pdf_path: str) -> TableExtractionResult:
-    """名前指定で表抽出戦略を実行する。"""
+def run_table_strategy(name: str, pdf_path: str, **options) -> TableExtractionResult:
+    """
+    名前指定で表抽出戦略を実行する。
+    options は戦略関数へそのまま渡す（例: pdfplumber の memory_budget_mb）。
+    結果の usage に CPU 時間・ピーク RSS 増分・読み込みバイト数・ページ数を記録する。
+    on_page コールバック（品質スコアリング・逐次出力）の消費分も含む。
+    """
     if name not in TABLE_STRATEGIES:
         raise ValueError(
             f"Unknown table strategy: {name}. "
             f"Available: {list(TABLE_STRATEGIES.keys())}"
         )
-    return TABLE_STRATEGIES[name](pdf_path)
+    with measure_resources() as usage:
+        result = TABLE_STRATEGIES[name](pdf_path, **options)
+    usage.pages_skipped = result.usage.pages_skipped
+    usage.pages_processed = result.page_count - usage.pages_skipped
+    result.usage = usage
+    return result
@@ -0,0 +1,276 @@
+"""
+抽出 CLI 向けのプロファイリングフック
+
+extract_pdf_text.py / extract_tables.py / evaluate_extraction.py の --profile で使う。
+処理をラベル付きの区間 (戦略実行・正規化・品質スコアリング・シリアライズ) に分け、
+区間ごとに計測結果を出力する。
+
+    cpu: cProfile を区間ごとに取り、pstats ファイルと上位関数のテキストを出力する。
+         併せてサンプリングでスタックを収集し、collapsed-stack 形式
+         (flamegraph.pl / speedscope で読める) で出力する。
+    mem: tracemalloc で区間ごとのピーク使用量と確保量の多い行 (top allocators) を出力する。
+
+区間は入れ子にできる。cProfile の結果とピーク使用量は内側の区間に排他的に
+割り当てられる（外側の区間には内側の区間の分を含まない）。wall 時間と
+top allocators は内側の区間を含む区間全体の値で、top allocators は
+ルート区間 (total) 直下の区間についてのみ集計する。
+プロファイルが無効なときの profile_region はほぼコストなしで何もしない。
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+PROFILE_MODES = ["cpu", "mem"]
+
+# collapsed-stack 用のスタックサンプリング間隔 (秒)
+SAMPLE_INTERVAL_S = 0.005
+# テキストレポートに出す上位関数・上位確保行の数
+REPORT_TOP_N = 25
+# top allocators を集計する区間の深さ（ルート区間の直下のみ）。
+# スナップショットの比較は1回あたり秒単位かかるため、ルート区間や
+# ページ単位で繰り返し入る深い区間では取らない。
+MEM_SNAPSHOT_DEPTH = 2
+
+# top allocators から除外するファイル（計測自体の確保）
+_IGNORED_ALLOCATION_FILES = {__file__, tracemalloc.__file__}
+
+ROOT_REGION = "total"
+
+_active: "Profiler | None" = None
+
+
+class _RegionStats:
+    """1つのラベルについて集計した区間の計測値。"""
+
+    def __init__(self, mode: str):
+        self.calls = 0
+        self.wall_s = 0.0
+        self.profile = cProfile.Profile() if mode == "cpu" else None
+        self.peak_bytes = 0
+        self.allocations: Counter[str] = Counter()
+
+
+class Profiler:
+    """ラベル付き区間ごとに CPU またはメモリのプロファイルを取る。"""
+
+    def __init__(self, mode: str):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}. Available: {PROFILE_MODES}")
+        self.mode = mode
+        self.regions: dict[str, _RegionStats] = {}
+        self._stack: list[str] = []
+        self._labels: tuple[str, ...] = ()  # サンプラースレッドが読む現在の区間
+        self._samples: Counter[str] = Counter()
+        self._thread_id = threading.get_ident()
+        self._sampler: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.written: list[str] = []  # write() で書き出したファイル
+
+    # ----------------------------------------------------------------- 区間
+
+    def _stats(self, label: str) -> _RegionStats:
+        if label not in self.regions:
+            self.regions[label] = _RegionStats(self.mode)
+        return self.regions[label]
+
+    def _pause(self, label: str) -> None:
+        """区間の計測を一時停止する（内側の区間に入るとき）。"""
+        stats = self.regions[label]
+        if self.mode == "cpu":
+            stats.profile.disable()
+        else:
+            stats.peak_bytes = max(stats.peak_bytes, tracemalloc.get_traced_memory()[1])
+
+    def _resume(self, label: str) -> None:
+        """区間の計測を再開する（内側の区間から戻ったとき）。"""
+        if self.mode == "cpu":
+            self.regions[label].profile.enable()
+        else:
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def region(self, label: str) -> Iterator[None]:
+        """ラベル付き区間。同じラベルの区間は何度入っても1つに集計される。"""
+        if self._stack:
+            self._pause(self._stack[-1])
+        stats = self._stats(label)
+        stats.calls += 1
+        self._stack.append(label)
+        self._labels = tuple(self._stack)
+
+        snapshot = None
+        if self.mode == "mem" and len(self._stack) == MEM_SNAPSHOT_DEPTH:
+            snapshot = tracemalloc.take_snapshot()
+        self._resume(label)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.wall_s += time.perf_counter() - start
+            self._pause(label)
+            if snapshot is not None:
+                for diff in tracemalloc.take_snapshot().compare_to(snapshot, "lineno"):
+                    frame = diff.traceback[0]
+                    if diff.size_diff > 0 and frame.filename not in _IGNORED_ALLOCATION_FILES:
+                        stats.allocations[f"{frame.filename}:{frame.lineno}"] += diff.size_diff
+            self._stack.pop()
+            self._labels = tuple(self._stack)
+            if self._stack:
+                self._resume(self._stack[-1])
+
+    # ----------------------------------------------------------------- 開始/終了
+
+    def start(self) -> None:
+        if self.mode == "mem":
+            tracemalloc.start()
+        else:
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        if self.mode == "mem":
+            tracemalloc.stop()
+        elif self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+
+    def _sample_loop(self) -> None:
+        """計測対象スレッドのスタックを一定間隔で採取する。"""
+        while not self._stop.wait(SAMPLE_INTERVAL_S):
+            frame = sys._current_frames().get(self._thread_id)
+            labels = self._labels
+            if frame is None or not labels:
+                continue
+            stack: list[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                frame = frame.f_back
+            stack.reverse()
+            self._samples[";".join([*labels, *stack])] += 1
+
+    # ----------------------------------------------------------------- 出力
+
+    def write(self, base_path: str) -> list[str]:
+        """base_path を接頭辞としてプロファイルを書き出し、書いたパスを返す。"""
+        if self.mode == "cpu":
+            self.written = self._write_cpu(base_path)
+        else:
+            self.written = self._write_mem(base_path)
+        return self.written
+
+    def _write_cpu(self, base_path: str) -> list[str]:
+        written: list[str] = []
+        report = io.StringIO()
+        for label, stats in self.regions.items():
+            path = f"{base_path}.{_file_label(label)}.pstats"
+            stats.profile.dump_stats(path)
+            written.append(path)
+
+            report.write(f"=== {label}: {stats.calls} call(s), {stats.wall_s * 1000:.1f} ms wall ===\n")
+            if stats.profile.getstats():
+                ps = pstats.Stats(stats.profile, stream=report)
+                ps.sort_stats("cumulative").print_stats(REPORT_TOP_N)
+            report.write("\n")
+
+        collapsed_path = f"{base_path}.collapsed"
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self._samples.items()):
+                f.write(f"{stack} {count}\n")
+        written.append(collapsed_path)
+
+        text_path = f"{base_path}.txt"
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+        written.append(text_path)
+        return written
+
+    def _write_mem(self, base_path: str) -> list[str]:
+        summary = {
+            label: {
+                "calls": stats.calls,
+                "wall_ms": round(stats.wall_s * 1000, 1),
+                "peak_kib": round(stats.peak_bytes / 1024, 1),
+                "top_allocators": [
+                    {"location": location, "size_kib": round(size / 1024, 1)}
+                    for location, size in stats.allocations.most_common(REPORT_TOP_N)
+                ],
+            }
+            for label, stats in self.regions.items()
+        }
+        json_path = f"{base_path}.json"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        text_path = f"{base_path}.txt"
+        with open(text_path, "w", encoding="utf-8") as f:
+            for label, entry in summary.items():
+                f.write(
+                    f"=== {label}: {entry['calls']} call(s), {entry['wall_ms']} ms wall, "
+                    f"peak {entry['peak_kib']} KiB ===\n"
+                )
+                for alloc in entry["top_allocators"]:
+                    f.write(f"  {alloc['size_kib']:>12.1f} KiB  {alloc['location']}\n")
+                f.write("\n")
+        return [json_path, text_path]
+
+
+def profile_base_path(output_path: str | None, pdf_path: str) -> str:
+    """
+    プロファイル出力の接頭辞を決める。出力ファイルがあればその隣、
+    標準出力の場合はカレントディレクトリに PDF 名で置く。
+    """
+    if output_path:
+        return output_path
+    return str(Path.cwd() / Path(pdf_path).stem)
+
+
+def _file_label(label: str) -> str:
+    """区間ラベルをファイル名に使える形にする。"""
+    return "".join(c if c.isalnum() or c in "-_" else "-" for c in label)
+
+
+@contextmanager
+def profile_region(label: str) -> Iterator[None]:
+    """プロファイル有効時のみ計測するラベル付き区間。"""
+    if _active is None:
+        yield
+        return
+    with _active.region(label):
+        yield
+
+
+@contextmanager
+def profile_session(mode: str | None, base_path: str) -> Iterator[Profiler | None]:
+    """
+    mode が指定されていればプロファイルを有効にし、終了時に
+    <base_path>.<mode>profile.* へ書き出す（パスは Profiler.written）。
+    mode が None なら何もしない。
+    """
+    global _active
+    if mode is None:
+        yield None
+        return
+
+    profiler = Profiler(mode)
+    _active = profiler
+    profiler.start()
+    try:
+        with profiler.region(ROOT_REGION):
+            yield profiler
+    finally:
+        profiler.stop()
+        _active = None
+        profiler.write(f"{base_path}.{mode}profile")
@@ -0,0 +1,185 @@
+"""
+プロセスのリソース使用量計測ヘルパー
+
+抽出処理のメモリ上限制御やベンチマークで使う RSS 取得処理と、
+抽出結果に記録する CPU 時間・メモリ・読み込み量の計測をまとめる。
+psutil があれば使用し、無ければ /proc (Linux) にフォールバックする。
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+# measure_resources が RSS を標本化する間隔（秒）
+RSS_SAMPLE_INTERVAL_S = 0.01
+
+
+@dataclass
+class ResourceUsage:
+    """1回の抽出戦略実行で消費したリソース。"""
+
+    cpu_ms: int = 0  # CPU 時間 (ユーザー + システム、待機した子プロセス分を含む)
+    peak_rss_delta_mb: float | None = None  # 実行中のピーク RSS − 開始時の RSS
+    bytes_read: int | None = None  # 読み込んだバイト数 (キャッシュ由来を含む)
+    pages_processed: int = 0  # 抽出できたページ数
+    pages_skipped: int = 0  # 抽出に失敗して空扱いにしたページ数
+
+    def quality_per_cpu_second(self, quality_score: float) -> float | None:
+        """CPU 1秒あたりの品質スコア。CPU 時間が計れない場合は None。"""
+        if self.cpu_ms <= 0:
+            return None
+        return quality_score / (self.cpu_ms / 1000)
+
+    def format(self, quality_score: float | None = None) -> str:
+        """ログ出力用の1行表現（例: "cpu=812ms rss+=12.3MB read=1.2MB pages=39/39"）。"""
+        parts = [f"cpu={self.cpu_ms}ms"]
+        if self.peak_rss_delta_mb is not None:
+            parts.append(f"rss+={self.peak_rss_delta_mb:.1f}MB")
+        if self.bytes_read is not None:
+            parts.append(f"read={self.bytes_read / (1024 * 1024):.1f}MB")
+        total = self.pages_processed + self.pages_skipped
+        parts.append(f"pages={self.pages_processed}/{total}")
+        if quality_score is not None:
+            per_cpu = self.quality_per_cpu_second(quality_score)
+            if per_cpu is not None:
+                parts.append(f"score/cpu-s={per_cpu:.3f}")
+        return " ".join(parts)
+
+
+def current_rss_mb() -> float | None:
+    """
+    現在のプロセスの RSS (常駐メモリ) を MB 単位で返す。
+    取得できない環境では None を返す。
+    """
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+
+    # Linux: /proc/self/statm の2列目が常駐ページ数
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss_mb() -> float | None:
+    """
+    現在のプロセスのピーク RSS（プロセス開始からの最高水位）を MB 単位で返す。
+    一度上がると下がらないため、区間ごとの増分の計測には使えない。
+    resource モジュールが無い環境 (Windows) では None を返す。
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KiB、macOS はバイト単位
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def current_read_bytes() -> int | None:
+    """
+    現在のプロセスがこれまでに読み込んだバイト数を返す。
+    取得できない環境では None を返す。
+    """
+    try:
+        import psutil
+
+        counters = psutil.Process().io_counters()
+        return getattr(counters, "read_chars", counters.read_bytes)
+    except (ImportError, AttributeError, NotImplementedError):
+        pass
+
+    # Linux: /proc/self/io の rchar（ページキャッシュからの読み込みも含む）
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _cpu_seconds() -> float:
+    """自プロセスと待機済み子プロセス (tesseract 等) の CPU 時間の合計。"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class _RssSampler:
+    """
+    別スレッドで現在の RSS を一定間隔で標本化し、区間内の最大値を記録する。
+    GIL を持ったままの長い C 呼び出しの途中は標本化できないので、
+    measure_resources ではプロセスの最高水位が区間内に更新された場合にそれも使う。
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _sample(self) -> None:
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "_RssSampler":
+        if self.start_mb is not None:
+            self._thread.start()
+        return self
+
+    def stop(self) -> float | None:
+        """標本化を止め、区間内のピーク RSS (MB) を返す。"""
+        if self._thread.is_alive():
+            self._stop.set()
+            self._thread.join()
+        self._sample()
+        return self.peak_mb
+
+
+@contextmanager
+def measure_resources() -> Iterator[ResourceUsage]:
+    """
+    with ブロック内で消費した CPU 時間・ピーク RSS 増分・読み込みバイト数を計測する。
+    ピーク RSS 増分は、ブロック実行中に標本化した RSS の最大値と開始時の RSS の差。
+    ページ数は計測できないため、呼び出し側で pages_processed / pages_skipped を設定する。
+    """
+    usage = ResourceUsage()
+    cpu_start = _cpu_seconds()
+    high_water_start = peak_rss_mb()
+    read_start = current_read_bytes()
+    sampler = _RssSampler().start()
+    try:
+        yield usage
+    finally:
+        peak = sampler.stop()
+        usage.cpu_ms = int((_cpu_seconds() - cpu_start) * 1000)
+        high_water_end = peak_rss_mb()
+        if high_water_start is not None and high_water_end is not None and high_water_end > high_water_start:
+            # 最高水位がブロック内で更新された = ブロック内のピークそのもの
+            peak = max(peak or 0.0, high_water_end)
+        if sampler.start_mb is not None and peak is not None:
+            usage.peak_rss_delta_mb = round(max(peak - sampler.start_mb, 0.0), 1)
+        read_end = current_read_bytes()
+        if read_start is not None and read_end is not None:
+            usage.bytes_read = read_end - read_start
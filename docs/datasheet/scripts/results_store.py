@@ -0,0 +1,163 @@
+"""
+評価結果のローカル SQLite ストア
+
+evaluate_extraction.py の (データシート, 戦略) ごとの結果行を、完了した時点で
+SQLite に保存する。キーは (PDF内容のハッシュ, データシートID, コードバージョン, 戦略)
+で、中断した評価の再開 (--resume) や、過去の実行との比較クエリに使う。
+内容が同じ PDF が別のデータシートIDで置かれていることがあるため、
+ハッシュだけでなくデータシートIDもキーに含める。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+
+# コードバージョンの算出対象（抽出結果・品質スコアに影響するモジュール）
+VERSIONED_MODULES = [
+    "pdf_extractors.py",
+    "pdf_ocr.py",
+    "pdf_quality.py",
+    "pdf_normalize.py",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    code_version TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    strategies TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    pdf_sha256 TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    datasheet_id TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    quality_score REAL,
+    elapsed_ms INTEGER,
+    error TEXT,
+    row_json TEXT NOT NULL,
+    PRIMARY KEY (pdf_sha256, datasheet_id, code_version, strategy)
+);
+CREATE INDEX IF NOT EXISTS idx_results_datasheet ON results (datasheet_id, strategy);
+"""
+
+
+def file_sha256(path: str) -> str:
+    """ファイル内容の SHA-256 を返す。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_code_version(
+    script_dir: str | Path | None = None, modules: list[str] | None = None
+) -> str:
+    """
+    抽出・品質評価モジュールのソースからコードバージョンを算出する。
+    いずれかのモジュールが変わると別バージョンとして扱われる。
+    modules を省略した場合は VERSIONED_MODULES を対象にする。
+    """
+    base = Path(script_dir) if script_dir else Path(__file__).parent
+    digest = hashlib.sha256()
+    for name in modules or VERSIONED_MODULES:
+        path = base / name
+        if path.exists():
+            digest.update(name.encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+class ResultsStore:
+    """評価結果行を保存・取得する SQLite ストア。"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self._migrate()
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def _migrate(self) -> None:
+        """キーにデータシートIDを含まない旧形式の results を新しいキーで作り直す。"""
+        key = [
+            row[1]
+            for row in sorted(self.conn.execute("PRAGMA table_info(results)"), key=lambda r: r[5])
+            if row[5]
+        ]
+        if not key or "datasheet_id" in key:
+            return
+        self.conn.execute("ALTER TABLE results RENAME TO results_old")
+        self.conn.execute("DROP INDEX IF EXISTS idx_results_datasheet")
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute("INSERT OR REPLACE INTO results SELECT * FROM results_old")
+        self.conn.execute("DROP TABLE results_old")
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def start_run(self, code_version: str, output_dir: str, strategies: list[str]) -> str:
+        """実行を登録して run_id を返す。"""
+        run_id = uuid.uuid4().hex[:12]
+        self.conn.execute(
+            "INSERT INTO runs (run_id, started_at, code_version, output_dir, strategies) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (run_id, time.time(), code_version, output_dir, ",".join(strategies)),
+        )
+        self.conn.commit()
+        return run_id
+
+    def has_result(
+        self, pdf_sha256: str, datasheet_id: str, code_version: str, strategy: str
+    ) -> bool:
+        """同じ PDF・データシート・コードバージョン・戦略の結果が保存済みか。"""
+        cur = self.conn.execute(
+            "SELECT 1 FROM results "
+            "WHERE pdf_sha256 = ? AND datasheet_id = ? AND code_version = ? AND strategy = ?",
+            (pdf_sha256, datasheet_id, code_version, strategy),
+        )
+        return cur.fetchone() is not None
+
+    def save_result(self, pdf_sha256: str, code_version: str, run_id: str, row: dict) -> None:
+        """結果行を保存する（同じキーは上書き）。完了ごとに即コミットする。"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results "
+            "(pdf_sha256, code_version, strategy, datasheet_id, run_id, finished_at, "
+            " quality_score, elapsed_ms, error, row_json) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                pdf_sha256,
+                code_version,
+                row["strategy"],
+                row["datasheet_id"],
+                run_id,
+                time.time(),
+                row.get("quality_score"),
+                row.get("elapsed_ms"),
+                row.get("error", ""),
+                json.dumps(row, ensure_ascii=False),
+            ),
+        )
+        self.conn.commit()
+
+    def load_row(
+        self, pdf_sha256: str, datasheet_id: str, code_version: str, strategy: str
+    ) -> dict | None:
+        """保存済みの結果行を返す。無ければ None。"""
+        cur = self.conn.execute(
+            "SELECT row_json FROM results "
+            "WHERE pdf_sha256 = ? AND datasheet_id = ? AND code_version = ? AND strategy = ?",
+            (pdf_sha256, datasheet_id, code_version, strategy),
+        )
+        found = cur.fetchone()
+        return json.loads(found[0]) if found else None
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+ワーカー数 × 文書サイズのスケーラビリティ・スイープ
+
+バッチノードのサイズ決めのため、テキスト抽出・表抽出の各戦略をプロセスプールで
+並列実行し、ワーカー数と文書サイズの格子上でスループットを計測する。
+ワーカー数ごとの仕事量は一定（強スケーリング）で、ワーカー数 1 を基準にした
+高速化率 (speedup) と並列化効率 (efficiency = speedup / workers)、
+ワーカーあたりのピーク RSS を CSV とテキストチャートで出力する。
+
+プロセスプール特有のオーバーヘッドも併せて記録する:
+    pool_start_ms   ワーカープロセスの起動
+    reopen_ms       タスクごとの文書オープン（抽出結果の "open" スパンの合計）
+    pickle_ms       ワーカーでの抽出結果のシリアライズ（pickle_kb はそのサイズ）
+    unpickle_ms     親プロセスでのデシリアライズ
+    ipc_ms          ワーカーが結果を返してから親プロセスが受け取るまで
+
+文書は generate_synthetic_corpus.py で --sizes のページ数ごとに生成し、
+--corpus-dir にキャッシュする（同じ引数からは同じPDFが生成される）。
+
+使用方法:
+    python scaling_sweep.py
+    python scaling_sweep.py --workers 1,2,4,8 --sizes 10,100,500
+    python scaling_sweep.py --text-strategies pymupdf --table-strategies textalign --csv sweep.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import multiprocessing
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_extraction import clear_caches
+from generate_synthetic_corpus import MAX_PAGES, MIN_PAGES, generate_document, synthetic_id
+from pdf_extractors import STRATEGIES
+from pdf_table_extractor import TABLE_STRATEGIES
+from resource_usage import peak_rss_mb
+from soak_test import KINDS, parse_list
+
+# 文書オープンのスパン名（timing_spans で各戦略が記録するもの）
+OPEN_SPAN = "open"
+
+# 全ワーカーの起動を待つ上限（秒）
+READY_TIMEOUT_S = 300
+
+# テキストチャートの棒の最大幅（文字数）
+CHART_WIDTH = 50
+
+CSV_FIELDS = [
+    "kind",
+    "strategy",
+    "pages_per_doc",
+    "workers",
+    "tasks",
+    "wall_s",
+    "pages_per_sec",
+    "speedup",
+    "efficiency",
+    "rss_per_worker_mb",
+    "max_worker_rss_mb",
+    "pool_start_ms",
+    "task_ms",
+    "reopen_ms",
+    "pickle_ms",
+    "pickle_kb",
+    "unpickle_ms",
+    "ipc_ms",
+    "errors",
+]
+
+
+def _sweep_task(kind: str, strategy: str, pdf_path: str) -> tuple[dict, bytes | None]:
+    """
+    ワーカーで1文書を抽出する。実運用のパイプラインと同様に抽出結果全体を
+    pickle して返し、ワーカー内の処理時間とシリアライズのコストを計測値に含める。
+    """
+    clear_caches()
+    _, run = KINDS[kind]
+    metrics = {
+        "pid": os.getpid(),
+        "task_ms": 0.0,
+        "reopen_ms": 0.0,
+        "pickle_ms": 0.0,
+        "pickle_bytes": 0,
+        "pages": 0,
+        "peak_rss_mb": None,
+        "error": "",
+        "sent_at": 0.0,
+    }
+    payload = None
+    start = time.perf_counter()
+    try:
+        result = run(strategy, pdf_path)
+        metrics["task_ms"] = (time.perf_counter() - start) * 1000
+        metrics["pages"] = result.page_count
+        metrics["reopen_ms"] = result.spans.stage_totals().get(OPEN_SPAN, {}).get("total_ms", 0.0)
+
+        pickle_start = time.perf_counter()
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        metrics["pickle_ms"] = (time.perf_counter() - pickle_start) * 1000
+        metrics["pickle_bytes"] = len(payload)
+    except Exception as e:
+        metrics["task_ms"] = (time.perf_counter() - start) * 1000
+        metrics["error"] = str(e)[:200]
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    # 往復時間から IPC 分を求めるため、ワーカー側の送出時刻を記録する
+    # （time.time() は fork / spawn したプロセス間で共通の時計）
+    metrics["sent_at"] = time.time()
+    return metrics, payload
+
+
+# ワーカー起動時に渡される、全ワーカーが揃うのを待つためのバリア
+_ready_barrier = None
+
+
+def _init_worker(barrier) -> None:
+    global _ready_barrier
+    _ready_barrier = barrier
+
+
+def _worker_ready(_index: int) -> int:
+    """
+    全ワーカーがこのタスクに到達するまで待つ。各ワーカーが1件ずつ抱えたまま
+    ブロックするので、workers 件すべてが終わった時点で全ワーカーが起動済みになる。
+    """
+    _ready_barrier.wait(timeout=READY_TIMEOUT_S)
+    return os.getpid()
+
+
+def _mean(values: list[float]) -> float:
+    return statistics.fmean(values) if values else 0.0
+
+
+def run_cell(
+    kind: str, strategy: str, pdf_path: str, pages_per_doc: int, workers: int, tasks: int
+) -> dict:
+    """1つの格子点 (戦略, 文書, ワーカー数) で tasks 件の抽出を並列実行して計測する。"""
+    pool_start = time.perf_counter()
+    barrier = multiprocessing.Barrier(workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(barrier,)) as pool:
+        # 計測前に全ワーカーを起動しておく（起動コストは pool_start_ms に分離）
+        pids = set(pool.map(_worker_ready, range(workers)))
+        if len(pids) != workers:
+            raise RuntimeError(f"only {len(pids)} of {workers} pool workers started")
+        pool_start_ms = (time.perf_counter() - pool_start) * 1000
+
+        start = time.perf_counter()
+        submitted = [pool.submit(_sweep_task, kind, strategy, pdf_path) for _ in range(tasks)]
+
+        metrics: list[dict] = []
+        unpickle_ms: list[float] = []
+        ipc_ms: list[float] = []
+        for future in as_completed(submitted):
+            received = time.time()
+            task, payload = future.result()
+            if payload is not None:
+                unpickle_start = time.perf_counter()
+                pickle.loads(payload)
+                unpickle_ms.append((time.perf_counter() - unpickle_start) * 1000)
+            # ワーカーが結果を返してから親が受け取るまで（結果の転送とキュー処理）
+            ipc_ms.append(max((received - task["sent_at"]) * 1000, 0.0))
+            metrics.append(task)
+        wall_s = time.perf_counter() - start
+
+    ok = [m for m in metrics if not m["error"]]
+    pages = sum(m["pages"] for m in ok)
+    # ワーカーごとのピーク RSS（同じワーカーの最後の報告値が最大）
+    worker_rss: dict[int, float] = {}
+    for m in metrics:
+        if m["peak_rss_mb"] is not None:
+            worker_rss[m["pid"]] = max(worker_rss.get(m["pid"], 0.0), m["peak_rss_mb"])
+
+    return {
+        "kind": kind,
+        "strategy": strategy,
+        "pages_per_doc": pages_per_doc,
+        "workers": workers,
+        "tasks": tasks,
+        "wall_s": round(wall_s, 3),
+        "pages_per_sec": round(pages / wall_s, 2) if wall_s > 0 else 0.0,
+        "speedup": None,
+        "efficiency": None,
+        "rss_per_worker_mb": round(_mean(list(worker_rss.values())), 1) if worker_rss else None,
+        "max_worker_rss_mb": round(max(worker_rss.values()), 1) if worker_rss else None,
+        "pool_start_ms": round(pool_start_ms, 1),
+        "task_ms": round(_mean([m["task_ms"] for m in ok]), 1),
+        "reopen_ms": round(_mean([m["reopen_ms"] for m in ok]), 2),
+        "pickle_ms": round(_mean([m["pickle_ms"] for m in ok]), 2),
+        "pickle_kb": round(_mean([m["pickle_bytes"] for m in ok]) / 1024, 1),
+        "unpickle_ms": round(_mean(unpickle_ms), 2),
+        "ipc_ms": round(_mean(ipc_ms), 2),
+        "errors": len(metrics) - len(ok),
+    }
+
+
+def compute_speedups(rows: list[dict]) -> None:
+    """同じ (種類, 戦略, 文書サイズ) の最小ワーカー数の行を基準に speedup / efficiency を埋める。"""
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        groups.setdefault((row["kind"], row["strategy"], row["pages_per_doc"]), []).append(row)
+    for group in groups.values():
+        base = min(group, key=lambda r: r["workers"])
+        if not base["pages_per_sec"]:
+            continue
+        for row in group:
+            speedup = row["pages_per_sec"] / base["pages_per_sec"]
+            row["speedup"] = round(speedup, 3)
+            row["efficiency"] = round(speedup * base["workers"] / row["workers"], 3)
+
+
+def format_chart(rows: list[dict]) -> str:
+    """
+    speedup の棒グラフ。'#' が実測、'.' が理想値 (ワーカー数に比例) までの不足分。
+    """
+    lines: list[str] = []
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        groups.setdefault((row["kind"], row["strategy"], row["pages_per_doc"]), []).append(row)
+
+    for (kind, strategy, pages), group in groups.items():
+        group = sorted(group, key=lambda r: r["workers"])
+        base_workers = group[0]["workers"]
+        max_ideal = max(r["workers"] / base_workers for r in group)
+        max_speedup = max((r["speedup"] or 0.0) for r in group)
+        scale = CHART_WIDTH / max(max_ideal, max_speedup, 1.0)
+        lines.append(f"{kind}/{strategy} {pages} pages/doc")
+        for row in group:
+            ideal = row["workers"] / base_workers
+            speedup = row["speedup"] or 0.0
+            filled = round(speedup * scale)
+            missing = max(round(ideal * scale) - filled, 0)
+            efficiency = f"{row['efficiency']:.0%}" if row["efficiency"] is not None else "-"
+            rss = f"{row['rss_per_worker_mb']:.0f}MB" if row["rss_per_worker_mb"] else "-"
+            lines.append(
+                f"  {row['workers']:>3d}w |{'#' * filled}{'.' * missing:<{CHART_WIDTH - filled}s}| "
+                f"{speedup:5.2f}x eff={efficiency:>4s} rss/worker={rss}"
+            )
+        overhead = group[-1]
+        lines.append(
+            f"       reopen={overhead['reopen_ms']:.1f}ms pickle={overhead['pickle_ms']:.1f}ms "
+            f"({overhead['pickle_kb']:.0f}KB) unpickle={overhead['unpickle_ms']:.1f}ms "
+            f"ipc={overhead['ipc_ms']:.1f}ms task={overhead['task_ms']:.0f}ms "
+            f"pool_start={overhead['pool_start_ms']:.0f}ms"
+        )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_csv(rows: list[dict], csv_path: str) -> None:
+    """スイープ結果をCSVファイルに出力する。"""
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def prepare_corpus(corpus_dir: str, sizes: list[int], seed: int) -> dict[int, str]:
+    """ページ数ごとの合成文書を用意する（生成済みなら再利用）。"""
+    docs = {}
+    for pages in sizes:
+        datasheet_id = synthetic_id(pages, seed)
+        pdf_path = os.path.join(corpus_dir, datasheet_id, f"{datasheet_id}.pdf")
+        if not os.path.exists(pdf_path):
+            print(f"Generating {pages}-page document...", flush=True)
+            pdf_path = generate_document(corpus_dir, pages, seed).pdf_path
+        docs[pages] = pdf_path
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="ワーカー数 × 文書サイズで抽出のスループット・並列化効率・メモリを計測する"
+    )
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, *(2 ** i for i in range(1, 8) if 2 ** i <= cpu_count), cpu_count})
+    parser.add_argument(
+        "--workers",
+        default=",".join(str(w) for w in default_workers),
+        help=f"ワーカー数（カンマ区切り）。デフォルト: {','.join(str(w) for w in default_workers)}",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="10,50,200",
+        help=f"文書あたりのページ数（カンマ区切り、{MIN_PAGES}-{MAX_PAGES}）。デフォルト: 10,50,200",
+    )
+    parser.add_argument(
+        "--tasks-per-worker",
+        type=int,
+        default=2,
+        help="最大ワーカー数あたりのタスク数（全格子点で同じ仕事量にする）。デフォルト: 2",
+    )
+    parser.add_argument(
+        "--text-strategies",
+        default="pymupdf,pdfminer",
+        help=f"テキスト抽出戦略（カンマ区切り、空で省略）。利用可能: {','.join(STRATEGIES)}",
+    )
+    parser.add_argument(
+        "--table-strategies",
+        default="pdfplumber,pymupdf,textalign",
+        help=f"表抽出戦略（カンマ区切り、空で省略）。利用可能: {','.join(TABLE_STRATEGIES)}",
+    )
+    parser.add_argument(
+        "--corpus-dir",
+        default=os.path.join(tempfile.gettempdir(), "datasheet_synthetic_corpus"),
+        help="合成文書の生成・キャッシュ先",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="合成文書の乱数シード。デフォルト: 0")
+    parser.add_argument(
+        "--csv",
+        default="scaling_sweep.csv",
+        help="結果CSVの出力パス（チャートは同名の .txt）。デフォルト: scaling_sweep.csv",
+    )
+    args = parser.parse_args()
+
+    try:
+        workers = sorted({int(w) for w in parse_list(args.workers)})
+        sizes = [int(s) for s in parse_list(args.sizes)]
+    except ValueError:
+        parser.error("--workers and --sizes must be comma-separated integers")
+    if not workers or workers[0] < 1:
+        parser.error("--workers must be positive integers")
+    for size in sizes:
+        if not MIN_PAGES <= size <= MAX_PAGES:
+            parser.error(f"--sizes must be between {MIN_PAGES} and {MAX_PAGES}: {size}")
+
+    targets = []
+    for kind, option in (("text", args.text_strategies), ("table", args.table_strategies)):
+        registry, _ = KINDS[kind]
+        for strategy in parse_list(option):
+            if strategy not in registry:
+                parser.error(f"Unknown {kind} strategy: {strategy}. Available: {list(registry)}")
+            targets.append((kind, strategy))
+    if not targets:
+        parser.error("no strategies selected")
+
+    tasks = max(args.tasks_per_worker, 1) * workers[-1]
+    docs = prepare_corpus(args.corpus_dir, sizes, args.seed)
+    cells = [
+        (kind, strategy, pages, n_workers)
+        for kind, strategy in targets
+        for pages in sizes
+        for n_workers in workers
+    ]
+    print(f"Sweeping {len(cells)} cell(s): workers={workers} sizes={sizes} tasks/cell={tasks}")
+    if workers[-1] > cpu_count:
+        print(f"WARNING: max workers ({workers[-1]}) exceeds CPU count ({cpu_count})")
+
+    rows = []
+    for i, (kind, strategy, pages, n_workers) in enumerate(cells, start=1):
+        row = run_cell(kind, strategy, docs[pages], pages, n_workers, tasks)
+        rows.append(row)
+        status = f"{row['errors']} error(s)" if row["errors"] else f"{row['pages_per_sec']:.1f} pages/s"
+        print(
+            f"[{i}/{len(cells)}] {kind}/{strategy} {pages}p x{n_workers}: "
+            f"{status} wall={row['wall_s']:.2f}s",
+            flush=True,
+        )
+
+    compute_speedups(rows)
+    chart = format_chart(rows)
+    write_csv(rows, args.csv)
+    chart_path = str(Path(args.csv).with_suffix(".txt"))
+    with open(chart_path, "w", encoding="utf-8") as f:
+        f.write(chart)
+
+    print()
+    print("=" * 100)
+    print("Scaling Sweep")
+    print("=" * 100)
+    print(chart)
+    print(f"Sweep results written to: {args.csv}")
+    print(f"Chart written to: {chart_path}")
+
+
+if __name__ == "__main__":
+    main()
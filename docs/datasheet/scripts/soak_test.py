@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+長時間実行ワーカー向けのメモリリーク検出ソークテスト
+
+1つのプロセス内で run_strategy / run_table_strategy をコーパス全体に対して
+--iterations 回繰り返し、反復ごとに GC 後の RSS と tracemalloc の追跡量を記録する。
+ウォームアップ反復（有界キャッシュが埋まるまで）を除いた系列の傾きが閾値を
+超えた場合に失敗（終了コード 1）とする。
+
+戦略ごとの増加量は、各戦略の実行前後 (GC 後) の追跡量・RSS の差を反復ごとに
+累積して求め、追跡量・RSS のどちらかの傾きが閾値を超えた戦略を失敗として
+名前を挙げる。全体の RSS だけが閾値を超えた場合も、RSS の傾きが最も大きい
+戦略を原因の候補として挙げる。これらの戦略については、tracemalloc の
+トレースバックを深くしてその戦略だけを追加で繰り返し、スナップショットの
+差分から残存しているメモリの確保箇所を報告する（見つからなければ
+C ライブラリ内部の確保とみなす）。
+
+tracemalloc は Python オブジェクトの確保のみを追跡する。MuPDF など C ライブラリ
+内部の確保は RSS の傾きにのみ現れる（RSS には glibc が解放済み領域を
+保持し続ける分も含まれるため、RSS の閾値は緩めにしてある）。
+
+使用方法:
+    python soak_test.py [output_dir]
+    python soak_test.py docs/datasheet/output/ --iterations 200
+    python soak_test.py --text-strategies pdfminer --table-strategies pdfplumber --datasheets TI_LM358M
+    python soak_test.py --iterations 100 --json soak.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+from evaluate_extraction import find_pdfs
+from pdf_extractors import STRATEGIES, run_strategy
+from pdf_table_extractor import TABLE_STRATEGIES, run_table_strategy
+from resource_usage import current_rss_mb
+
+# 傾きを計算しない先頭の反復数（キャッシュやインターンの初期確保を除く）
+DEFAULT_WARMUP = 2
+# 失敗とする傾きの閾値
+DEFAULT_MAX_RSS_SLOPE_MB = 1.0  # 全体の RSS (MB / 反復)
+DEFAULT_MAX_TRACED_SLOPE_KB = 64.0  # 戦略ごとの tracemalloc 追跡量 (KB / 反復)
+# 確保箇所の特定用の設定
+SITE_TRACEBACK_DEPTH = 12
+SITE_ITERATIONS = 3
+SITE_TOP_N = 10
+
+# 抽出の種類ごとの戦略レジストリと実行関数
+KINDS = {
+    "text": (STRATEGIES, run_strategy),
+    "table": (TABLE_STRATEGIES, run_table_strategy),
+}
+
+
+def slope(values: list[float]) -> float:
+    """反復番号に対する最小二乗直線の傾き（要素が2未満なら 0.0）。"""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    denominator = sum((x - mean_x) ** 2 for x in range(n))
+    return numerator / denominator
+
+
+def _settled_memory() -> tuple[int, float | None]:
+    """GC 後の (tracemalloc 追跡量 bytes, RSS MB)。"""
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0], current_rss_mb()
+
+
+def _run_corpus(kind: str, strategy: str, pdfs: list[tuple[str, str]]) -> int:
+    """コーパス全体を1回抽出し、失敗した件数を返す。結果はすぐに捨てる。"""
+    _, run = KINDS[kind]
+    errors = 0
+    for _, pdf_path in pdfs:
+        try:
+            run(strategy, pdf_path)
+        except Exception:
+            errors += 1
+    return errors
+
+
+def soak(
+    targets: list[tuple[str, str]],
+    pdfs: list[tuple[str, str]],
+    iterations: int,
+) -> dict:
+    """
+    targets を順に iterations 回実行し、反復ごとの全体・戦略ごとのメモリ系列を返す。
+    tracemalloc は呼び出し側で開始しておく。
+    """
+    labels = [f"{kind}/{strategy}" for kind, strategy in targets]
+    per_strategy = {
+        label: {"traced_kb": [], "rss_mb": [], "errors": 0, "elapsed_s": 0.0}
+        for label in labels
+    }
+    cumulative = {label: [0.0, 0.0] for label in labels}
+    overall = {"traced_kb": [], "rss_mb": []}
+
+    for iteration in range(1, iterations + 1):
+        start = time.perf_counter()
+        for label, (kind, strategy) in zip(labels, targets):
+            traced_before, rss_before = _settled_memory()
+            run_start = time.perf_counter()
+            per_strategy[label]["errors"] += _run_corpus(kind, strategy, pdfs)
+            per_strategy[label]["elapsed_s"] += time.perf_counter() - run_start
+            traced_after, rss_after = _settled_memory()
+
+            # 戦略の実行前後の差を累積した系列（残存分が積み上がる）
+            cumulative[label][0] += (traced_after - traced_before) / 1024
+            if rss_before is not None and rss_after is not None:
+                cumulative[label][1] += rss_after - rss_before
+            per_strategy[label]["traced_kb"].append(round(cumulative[label][0], 1))
+            per_strategy[label]["rss_mb"].append(round(cumulative[label][1], 2))
+
+        traced, rss = _settled_memory()
+        overall["traced_kb"].append(round(traced / 1024, 1))
+        overall["rss_mb"].append(round(rss, 2) if rss is not None else None)
+        print(
+            f"[{iteration}/{iterations}] rss={rss or 0:.1f}MB traced={traced / 1024:.0f}KB "
+            f"({time.perf_counter() - start:.1f}s)",
+            flush=True,
+        )
+
+    return {"overall": overall, "strategies": per_strategy}
+
+
+def allocation_sites(kind: str, strategy: str, pdfs: list[tuple[str, str]]) -> list[dict]:
+    """
+    戦略だけを SITE_ITERATIONS 回繰り返し、前後のスナップショットの差分から
+    残存している確保の多い箇所（トレースバック付き）を返す。
+    """
+    tracemalloc.stop()
+    tracemalloc.start(SITE_TRACEBACK_DEPTH)
+    try:
+        # 1回目は初期確保を含むため差分の基準にしない
+        _run_corpus(kind, strategy, pdfs)
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        for _ in range(SITE_ITERATIONS):
+            _run_corpus(kind, strategy, pdfs)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        tracemalloc.start()
+
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diffs = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), "traceback")
+    sites = []
+    for diff in diffs:
+        if diff.size_diff <= 0:
+            continue
+        sites.append({
+            "size_kb_per_iteration": round(diff.size_diff / 1024 / SITE_ITERATIONS, 1),
+            "count_diff": diff.count_diff,
+            "traceback": [f"{frame.filename}:{frame.lineno}" for frame in reversed(diff.traceback)],
+        })
+        if len(sites) >= SITE_TOP_N:
+            break
+    return sites
+
+
+def evaluate_soak(
+    series: dict,
+    warmup: int,
+    max_rss_slope_mb: float,
+    max_traced_slope_kb: float,
+) -> dict:
+    """
+    ウォームアップ後の系列の傾きを求め、閾値を超えたものを failures に、
+    確保箇所を調べる戦略を suspects に入れる。
+    """
+    report = {"overall": {}, "strategies": {}, "failures": [], "suspects": []}
+
+    overall_rss = [v for v in series["overall"]["rss_mb"][warmup:] if v is not None]
+    report["overall"] = {
+        "rss_slope_mb": round(slope(overall_rss), 3),
+        "traced_slope_kb": round(slope(series["overall"]["traced_kb"][warmup:]), 2),
+    }
+
+    for label, data in series["strategies"].items():
+        entry = {
+            "traced_slope_kb": round(slope(data["traced_kb"][warmup:]), 2),
+            "rss_slope_mb": round(slope(data["rss_mb"][warmup:]), 3),
+            "errors": data["errors"],
+            "elapsed_s": round(data["elapsed_s"], 1),
+            "sites": [],
+        }
+        report["strategies"][label] = entry
+        if entry["traced_slope_kb"] > max_traced_slope_kb:
+            report["failures"].append(
+                f"{label}: retained Python memory grows {entry['traced_slope_kb']:.1f} KB/iteration "
+                f"(limit {max_traced_slope_kb} KB)"
+            )
+        if entry["rss_slope_mb"] > max_rss_slope_mb:
+            report["failures"].append(
+                f"{label}: RSS grows {entry['rss_slope_mb']:.2f} MB/iteration "
+                f"(limit {max_rss_slope_mb} MB)"
+            )
+        if entry["traced_slope_kb"] > max_traced_slope_kb or entry["rss_slope_mb"] > max_rss_slope_mb:
+            report["suspects"].append(label)
+
+    if report["overall"]["rss_slope_mb"] > max_rss_slope_mb:
+        message = (
+            f"overall RSS grows {report['overall']['rss_slope_mb']:.2f} MB/iteration "
+            f"(limit {max_rss_slope_mb} MB)"
+        )
+        if report["strategies"]:
+            worst = max(report["strategies"], key=lambda k: report["strategies"][k]["rss_slope_mb"])
+            message += (
+                f"; largest per-strategy RSS growth: {worst} "
+                f"({report['strategies'][worst]['rss_slope_mb']:+.2f} MB/iteration)"
+            )
+            if worst not in report["suspects"]:
+                report["suspects"].append(worst)
+        report["failures"].append(message)
+    return report
+
+
+def print_report(report: dict, iterations: int, extractions: int) -> None:
+    """ソークテストの結果を表示する。"""
+    print()
+    print("=" * 100)
+    print(f"Soak Test Report ({iterations} iterations, {extractions} extractions)")
+    print("=" * 100)
+    overall = report["overall"]
+    print(
+        f"  overall: RSS {overall['rss_slope_mb']:+.3f} MB/iter, "
+        f"traced {overall['traced_slope_kb']:+.1f} KB/iter"
+    )
+    print(f"  {'strategy':<22s} {'traced KB/iter':>15s} {'RSS MB/iter':>12s} {'errors':>7s} {'time':>8s}")
+    for label, entry in report["strategies"].items():
+        print(
+            f"  {label:<22s} {entry['traced_slope_kb']:>+15.1f} {entry['rss_slope_mb']:>+12.3f} "
+            f"{entry['errors']:>7d} {entry['elapsed_s']:>7.1f}s"
+        )
+        if label in report["suspects"] and not entry["sites"]:
+            print("      (no growing Python allocations: the growth is in native library memory)")
+        for site in entry["sites"]:
+            print(f"      {site['size_kb_per_iteration']:>+9.1f} KB/iter  {site['traceback'][0]}")
+            for frame in site["traceback"][1:4]:
+                print(f"      {'':>17s}  <- {frame}")
+
+    if report["failures"]:
+        print("\n  FAILED:")
+        for failure in report["failures"]:
+            print(f"    {failure}")
+    else:
+        print("\n  PASSED: no memory growth above the thresholds")
+    print()
+
+
+def parse_list(value: str) -> list[str]:
+    """カンマ区切りの引数を空要素を除いたリストにする。"""
+    return [s.strip() for s in value.split(",") if s.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="抽出戦略を同一プロセスで繰り返し実行し、メモリの増加を検出する"
+    )
+    parser.add_argument(
+        "output_dir",
+        nargs="?",
+        default=None,
+        help="docs/datasheet/output/ ディレクトリのパス（省略時は自動検出）",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=50,
+        help="コーパス全体を繰り返す回数。デフォルト: 50",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=DEFAULT_WARMUP,
+        help=f"傾きの計算から除く先頭の反復数。デフォルト: {DEFAULT_WARMUP}",
+    )
+    parser.add_argument(
+        "--text-strategies",
+        default="pymupdf,pdfminer",
+        help=f"テキスト抽出戦略（カンマ区切り、空で省略）。利用可能: {','.join(STRATEGIES)}",
+    )
+    parser.add_argument(
+        "--table-strategies",
+        default="pdfplumber,pymupdf,textalign",
+        help=f"表抽出戦略（カンマ区切り、空で省略）。利用可能: {','.join(TABLE_STRATEGIES)}",
+    )
+    parser.add_argument(
+        "--datasheets",
+        default=None,
+        help="対象のデータシートID（カンマ区切り）。省略時は全件",
+    )
+    parser.add_argument(
+        "--max-rss-slope",
+        type=float,
+        default=DEFAULT_MAX_RSS_SLOPE_MB,
+        help=f"全体の RSS の傾きの上限 (MB/反復)。デフォルト: {DEFAULT_MAX_RSS_SLOPE_MB}",
+    )
+    parser.add_argument(
+        "--max-traced-slope",
+        type=float,
+        default=DEFAULT_MAX_TRACED_SLOPE_KB,
+        help=(
+            "戦略ごとの tracemalloc 追跡量の傾きの上限 (KB/反復)。"
+            f"デフォルト: {DEFAULT_MAX_TRACED_SLOPE_KB}"
+        ),
+    )
+    parser.add_argument(
+        "--json",
+        default=None,
+        help="系列と結果を JSON で出力するパス",
+    )
+    args = parser.parse_args()
+
+    if args.output_dir:
+        output_dir = args.output_dir
+    else:
+        script_dir = Path(__file__).parent
+        output_dir = str(script_dir.parent / "output")
+
+    targets = []
+    for kind, option in (("text", args.text_strategies), ("table", args.table_strategies)):
+        registry, _ = KINDS[kind]
+        for strategy in parse_list(option):
+            if strategy not in registry:
+                parser.error(f"Unknown {kind} strategy: {strategy}. Available: {list(registry)}")
+            targets.append((kind, strategy))
+    if not targets:
+        parser.error("no strategies selected")
+    warmup = max(args.warmup, 0)
+    if args.iterations < warmup + 2:
+        parser.error("--iterations must exceed --warmup by at least 2")
+
+    pdfs = find_pdfs(output_dir)
+    if args.datasheets:
+        wanted = set(parse_list(args.datasheets))
+        pdfs = [(datasheet_id, path) for datasheet_id, path in pdfs if datasheet_id in wanted]
+    if not pdfs:
+        print(f"No PDFs found in {output_dir}")
+        sys.exit(1)
+
+    extractions = args.iterations * len(pdfs) * len(targets)
+    print(f"Output directory: {output_dir}")
+    print(
+        f"Soaking {len(targets)} strategy(ies) over {len(pdfs)} PDF(s) for "
+        f"{args.iterations} iterations ({extractions} extractions)"
+    )
+
+    tracemalloc.start()
+    try:
+        series = soak(targets, pdfs, args.iterations)
+        report = evaluate_soak(series, warmup, args.max_rss_slope, args.max_traced_slope)
+        for label, (kind, strategy) in zip(series["strategies"], targets):
+            if label in report["suspects"]:
+                print(f"Locating allocation sites for {label}...", flush=True)
+                report["strategies"][label]["sites"] = allocation_sites(kind, strategy, pdfs)
+    finally:
+        tracemalloc.stop()
+
+    print_report(report, args.iterations, extractions)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"series": series, "report": report}, f, ensure_ascii=False, indent=2)
+        print(f"Soak results written to: {args.json}")
+
+    sys.exit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
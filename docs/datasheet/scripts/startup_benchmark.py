@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+CLI のコールドスタート計測
+
+extract_pdf_text.py / extract_tables.py / evaluate_extraction.py を
+`python -X importtime` で新しいプロセスとして起動し、--help と各戦略の
+単独実行（および既定の戦略の組み合わせ）について、起動から終了までの時間と
+インポートにかかった時間を計測する。
+
+各戦略のバックエンド (fitz / pdfminer / pdfplumber / numpy / pytesseract) は
+その戦略が選ばれたときだけ読み込まれる前提で、想定外のバックエンドを
+インポートしたケースは unexpected として報告する（--help では何も読み込まない）。
+戦略統計は一時ディレクトリの SQLite に記録させ、実際の統計を汚さない
+（PDF の属性を読む初回だけ fitz を開くので、判定は最後の起動で行う）。
+
+使用方法:
+    python startup_benchmark.py
+    python startup_benchmark.py --repeat 10 -o startup.json
+    python startup_benchmark.py --compare startup_baseline.json
+    python startup_benchmark.py --pdf ../output/Rohm_1SS355TE-17/Rohm_1SS355TE-17.pdf --include-ocr
+
+想定外のバックエンドを読み込んだケース、または --compare 指定時にベースラインより
+起動時間が許容幅を超えて遅くなったケースがあれば終了コード 1 で終了する。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pdf_extractors import STRATEGIES
+from pdf_table_extractor import TABLE_STRATEGIES
+from strategy_stats import STATS_ENV
+
+SCRIPT_DIR = Path(__file__).parent
+
+# 戦略ごとに読み込まれてよいバックエンド（トップレベルのパッケージ名）
+BACKENDS = ["fitz", "pymupdf", "pdfminer", "pdfplumber", "numpy", "pytesseract", "PIL"]
+OCR_BACKENDS = {"fitz", "pymupdf", "pytesseract", "PIL"}
+TEXT_STRATEGY_BACKENDS = {
+    "pymupdf": {"fitz", "pymupdf"},
+    "pdfminer": {"pdfminer"},
+    "ocr": OCR_BACKENDS,
+}
+TABLE_STRATEGY_BACKENDS = {
+    "pdfplumber": {"pdfplumber", "pdfminer"},
+    "pymupdf": {"fitz", "pymupdf"},
+    "textalign": {"fitz", "pymupdf", "numpy"},
+    "ocr": OCR_BACKENDS | {"numpy"},
+}
+
+DEFAULT_REPEAT = 5
+# 比較時の許容幅（相対値）と、それ未満の差は無視する絶対値
+DEFAULT_TOLERANCE = 0.20
+NOISE_FLOOR_MS = 10.0
+# 結果に載せる遅いインポートの数
+TOP_IMPORTS = 5
+
+
+def build_cases(pdf_path: str, corpus_dir: str, include_ocr: bool) -> list[dict]:
+    """
+    計測ケースを列挙する。expected が None のケース（既定の戦略の組み合わせ）は
+    フォールバック次第で読み込むバックエンドが変わるため検査しない。
+    """
+    cases = []
+    for script, registry, backends in (
+        ("extract_pdf_text.py", STRATEGIES, TEXT_STRATEGY_BACKENDS),
+        ("extract_tables.py", TABLE_STRATEGIES, TABLE_STRATEGY_BACKENDS),
+    ):
+        output = os.path.join(tempfile.gettempdir(), f"startup_benchmark.{Path(script).stem}.out")
+        cases.append({"name": f"{script} --help", "args": [script, "--help"], "expected": set()})
+        cases.append({"name": f"{script} (default)", "args": [script, pdf_path, output], "expected": None})
+        for strategy in registry:
+            if strategy == "ocr" and not include_ocr:
+                continue
+            cases.append({
+                "name": f"{script} --strategies {strategy}",
+                "args": [script, pdf_path, output, "--strategies", strategy],
+                "expected": backends.get(strategy, set()),
+            })
+
+    cases.append({
+        "name": "evaluate_extraction.py --help",
+        "args": ["evaluate_extraction.py", "--help"],
+        "expected": set(),
+    })
+    cases.append({
+        "name": "evaluate_extraction.py (1 pdf)",
+        "args": [
+            "evaluate_extraction.py",
+            corpus_dir,
+            "--db",
+            os.path.join(corpus_dir, "startup_benchmark.sqlite"),
+            *(["--include-ocr"] if include_ocr else []),
+        ],
+        "expected": None,
+    })
+    return cases
+
+
+def parse_importtime(stderr: str) -> tuple[float, dict[str, float]]:
+    """
+    -X importtime の出力から、インポート時間の合計 (ms) と
+    トップレベルのモジュールごとの累積時間 (ms) を返す。
+    """
+    top_level: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # ヘッダー行
+        name = parts[2]
+        # インデントのないものがトップレベルのインポート
+        if name.startswith(" ") and not name.startswith("  "):
+            name = name.strip()
+            top_level[name] = top_level.get(name, 0.0) + int(parts[1]) / 1000
+    return sum(top_level.values()), top_level
+
+
+def imported_backends(stderr: str) -> set[str]:
+    """インポートされたバックエンドのトップレベルのパッケージ名。"""
+    found = set()
+    for line in stderr.splitlines():
+        if line.startswith("import time:"):
+            package = line.rsplit("|", 1)[-1].strip().split(".")[0]
+            if package in BACKENDS:
+                found.add(package)
+    return found
+
+
+def run_case(case: dict, repeat: int, stats_path: str) -> dict:
+    """ケースを repeat 回コールドスタートで実行して計測する。"""
+    wall_ms: list[float] = []
+    import_ms: list[float] = []
+    top_imports: dict[str, float] = {}
+    backends: set[str] = set()
+    exit_code = 0
+    env = {**os.environ, STATS_ENV: stats_path}
+    for _ in range(repeat):
+        command = [sys.executable, "-X", "importtime", str(SCRIPT_DIR / case["args"][0]), *case["args"][1:]]
+        start = time.perf_counter()
+        proc = subprocess.run(command, capture_output=True, text=True, cwd=SCRIPT_DIR, env=env)
+        wall_ms.append((time.perf_counter() - start) * 1000)
+        total, top_imports = parse_importtime(proc.stderr)
+        import_ms.append(total)
+        backends = imported_backends(proc.stderr)
+        exit_code = proc.returncode
+
+    expected = case["expected"]
+    unexpected = sorted(backends - expected) if expected is not None else []
+    slowest = sorted(top_imports.items(), key=lambda kv: kv[1], reverse=True)[:TOP_IMPORTS]
+    return {
+        "name": case["name"],
+        "wall_ms": round(statistics.median(wall_ms), 1),
+        "wall_ms_min": round(min(wall_ms), 1),
+        "import_ms": round(statistics.median(import_ms), 1),
+        "backends": sorted(backends),
+        "unexpected_backends": unexpected,
+        "slowest_imports": [{"module": m, "ms": round(ms, 1)} for m, ms in slowest],
+        "exit_code": exit_code,
+    }
+
+
+def compare_results(baseline: dict, results: list[dict], tolerance: float) -> list[str]:
+    """ベースラインより遅くなったケースの説明を返す。"""
+    base = {r["name"]: r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = base.get(result["name"])
+        if not before:
+            continue
+        delta = result["wall_ms_min"] - before["wall_ms_min"]
+        if delta > max(before["wall_ms_min"] * tolerance, NOISE_FLOOR_MS):
+            regressions.append(
+                f"{result['name']}: {before['wall_ms_min']:.0f} -> {result['wall_ms_min']:.0f} ms "
+                f"({delta:+.0f} ms)"
+            )
+    return regressions
+
+
+def print_results(results: list[dict]) -> None:
+    print()
+    print("=" * 100)
+    print("CLI Startup Benchmark")
+    print("=" * 100)
+    print(f"  {'case':<46s} {'wall ms':>8s} {'min':>7s} {'import':>7s}  backends")
+    for r in results:
+        backends = ",".join(r["backends"]) or "-"
+        if r["unexpected_backends"]:
+            backends += f"  UNEXPECTED: {','.join(r['unexpected_backends'])}"
+        if r["exit_code"]:
+            backends += f"  (exit {r['exit_code']})"
+        print(
+            f"  {r['name']:<46s} {r['wall_ms']:>8.1f} {r['wall_ms_min']:>7.1f} "
+            f"{r['import_ms']:>7.1f}  {backends}"
+        )
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抽出 CLI のコールドスタート時間とインポートを計測する")
+    parser.add_argument(
+        "--pdf",
+        default=None,
+        help="戦略の実行に使う PDF（省略時は docs/datasheet/output/ の最小の PDF）",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"ケースごとの起動回数。デフォルト: {DEFAULT_REPEAT}",
+    )
+    parser.add_argument("--include-ocr", action="store_true", help="OCR 戦略も計測する")
+    parser.add_argument("--output", "-o", default=None, help="結果 JSON の出力パス")
+    parser.add_argument(
+        "--compare",
+        default=None,
+        metavar="BASELINE",
+        help="ベースライン JSON と比較し、回帰があれば終了コード 1 で終了する",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"起動時間の増加の許容幅（相対値）。デフォルト: {DEFAULT_TOLERANCE}",
+    )
+    args = parser.parse_args()
+
+    pdf_path = args.pdf
+    if pdf_path is None:
+        pdfs = sorted((SCRIPT_DIR.parent / "output").glob("*/*.pdf"), key=lambda p: p.stat().st_size)
+        if not pdfs:
+            print("No PDFs found; pass --pdf")
+            sys.exit(1)
+        pdf_path = str(pdfs[0])
+    pdf_path = os.path.abspath(pdf_path)
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        # evaluate_extraction.py 用に <id>/<id>.pdf の形の1件だけのコーパスを作る
+        datasheet_id = Path(pdf_path).stem
+        os.makedirs(os.path.join(corpus_dir, datasheet_id))
+        os.symlink(pdf_path, os.path.join(corpus_dir, datasheet_id, f"{datasheet_id}.pdf"))
+
+        cases = build_cases(pdf_path, corpus_dir, args.include_ocr)
+        print(f"Measuring {len(cases)} startup case(s) x{args.repeat} with {Path(pdf_path).name}")
+        results = []
+        for case in cases:
+            result = run_case(case, max(args.repeat, 1), os.path.join(corpus_dir, "strategy_stats.sqlite"))
+            results.append(result)
+            print(f"  {result['name']}: {result['wall_ms']:.0f} ms", flush=True)
+
+    print_results(results)
+    failures = [
+        f"{r['name']}: imports {', '.join(r['unexpected_backends'])}"
+        for r in results
+        if r["unexpected_backends"]
+    ]
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            failures.extend(compare_results(json.load(f), results, args.tolerance))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"python": sys.version.split()[0], "pdf": pdf_path, "repeat": args.repeat, "results": results},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        print(f"Startup results written to: {args.output}")
+
+    if failures:
+        print("REGRESSIONS:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
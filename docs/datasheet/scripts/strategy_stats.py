@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+抽出戦略の統計とコストモデルによる試行順の決定
+
+extract_pdf_text.py / extract_tables.py の実行ごとに、試した戦略の
+品質スコアと所要時間をローカルの SQLite に記録し、PDF の作成ソフト
+(Producer) とメーカー（datasheet-sources.json の短縮名）ごとに
+    - 成功率: 品質スコアが閾値以上だった割合
+    - ページあたりの所要時間
+を集計する。
+
+フォールバックは閾値に達した戦略で止まるので、戦略 i の成功率を p_i、
+所要時間を t_i とすると、順序 s1, s2, ... の期待所要時間は
+    t1 + (1 - p1) t2 + (1 - p1)(1 - p2) t3 + ...
+で、これは t_i / p_i の小さい順に並べたときに最小になる。ただし成功率が
+ほぼ 0 (MIN_SUCCESS_RATE 未満) の戦略は、速くても閾値に届かないので最後に回す。
+
+推定値は Producer とメーカーのグループの実績を、戦略全体の実績（無ければ
+PRIORS の事前値）に PRIOR_WEIGHT 回分だけ寄せて平滑化する。記録が無い
+うちは PRIORS により従来の固定順と同じ順になる。--strategies で明示した
+戦略の順は変えない。
+
+フォールバックは閾値に達した最初の戦略で止まるため、試行順が変わると
+採用される戦略（＝出力）も変わりうる。つまり統計を使う実行の出力は
+ローカルの統計ファイルの内容に依存し、同じ PDF・同じコードでも再現するとは
+限らない。試行予定の順は抽出メタ情報の strategy_plan / strategy_order に、
+実際に試した戦略は strategies_tried に記録される。
+再現性が必要な場合は --no-strategy-stats を付ける。
+
+使用方法:
+    python strategy_stats.py                      # 戦略ごとの集計
+    python strategy_stats.py --kind tables --by producer
+    python strategy_stats.py --pdf ../output/TI_LM358M/TI_LM358M.pdf   # その PDF での推奨順
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).parent
+
+STATS_ENV = "DATASHEET_STRATEGY_STATS"
+DEFAULT_STATS_NAME = "strategy_stats.sqlite"
+SOURCES_PATH = SCRIPT_DIR.parent / "datasheet-sources.json"
+
+# 既定の候補（extract_pdf_text.py / extract_tables.py の従来の固定順）
+DEFAULT_STRATEGIES = {
+    "text": ["pymupdf", "pdfminer", "ocr"],
+    "tables": ["pdfplumber", "pymupdf"],
+}
+
+# 記録の無い戦略の事前値: (成功率, ページあたり ms)。
+# t/p が既定の候補と同じ順になるようにしてある
+PRIORS = {
+    "text": {"pymupdf": (0.8, 20.0), "pdfminer": (0.8, 150.0), "ocr": (0.9, 3000.0)},
+    "tables": {
+        "pdfplumber": (0.7, 150.0),
+        "pymupdf": (0.6, 200.0),
+        "textalign": (0.5, 100.0),
+        "ocr": (0.5, 4000.0),
+    },
+}
+UNKNOWN_PRIOR = (0.5, 1000.0)
+
+# グループの実績を全体の推定値に寄せる強さ（実行回数換算）
+PRIOR_WEIGHT = 2.0
+# これ未満の成功率はほぼ 0 とみなし、t/p によらず最後に試す
+MIN_SUCCESS_RATE = 0.05
+
+UNKNOWN = "unknown"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS strategy_runs (
+    kind TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    datasheet_id TEXT NOT NULL,
+    manufacturer TEXT NOT NULL,
+    producer TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    elapsed_ms INTEGER NOT NULL,
+    quality_score REAL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_manufacturer ON strategy_runs (kind, strategy, manufacturer);
+CREATE INDEX IF NOT EXISTS idx_runs_producer ON strategy_runs (kind, strategy, producer);
+CREATE TABLE IF NOT EXISTS pdf_profiles (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    producer TEXT NOT NULL,
+    page_count INTEGER NOT NULL
+);
+"""
+
+# Producer の版数・括弧書き以降を落とす（"Acrobat Distiller 8.2.6 (Windows)" → "Acrobat Distiller"）
+_PRODUCER_FAMILY_RE = re.compile(r"^[^\d(;,]*")
+_TRADEMARK_RE = re.compile(r"[®©™]")
+
+
+def default_stats_path() -> str:
+    """環境変数 DATASHEET_STRATEGY_STATS、無ければ docs/datasheet/output/strategy_stats.sqlite。"""
+    return os.environ.get(STATS_ENV) or str(SCRIPT_DIR.parent / "output" / DEFAULT_STATS_NAME)
+
+
+@functools.lru_cache(maxsize=1)
+def _manufacturer_short_names() -> tuple[str, ...]:
+    try:
+        with open(SOURCES_PATH, encoding="utf-8") as f:
+            names = set(json.load(f).get("manufacturerShortNames", {}).values())
+    except (OSError, ValueError):
+        names = set()
+    # "Analog_Devices" を "Analog" より先に照合する
+    return tuple(sorted(names, key=len, reverse=True))
+
+
+def manufacturer_for(datasheet_id: str) -> str:
+    """データシートID (<メーカー短縮名>_<型番>) からメーカー短縮名を求める。"""
+    for name in _manufacturer_short_names():
+        if datasheet_id.startswith(f"{name}_"):
+            return name
+    return datasheet_id.split("_", 1)[0] if "_" in datasheet_id else UNKNOWN
+
+
+def producer_family(producer: str) -> str:
+    """Producer 文字列から版数や環境を除いた系統名。"""
+    family = _PRODUCER_FAMILY_RE.match(_TRADEMARK_RE.sub("", producer or "")).group(0)
+    family = " ".join(family.split())
+    return family or UNKNOWN
+
+
+@dataclass
+class PdfProfile:
+    """統計のグループ分けに使う PDF の属性。"""
+
+    datasheet_id: str
+    manufacturer: str
+    producer: str  # producer_family() 済み
+    page_count: int = 0  # 読めなかった場合は 0
+
+
+@dataclass
+class StrategyEstimate:
+    strategy: str
+    success_rate: float
+    ms_per_page: float
+    runs: int  # 推定に使ったグループの実行回数（Producer とメーカーの合計）
+
+    @property
+    def cost(self) -> float:
+        """並べ替えのキー (t / p)。成功率がほぼ 0 なら無限大。"""
+        if self.success_rate < MIN_SUCCESS_RATE:
+            return math.inf
+        return self.ms_per_page / self.success_rate
+
+
+class StrategyStats:
+    """戦略の実行記録を保存し、PDF ごとの試行順を決める SQLite ストア。"""
+
+    def __init__(self, db_path: str | None = None):
+        self.db_path = db_path or default_stats_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        # 並列実行の CLI が同じファイルに書くので、ロック待ちを長めにとる
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # --- PDF の属性 ---
+
+    def profile(self, pdf_path: str) -> PdfProfile:
+        """
+        PDF の属性。Producer とページ数はサイズと mtime が同じ間はキャッシュを使う
+        （読むために PyMuPDF を開くのは初回だけ）。
+        """
+        datasheet_id = Path(pdf_path).stem
+        producer, page_count = self._pdf_info(pdf_path)
+        return PdfProfile(
+            datasheet_id=datasheet_id,
+            manufacturer=manufacturer_for(datasheet_id),
+            producer=producer,
+            page_count=page_count,
+        )
+
+    def _pdf_info(self, pdf_path: str) -> tuple[str, int]:
+        path = os.path.abspath(pdf_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return UNKNOWN, 0
+        row = self.conn.execute(
+            "SELECT producer, page_count FROM pdf_profiles WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, st.st_size, st.st_mtime_ns),
+        ).fetchone()
+        if row:
+            return row[0], row[1]
+        producer, page_count = UNKNOWN, 0
+        try:
+            import fitz  # pymupdf
+
+            with fitz.open(path) as doc:
+                producer = producer_family((doc.metadata or {}).get("producer", ""))
+                page_count = len(doc)
+        except Exception as e:
+            logger.debug(f"Cannot read PDF producer of {path}: {e}")
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pdf_profiles (path, size, mtime_ns, producer, page_count) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, producer, page_count),
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Strategy stats not updated: {e}")
+        return producer, page_count
+
+    # --- 記録 ---
+
+    def record(
+        self,
+        kind: str,
+        strategy: str,
+        profile: PdfProfile,
+        pages: int,
+        elapsed_ms: int,
+        quality_score: float | None,
+    ) -> None:
+        """
+        1戦略の実行結果を記録する。quality_score が None は例外で失敗した実行。
+        記録に失敗しても抽出は続けられるよう、警告を出すだけにする。
+        """
+        try:
+            self.conn.execute(
+                "INSERT INTO strategy_runs (kind, strategy, datasheet_id, manufacturer, producer, "
+                "pages, elapsed_ms, quality_score, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    kind,
+                    strategy,
+                    profile.datasheet_id,
+                    profile.manufacturer,
+                    profile.producer,
+                    max(pages, 1),
+                    elapsed_ms,
+                    quality_score,
+                    time.time(),
+                ),
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Strategy stats not updated: {e}")
+
+    # --- 推定と並べ替え ---
+
+    def _totals(
+        self, kind: str, strategy: str, threshold: float, column: str | None = None, value: str | None = None
+    ) -> tuple[int, int, float]:
+        """(実行回数, 成功回数, ページあたり ms の合計)。"""
+        query = (
+            "SELECT COUNT(*), COALESCE(SUM(quality_score >= ?), 0), "
+            "COALESCE(SUM(CAST(elapsed_ms AS REAL) / pages), 0) "
+            "FROM strategy_runs WHERE kind = ? AND strategy = ?"
+        )
+        params: list = [threshold, kind, strategy]
+        if column is not None:
+            query += f" AND {column} = ?"
+            params.append(value)
+        try:
+            runs, successes, ms_per_page = self.conn.execute(query, params).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Strategy stats unavailable: {e}")
+            return 0, 0, 0.0
+        return runs, successes, ms_per_page
+
+    def estimate(
+        self, kind: str, strategy: str, profile: PdfProfile | None, threshold: float
+    ) -> StrategyEstimate:
+        """
+        Producer・メーカーのグループの実績を、戦略全体の推定値に PRIOR_WEIGHT 回分
+        寄せて平滑化した成功率とページあたり時間。
+        """
+        prior_rate, prior_ms = PRIORS.get(kind, {}).get(strategy, UNKNOWN_PRIOR)
+        runs, successes, ms_sum = self._totals(kind, strategy, threshold)
+        base_rate = (successes + PRIOR_WEIGHT * prior_rate) / (runs + PRIOR_WEIGHT)
+        base_ms = (ms_sum + PRIOR_WEIGHT * prior_ms) / (runs + PRIOR_WEIGHT)
+        if profile is None:
+            return StrategyEstimate(strategy, base_rate, base_ms, runs)
+
+        # Producer とメーカーの両方に一致する実行は両方の根拠として2回数える
+        group_runs, group_successes, group_ms = 0, 0, 0.0
+        for column, value in (("producer", profile.producer), ("manufacturer", profile.manufacturer)):
+            if value == UNKNOWN:
+                continue
+            n, s, ms = self._totals(kind, strategy, threshold, column, value)
+            group_runs += n
+            group_successes += s
+            group_ms += ms
+        return StrategyEstimate(
+            strategy,
+            (group_successes + PRIOR_WEIGHT * base_rate) / (group_runs + PRIOR_WEIGHT),
+            (group_ms + PRIOR_WEIGHT * base_ms) / (group_runs + PRIOR_WEIGHT),
+            group_runs,
+        )
+
+    def order(
+        self, kind: str, strategies: list[str], profile: PdfProfile | None, threshold: float
+    ) -> list[str]:
+        """
+        期待所要時間が最小になる順（t/p の小さい順。同じなら元の順）に並べる。
+        成功率がほぼ 0 の戦略は最後に、ページあたり時間の短い順に並べる。
+        """
+        estimates = [self.estimate(kind, s, profile, threshold) for s in strategies]
+
+        def rank(item: tuple[int, StrategyEstimate]) -> tuple[float, float, int]:
+            index, estimate = item
+            hopeless = math.isinf(estimate.cost)
+            return (estimate.cost, estimate.ms_per_page if hopeless else 0.0, index)
+
+        return [estimate.strategy for _, estimate in sorted(enumerate(estimates), key=rank)]
+
+
+def plan_strategies(
+    kind: str,
+    strategies: list[str] | None,
+    stats: StrategyStats | None,
+    profile: PdfProfile | None,
+    threshold: float,
+) -> tuple[list[str], str]:
+    """
+    実際に試す順と、その決め方 ("explicit" / "cost_model" / "default") を返す。
+    strategies を指定した場合はその順のまま、省略時は既定の候補を stats で並べ替える。
+    """
+    if strategies:
+        return list(strategies), "explicit"
+    default = list(DEFAULT_STRATEGIES[kind])
+    if stats is None:
+        return default, "default"
+    return stats.order(kind, default, profile, threshold), "cost_model"
+
+
+def open_stats(db_path: str | None = None) -> StrategyStats | None:
+    """統計ストアを開く。開けない場合は警告を出して None（統計なしで抽出を続ける）。"""
+    try:
+        return StrategyStats(db_path)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Strategy stats disabled ({db_path or default_stats_path()}): {e}")
+        return None
+
+
+def expected_time_ms(estimates: list[StrategyEstimate], pages: int) -> float:
+    """この順で試したときの、閾値に達するまで（または全戦略を試すまで）の期待所要時間。"""
+    total, reach = 0.0, 1.0
+    for estimate in estimates:
+        total += reach * estimate.ms_per_page * pages
+        reach *= 1 - estimate.success_rate
+    return total
+
+
+# =====================================================================
+# CLI
+# =====================================================================
+
+
+def print_summary(stats: StrategyStats, kind: str, by: str, threshold: float) -> None:
+    rows = stats.conn.execute(
+        f"SELECT strategy, {by}, COUNT(*), SUM(quality_score >= ?), "
+        "AVG(CAST(elapsed_ms AS REAL) / pages) "
+        f"FROM strategy_runs WHERE kind = ? GROUP BY strategy, {by} ORDER BY {by}, strategy",
+        (threshold, kind),
+    ).fetchall()
+    print("=" * 100)
+    print(f"Strategy statistics: {kind} by {by} (threshold {threshold})  [{stats.db_path}]")
+    print("=" * 100)
+    if not rows:
+        print("  (no runs recorded)")
+        return
+    print(f"  {by:<40s} {'strategy':<12s} {'runs':>6s} {'success':>8s} {'ms/page':>9s}")
+    for strategy, group, runs, successes, ms_per_page in rows:
+        print(
+            f"  {group[:40]:<40s} {strategy:<12s} {runs:>6d} "
+            f"{(successes or 0) / runs:>8.0%} {ms_per_page:>9.1f}"
+        )
+
+
+def print_plan(stats: StrategyStats, kind: str, pdf_path: str, threshold: float) -> None:
+    profile = stats.profile(pdf_path)
+    order = stats.order(kind, DEFAULT_STRATEGIES[kind], profile, threshold)
+    estimates = [stats.estimate(kind, s, profile, threshold) for s in order]
+    default = [stats.estimate(kind, s, profile, threshold) for s in DEFAULT_STRATEGIES[kind]]
+    pages = max(profile.page_count, 1)
+    print(f"{Path(pdf_path).name}: manufacturer={profile.manufacturer}, producer={profile.producer}, pages={pages}")
+    for estimate in estimates:
+        print(
+            f"  {estimate.strategy:<12s} success={estimate.success_rate:.0%} "
+            f"ms/page={estimate.ms_per_page:.1f} (producer+manufacturer runs: {estimate.runs})"
+        )
+    print(
+        f"  order: {','.join(order)}  expected {expected_time_ms(estimates, pages):.0f} ms "
+        f"(fixed order {','.join(DEFAULT_STRATEGIES[kind])}: {expected_time_ms(default, pages):.0f} ms)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抽出戦略の統計と、コストモデルによる試行順を表示する")
+    parser.add_argument(
+        "--db",
+        default=None,
+        help=f"統計の SQLite ファイル（環境変数 {STATS_ENV} でも指定可）。デフォルト: {default_stats_path()}",
+    )
+    parser.add_argument(
+        "--kind",
+        choices=list(DEFAULT_STRATEGIES),
+        default="text",
+        help="集計する抽出の種類。デフォルト: text",
+    )
+    parser.add_argument(
+        "--by",
+        choices=["manufacturer", "producer"],
+        default="manufacturer",
+        help="集計のグループ。デフォルト: manufacturer",
+    )
+    parser.add_argument(
+        "--quality-threshold",
+        type=float,
+        default=None,
+        help="成功とみなす品質スコア。デフォルト: text 0.8 / tables 0.6",
+    )
+    parser.add_argument("--pdf", action="append", default=[], help="この PDF での推奨順を表示する（複数可）")
+    args = parser.parse_args()
+
+    threshold = args.quality_threshold
+    if threshold is None:
+        threshold = 0.8 if args.kind == "text" else 0.6
+    stats = StrategyStats(args.db)
+    try:
+        if args.pdf:
+            for pdf_path in args.pdf:
+                print_plan(stats, args.kind, pdf_path, threshold)
+        else:
+            print_summary(stats, args.kind, args.by, threshold)
+    finally:
+        stats.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,16 @@
 
 抽出されたテーブルの構造的健全性を 0.0〜1.0 で評価する。
 テキスト品質 (pdf_quality.py) とは別レイヤーの、表構造に特化した評価。
+
+全セルを1回ずつ分類した CellMatrix を作り、各サブスコアと内訳は
+そのマトリクスから導出する。
 """
 
 from __future__ import annotations
 
+import functools
 import re
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -37,103 +42,180 @@ KNOWN_UNIT_PATTERNS = re.compile(
 
 
 # =====================================================================
-# 個別スコアリング関数
+# セル分類マトリクス
+# =====================================================================
+
+# セル分類フラグ
+CELL_EMPTY = 1  # 空セル
+CELL_NUMERIC = 2  # 数字を含む
+CELL_UNIT = 4  # 既知の単位パターンに合致
+CELL_ALPHA = 8  # 英字が3文字以上連続（Min/Max 列崩れの兆候）
+
+# 同じセル文字列は表内・表間で繰り返し現れるため分類結果をメモ化する
+CELL_CLASS_CACHE_SIZE = 8192
+
+_DIGIT_RE = re.compile(r"\d")
+_ALPHA_RUN_RE = re.compile(r"[a-zA-Z]{3,}")
+
+# 「値」を持たない列（数値パターン率の対象外）
+NON_VALUE_HEADERS = {"Symbol", "Parameter", "Description", "Test Conditions",
+                     "Unit", "Conditions"}
+
+# 一般的なデータシート列名
+COMMON_HEADERS = {"Symbol", "Parameter", "Value", "Unit", "Min", "Max", "Typ",
+                  "Test Conditions", "Description"}
+
+
+@functools.lru_cache(maxsize=CELL_CLASS_CACHE_SIZE)
+def _classify_cell(value: str) -> tuple[int, float | None]:
+    """
+    セル値を1回だけ分類する。
+
+    Returns:
+        (フラグのビット和, 数値として解釈できればその値 / できなければ None)
+    """
+    stripped = value.strip() if value else ""
+    if not stripped:
+        return CELL_EMPTY, None
+
+    flags = 0
+    # 符号・区切り・"to" の除去は数字の有無に影響しないため、数字の有無のみ判定
+    if _DIGIT_RE.search(stripped):
+        flags |= CELL_NUMERIC
+    if KNOWN_UNIT_PATTERNS.match(stripped):
+        flags |= CELL_UNIT
+    if _ALPHA_RUN_RE.search(stripped):
+        flags |= CELL_ALPHA
+
+    try:
+        number = float(stripped.replace(" ", "").replace(",", ""))
+    except ValueError:
+        number = None
+    return flags, number
+
+
+@dataclass
+class CellMatrix:
+    """
+    テーブル全セルの分類結果。
+
+    flags[c][r] / numbers[c][r] はヘッダー c 列・r 行目のセルの分類。
+    全サブスコアはこのマトリクスから導出する。
+    """
+
+    headers: list[str]
+    flags: list[list[int]]
+    numbers: list[list[float | None]]
+    row_lengths: list[int]  # 各行の元のセル数
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.row_lengths)
+
+    def column_counts(self, col: int, flag: int) -> int:
+        """col 列で flag が立っているセル数。"""
+        return sum(1 for f in self.flags[col] if f & flag)
+
+    def non_empty_count(self, col: int) -> int:
+        """col 列の空でないセル数。"""
+        return sum(1 for f in self.flags[col] if not f & CELL_EMPTY)
+
+
+def build_cell_matrix(table: "ExtractedTable") -> CellMatrix:
+    """テーブルの全セルを1回ずつ分類してマトリクスを構築する。"""
+    flags: list[list[int]] = []
+    numbers: list[list[float | None]] = []
+    for col in range(len(table.headers)):
+        classified = [_classify_cell(v) for v in table.column_values(col)]
+        flags.append([f for f, _ in classified])
+        numbers.append([n for _, n in classified])
+
+    if table.row_lengths is not None:
+        row_lengths = list(table.row_lengths)
+    else:
+        row_lengths = [len(table.columns)] * table.num_rows
+
+    return CellMatrix(
+        headers=list(table.headers),
+        flags=flags,
+        numbers=numbers,
+        row_lengths=row_lengths,
+    )
+
+
+# =====================================================================
+# 個別スコアリング関数 (CellMatrix から導出)
 # =====================================================================
 
 
-def _column_count_consistency(table: "ExtractedTable") -> float:
+def _column_count_consistency(m: CellMatrix) -> float:
     """
     列数の一貫性スコア。
     各行の列数がヘッダー列数と一致しているかを評価する。
 
     weight: 3.0
     """
-    if not table.headers or not table.raw_rows:
+    if not m.headers or not m.row_lengths:
         return 0.0
 
-    expected = len(table.headers)
-    if expected == 0:
-        return 0.0
-
-    matching = 0
-    for row in table.raw_rows:
-        if len(row) == expected:
+    expected = len(m.headers)
+    matching = 0.0
+    for n in m.row_lengths:
+        if n == expected:
             matching += 1
-        elif abs(len(row) - expected) <= 1:
+        elif abs(n - expected) <= 1:
             # 1列の差は軽微
             matching += 0.7
 
-    return matching / len(table.raw_rows) if table.raw_rows else 0.0
+    return matching / len(m.row_lengths)
 
 
-def _header_quality(table: "ExtractedTable") -> float:
+def _header_quality(m: CellMatrix) -> float:
     """
     ヘッダーの品質スコア。
     空ヘッダーの少なさ、重複の少なさ、一般的な列名の存在を評価する。
 
     weight: 2.0
     """
-    if not table.headers:
+    if not m.headers:
         return 0.0
 
     score = 1.0
 
     # 空ヘッダーの割合
-    empty_count = sum(1 for h in table.headers if not h or h.startswith("Col_"))
-    empty_ratio = empty_count / len(table.headers)
+    empty_count = sum(1 for h in m.headers if not h or h.startswith("Col_"))
+    empty_ratio = empty_count / len(m.headers)
     score -= empty_ratio * 0.5
 
     # ヘッダーが1つしかない場合
-    if len(table.headers) <= 1:
+    if len(m.headers) <= 1:
         score *= 0.3
 
     # 一般的なデータシート列名が含まれているか
-    common_headers = {"Symbol", "Parameter", "Value", "Unit", "Min", "Max", "Typ",
-                      "Test Conditions", "Description"}
-    found = sum(1 for h in table.headers if h in common_headers)
+    found = sum(1 for h in m.headers if h in COMMON_HEADERS)
     if found > 0:
         score = min(1.0, score + found * 0.05)
 
     return max(0.0, min(1.0, score))
 
 
-def _numeric_pattern_ratio(table: "ExtractedTable") -> float:
+def _numeric_pattern_ratio(m: CellMatrix) -> float:
     """
     値セルにおける数値パターンの出現率。
     データシートの表は数値データが多いため、高い値が期待される。
 
     weight: 2.0
     """
-    if not table.rows:
+    if not m.num_rows:
         return 0.0
 
-    total_value_cells = 0
-    numeric_cells = 0
-
-    # ヘッダーから「値」を持つべき列を特定
-    value_headers = set()
-    non_value_headers = {"Symbol", "Parameter", "Description", "Test Conditions",
-                         "Unit", "Conditions"}
-    for h in table.headers:
-        if h not in non_value_headers:
-            value_headers.add(h)
-
-    if not value_headers:
-        # 全列を対象
-        value_headers = set(table.headers)
-
-    for row in table.rows:
-        for header in value_headers:
-            val = row.get(header, "")
-            if val and val.strip():
-                total_value_cells += 1
-                # 数値的なセルかどうか
-                stripped = val.strip()
-                cleaned = stripped.replace(" ", "").replace(",", "")
-                cleaned = re.sub(r"[±+\-−–]", "", cleaned)
-                cleaned = re.sub(r"\s*to\s*", "", cleaned, flags=re.IGNORECASE)
-                if re.search(r"\d", cleaned):
-                    numeric_cells += 1
+    # ヘッダーから「値」を持つべき列を特定（無ければ全列を対象）
+    value_cols = [c for c, h in enumerate(m.headers) if h not in NON_VALUE_HEADERS]
+    if not value_cols:
+        value_cols = list(range(len(m.headers)))
+
+    total_value_cells = sum(m.non_empty_count(c) for c in value_cols)
+    numeric_cells = sum(m.column_counts(c, CELL_NUMERIC) for c in value_cols)
 
     if total_value_cells == 0:
         return 0.5  # 判定不能
@@ -141,92 +223,69 @@ def _numeric_pattern_ratio(table: "ExtractedTable") -> float:
     return numeric_cells / total_value_cells
 
 
-def _unit_validity(table: "ExtractedTable") -> float:
+def _unit_validity(m: CellMatrix) -> float:
     """
     Unit 列（存在する場合）の値が既知の単位パターンに合致するかを評価する。
 
     weight: 1.5
     """
-    # Unit 列を探す
-    unit_col = None
-    for h in table.headers:
-        if h.lower() in ("unit", "units"):
-            unit_col = h
-            break
-
+    unit_col = next(
+        (c for c, h in enumerate(m.headers) if h.lower() in ("unit", "units")),
+        None,
+    )
     if unit_col is None:
         return 0.8  # Unit 列がない場合はニュートラル
 
-    values = [row.get(unit_col, "") for row in table.rows]
-    non_empty = [v.strip() for v in values if v and v.strip()]
-
+    non_empty = m.non_empty_count(unit_col)
     if not non_empty:
         return 0.5
 
-    valid_count = sum(1 for v in non_empty if KNOWN_UNIT_PATTERNS.match(v))
-    return valid_count / len(non_empty)
+    return m.column_counts(unit_col, CELL_UNIT) / non_empty
 
 
-def _min_max_alignment(table: "ExtractedTable") -> float:
+def _min_max_alignment(m: CellMatrix) -> float:
     """
     Min/Max 列の対応品質を評価する。
     Min列に英字が多い、Max < Min の逆転がある、等を検知する。
 
     weight: 2.5
     """
-    min_col = None
-    max_col = None
-    typ_col = None
-
-    for h in table.headers:
+    cols: dict[str, int] = {}
+    for c, h in enumerate(m.headers):
         hl = h.lower().strip().rstrip(".")
-        if hl == "min":
-            min_col = h
-        elif hl == "max":
-            max_col = h
-        elif hl == "typ":
-            typ_col = h
+        if hl in ("min", "max", "typ"):
+            cols[hl] = c
 
     # Min/Max/Typ のいずれもない場合
-    if not any([min_col, max_col, typ_col]):
+    if not cols:
         return 0.8  # ニュートラル
 
-    score = 1.0
     issues = 0
     checks = 0
 
-    # 各列について英字の割合をチェック
-    for label, col in [("Min", min_col), ("Max", max_col), ("Typ", typ_col)]:
+    # 各列について英字が3文字以上連続するセルの割合をチェック
+    for key in ("min", "max", "typ"):
+        col = cols.get(key)
         if col is None:
             continue
-        values = [row.get(col, "") for row in table.rows]
-        non_empty = [v.strip() for v in values if v and v.strip()]
+        non_empty = m.non_empty_count(col)
         if not non_empty:
             continue
         checks += 1
-        # 英字が3文字以上連続するセルの割合
-        alpha_count = sum(1 for v in non_empty if re.search(r"[a-zA-Z]{3,}", v))
-        if alpha_count / len(non_empty) > 0.5:
+        if m.column_counts(col, CELL_ALPHA) / non_empty > 0.5:
             issues += 1
 
     # Min > Max の逆転チェック
-    if min_col and max_col:
-        inversions = 0
-        comparisons = 0
-        for row in table.rows:
-            min_val = row.get(min_col, "").strip()
-            max_val = row.get(max_col, "").strip()
-            try:
-                min_num = float(min_val.replace(" ", "").replace(",", ""))
-                max_num = float(max_val.replace(" ", "").replace(",", ""))
-                comparisons += 1
-                if min_num > max_num:
-                    inversions += 1
-            except (ValueError, AttributeError):
-                pass
-        if comparisons > 0:
+    if "min" in cols and "max" in cols:
+        pairs = [
+            (lo, hi)
+            for lo, hi in zip(m.numbers[cols["min"]], m.numbers[cols["max"]])
+            if lo is not None and hi is not None
+        ]
+        if pairs:
             checks += 1
-            if inversions / comparisons > 0.3:
+            inversions = sum(1 for lo, hi in pairs if lo > hi)
+            if inversions / len(pairs) > 0.3:
                 issues += 1
 
     if checks == 0:
@@ -235,27 +294,17 @@ def _min_max_alignment(table: "ExtractedTable") -> float:
     return max(0.0, 1.0 - (issues / checks) * 0.8)
 
 
-def _empty_cell_ratio(table: "ExtractedTable") -> float:
+def _empty_cell_ratio(m: CellMatrix) -> float:
     """
     空セルの割合が過度に高くないかを評価する。
 
     weight: 1.0
     """
-    if not table.rows or not table.headers:
+    if not m.num_rows or not m.headers:
         return 0.0
 
-    total_cells = 0
-    empty_cells = 0
-
-    for row in table.rows:
-        for header in table.headers:
-            total_cells += 1
-            val = row.get(header, "")
-            if not val or not val.strip():
-                empty_cells += 1
-
-    if total_cells == 0:
-        return 0.0
+    total_cells = m.num_rows * len(m.headers)
+    empty_cells = sum(m.column_counts(c, CELL_EMPTY) for c in range(len(m.headers)))
 
     empty_ratio = empty_cells / total_cells
     # 空セル率 50% 以上で急速に減点
@@ -266,14 +315,14 @@ def _empty_cell_ratio(table: "ExtractedTable") -> float:
     return max(0.0, 1.0 - empty_ratio * 1.5)
 
 
-def _row_count_score(table: "ExtractedTable") -> float:
+def _row_count_score(m: CellMatrix) -> float:
     """
     行数の妥当性スコア。
     1行だけの表は品質が低い、2行以上で十分。
 
     weight: 0.5
     """
-    n = len(table.rows)
+    n = m.num_rows
     if n == 0:
         return 0.0
     if n == 1:
@@ -287,6 +336,51 @@ def _row_count_score(table: "ExtractedTable") -> float:
 # 総合スコアリング
 # =====================================================================
 
+# (サブスコア名, 関数, 重み)
+SUB_SCORES = [
+    ("column_count_consistency", _column_count_consistency, 3.0),
+    ("header_quality", _header_quality, 2.0),
+    ("numeric_pattern_ratio", _numeric_pattern_ratio, 2.0),
+    ("unit_validity", _unit_validity, 1.5),
+    ("min_max_alignment", _min_max_alignment, 2.5),
+    ("empty_cell_ratio", _empty_cell_ratio, 1.0),
+    ("row_count_score", _row_count_score, 0.5),
+]
+
+
+def _score_matrix(m: CellMatrix) -> tuple[float, dict[str, float]]:
+    """マトリクスから総合スコアとサブスコアを1回の計算で求める。"""
+    sub_scores = {name: fn(m) for name, fn, _ in SUB_SCORES}
+
+    total_weight = sum(w for _, _, w in SUB_SCORES)
+    weighted_sum = sum(sub_scores[name] * w for name, _, w in SUB_SCORES)
+    final_score = weighted_sum / total_weight if total_weight > 0 else 0.0
+
+    return round(min(1.0, max(0.0, final_score)), 4), sub_scores
+
+
+def score_table_quality(table: "ExtractedTable") -> tuple[float, dict]:
+    """
+    品質スコアとその内訳を1回のマトリクス構築で求める。
+
+    Args:
+        table: ExtractedTable インスタンス
+
+    Returns:
+        (0.0〜1.0 の品質スコア, 内訳の辞書)
+    """
+    if not table.headers or not table.num_rows:
+        return 0.0, {"score": 0.0, "reason": "empty table"}
+
+    score, sub_scores = _score_matrix(build_cell_matrix(table))
+    details: dict = {"score": score}
+    for name, value in sub_scores.items():
+        details[name] = round(value, 4)
+    details["num_headers"] = len(table.headers)
+    details["num_rows"] = table.num_rows
+    details["headers"] = table.headers
+    return score, details
+
 
 def evaluate_table_quality(table: "ExtractedTable") -> float:
     """
@@ -298,41 +392,13 @@ def evaluate_table_quality(table: "ExtractedTable") -> float:
     Returns:
         0.0（構造的に不正）〜 1.0（高品質）の品質スコア
     """
-    if not table.headers or not table.rows:
+    if not table.headers or not table.num_rows:
         return 0.0
 
-    scores: list[tuple[float, float]] = [
-        (_column_count_consistency(table), 3.0),
-        (_header_quality(table), 2.0),
-        (_numeric_pattern_ratio(table), 2.0),
-        (_unit_validity(table), 1.5),
-        (_min_max_alignment(table), 2.5),
-        (_empty_cell_ratio(table), 1.0),
-        (_row_count_score(table), 0.5),
-    ]
-
-    total_weight = sum(w for _, w in scores)
-    weighted_sum = sum(s * w for s, w in scores)
-    final_score = weighted_sum / total_weight if total_weight > 0 else 0.0
-
-    return round(min(1.0, max(0.0, final_score)), 4)
+    score, _ = _score_matrix(build_cell_matrix(table))
+    return score
 
 
 def table_quality_details(table: "ExtractedTable") -> dict:
     """品質スコアの内訳を返す（デバッグ/ログ用）。"""
-    if not table.headers or not table.rows:
-        return {"score": 0.0, "reason": "empty table"}
-
-    return {
-        "score": evaluate_table_quality(table),
-        "column_count_consistency": round(_column_count_consistency(table), 4),
-        "header_quality": round(_header_quality(table), 4),
-        "numeric_pattern_ratio": round(_numeric_pattern_ratio(table), 4),
-        "unit_validity": round(_unit_validity(table), 4),
-        "min_max_alignment": round(_min_max_alignment(table), 4),
-        "empty_cell_ratio": round(_empty_cell_ratio(table), 4),
-        "row_count_score": round(_row_count_score(table), 4),
-        "num_headers": len(table.headers),
-        "num_rows": len(table.rows),
-        "headers": table.headers,
-    }
+    return score_table_quality(table)[1]
@@ -0,0 +1,112 @@
+"""
+ページ単位・処理段階単位のタイミング記録
+
+抽出戦略の中でページごと・段階ごと (フォントチェック、find_tables の各設定、
+タイトル検出、正規化など) の開始時刻と所要時間を記録する軽量なレコーダー。
+ExtractionResult / TableExtractionResult の spans に保持され、
+--json-meta の timing として出力される。
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Iterator
+
+# サマリーに載せる遅いページの件数
+SLOWEST_PAGES = 5
+
+# ページ全体の処理を表すスパン名（slowest_pages の集計対象）
+PAGE_SPAN = "page"
+
+
+@dataclass
+class Span:
+    """1区間の記録。start_ms はレコーダー作成時点からの経過時間。"""
+
+    name: str
+    start_ms: float
+    duration_ms: float
+    page: int | None = None  # 1始まり。文書全体の処理は None
+
+
+@dataclass
+class SpanRecorder:
+    """スパンを記録する。1つの抽出結果につき1つ作る。"""
+
+    spans: list[Span] = field(default_factory=list)
+    origin: float = field(default_factory=time.perf_counter)
+
+    @contextmanager
+    def span(self, name: str, page: int | None = None) -> Iterator[None]:
+        """with ブロックの実行区間を記録する。"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, page)
+
+    def add(
+        self, name: str, start: float, page: int | None = None, end: float | None = None
+    ) -> None:
+        """
+        perf_counter() の start から end (省略時は現在) までを記録する
+        （with で囲めない区間や、後からまとめて記録する区間用）。
+        """
+        if end is None:
+            end = time.perf_counter()
+        self.spans.append(Span(
+            name=name,
+            start_ms=round((start - self.origin) * 1000, 3),
+            duration_ms=round((end - start) * 1000, 3),
+            page=page,
+        ))
+
+    def stage_totals(self) -> dict[str, dict]:
+        """スパン名ごとの回数と合計時間。"""
+        totals: dict[str, dict] = {}
+        for span in self.spans:
+            entry = totals.setdefault(span.name, {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += span.duration_ms
+        for entry in totals.values():
+            entry["total_ms"] = round(entry["total_ms"], 3)
+        return totals
+
+    def slowest_pages(self, limit: int = SLOWEST_PAGES) -> list[dict]:
+        """ページ全体のスパンが長い順に、ページ内の段階別内訳付きで返す。"""
+        pages = sorted(
+            (s for s in self.spans if s.name == PAGE_SPAN and s.page is not None),
+            key=lambda s: s.duration_ms,
+            reverse=True,
+        )[:limit]
+        result = []
+        for page_span in pages:
+            stages: dict[str, float] = {}
+            for span in self.spans:
+                if span.page == page_span.page and span.name != PAGE_SPAN:
+                    stages[span.name] = round(stages.get(span.name, 0.0) + span.duration_ms, 3)
+            result.append({
+                "page": page_span.page,
+                "duration_ms": page_span.duration_ms,
+                "stages": stages,
+            })
+        return result
+
+    def format_slowest_pages(self, limit: int = SLOWEST_PAGES) -> str:
+        """ログ出力用の遅いページ一覧（例: "p.12 345.1ms (find_tables:text 300.2ms), ..."）。"""
+        parts = []
+        for entry in self.slowest_pages(limit):
+            top_stage = max(entry["stages"].items(), key=lambda kv: kv[1], default=None)
+            detail = f" ({top_stage[0]} {top_stage[1]:.1f}ms)" if top_stage else ""
+            parts.append(f"p.{entry['page']} {entry['duration_ms']:.1f}ms{detail}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> dict:
+        """--json-meta 用の timing セクション。"""
+        return {
+            "stages": self.stage_totals(),
+            "slowest_pages": self.slowest_pages(),
+            "spans": [asdict(span) for span in self.spans],
+        }
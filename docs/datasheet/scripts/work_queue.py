@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+"""
+共有ファイルシステム上のワークキュー（複数ノードでのバッチ抽出）
+
+NFS などで複数のマシンから共有した output/ ツリーだけを使い、ブローカーなしで
+抽出タスクを任意の数のワーカー（どのノードで動いていてもよい）に分配する。
+タスクはデータシート単位、または --pages-per-task ページずつのページ範囲単位で、
+ページ範囲の結果は collect でページ順に結合して <id>.txt / <id>.tables.json と
+メタ情報 JSON（batch_pipeline.py と同じ名前）に書き出す。
+
+キューディレクトリ（デフォルト: <output_dir>/.work_queue/）:
+    queue.json                       リースの有効期間などの設定（enqueue が書く）
+    tasks/<task_id>.json             タスク定義
+    leases/<task_id>.lease           実行中のリース（O_EXCL で作成。mtime がハートビート）
+    leases/<task_id>.lease.expired.* 期限切れで回収したリース（件数 = 異常終了の回数）
+    results/<task_id>.json           完了したタスクの結果
+
+仕組み:
+    - リースは O_CREAT | O_EXCL で作るので、同じタスクを取れるのは1ワーカーだけ
+    - 実行中はリース有効期間の 1/4 ごとにリースの mtime を更新する。期限切れの
+      判定はキューディレクトリに書いた時計用ファイルの mtime と比べるため、
+      ノード間の時計のずれではなくファイルサーバーの時刻で判断する
+    - 有効期間を過ぎたリースは、最初に rename できたワーカーだけが回収して
+      タスクを取り直す（クラッシュしたワーカーのタスクの回復）。
+      回収が --max-attempts 回に達したタスクは失敗として結果を書く
+    - リースを失った（他のワーカーに回収された）ワーカーは結果を書かずに捨てる
+    - 結果・出力ファイルは一意な一時ファイルに書いてから rename で公開するので、
+      読み手が書きかけのファイルを見ることはなく、同時に書いても壊れない
+    - 抽出の例外は再試行せずに error の結果として記録する（enqueue --force でやり直す）
+
+使用方法:
+    python work_queue.py enqueue [output_dir] --kinds text,tables --pages-per-task 20
+    python work_queue.py work [output_dir] --workers 4     # 各ノードで実行
+    python work_queue.py status [output_dir]
+    python work_queue.py collect [output_dir]
+
+1台で試す場合:
+    python work_queue.py --queue-dir /tmp/q enqueue --pages-per-task 2 --lease-ttl 5
+    python work_queue.py --queue-dir /tmp/q work --workers 4   # 途中でワーカーを kill -9 しても回復する
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+
+# 同ディレクトリのモジュールをインポート
+sys.path.insert(0, str(Path(__file__).parent))
+
+from batch_pipeline import TABLES_META_NAME, TEXT_META_NAME, find_pdfs
+from pdf_extractors import ExtractionResult
+from pdf_page_ranges import (
+    count_pages,
+    extract_tables_range,
+    extract_text_range,
+    merge_table_results,
+    merge_text_results,
+    split_page_ranges,
+    table_result_from_dict,
+    table_result_to_dict,
+    text_result_from_dict,
+    text_result_to_dict,
+)
+from pdf_table_extractor import TableExtractionResult
+
+logger = logging.getLogger("work_queue")
+
+SCRIPT_DIR = Path(__file__).parent
+
+QUEUE_DIR_NAME = ".work_queue"
+TASK_KINDS = ["text", "tables"]
+
+# 種類ごとの既定の戦略と品質閾値（extract_pdf_text.py / extract_tables.py と同じ）
+DEFAULT_STRATEGIES = {"text": "pymupdf,pdfminer,ocr", "tables": "pdfplumber,pymupdf"}
+QUALITY_THRESHOLDS = {"text": 0.8, "tables": 0.6}
+
+# リースの有効期間 (秒)。ハートビートはこの 1/HEARTBEATS_PER_TTL ごと
+DEFAULT_LEASE_TTL = 120.0
+HEARTBEATS_PER_TTL = 4
+# 期限切れの回収がこの回数に達したタスクは失敗とする
+DEFAULT_MAX_ATTEMPTS = 3
+# 他のワーカーが実行中のタスクしか残っていないときの待機間隔 (秒)
+POLL_INTERVAL = 2.0
+
+
+def default_worker_id() -> str:
+    """ファイル名に使えるワーカーID（ホスト名.PID.乱数）。"""
+    host = socket.gethostname().split(".")[0] or "host"
+    return f"{host}.{os.getpid()}.{uuid.uuid4().hex[:6]}"
+
+
+def _atomic_write(path: str, data: str, writer_id: str) -> None:
+    """一意な一時ファイルに書いて fsync してから rename で置き換える。"""
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{writer_id}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _lease_token(path: str) -> str | None:
+    data = _read_json(path)
+    return data.get("token") if data else None
+
+
+# =====================================================================
+# キュー
+# =====================================================================
+
+
+class WorkQueue:
+    """キューディレクトリ上のタスク・リース・結果の操作。"""
+
+    def __init__(self, queue_dir: str, worker_id: str | None = None):
+        self.queue_dir = queue_dir
+        self.worker_id = worker_id or default_worker_id()
+        self.tasks_dir = os.path.join(queue_dir, "tasks")
+        self.leases_dir = os.path.join(queue_dir, "leases")
+        self.results_dir = os.path.join(queue_dir, "results")
+        for path in (self.tasks_dir, self.leases_dir, self.results_dir):
+            os.makedirs(path, exist_ok=True)
+        config = _read_json(os.path.join(queue_dir, "queue.json")) or {}
+        self.lease_ttl = float(config.get("lease_ttl", DEFAULT_LEASE_TTL))
+
+    def write_config(self, lease_ttl: float) -> None:
+        self.lease_ttl = lease_ttl
+        _atomic_write(
+            os.path.join(self.queue_dir, "queue.json"),
+            json.dumps({"lease_ttl": lease_ttl}, indent=2),
+            self.worker_id,
+        )
+
+    # --- タスクと結果 ---
+
+    def task_ids(self) -> list[str]:
+        return sorted(name[:-5] for name in os.listdir(self.tasks_dir) if name.endswith(".json"))
+
+    def result_ids(self) -> set[str]:
+        return {name[:-5] for name in os.listdir(self.results_dir) if name.endswith(".json")}
+
+    def load_task(self, task_id: str) -> dict | None:
+        return _read_json(os.path.join(self.tasks_dir, f"{task_id}.json"))
+
+    def load_result(self, task_id: str) -> dict | None:
+        return _read_json(os.path.join(self.results_dir, f"{task_id}.json"))
+
+    def add_task(self, task: dict) -> None:
+        _atomic_write(
+            os.path.join(self.tasks_dir, f"{task['task_id']}.json"),
+            json.dumps(task, ensure_ascii=False, indent=2),
+            self.worker_id,
+        )
+
+    def remove_task(self, task_id: str) -> None:
+        """タスクと結果・回収済みリースを消す（enqueue --force 用）。"""
+        paths = [
+            os.path.join(self.tasks_dir, f"{task_id}.json"),
+            os.path.join(self.results_dir, f"{task_id}.json"),
+        ]
+        paths += [
+            os.path.join(self.leases_dir, name)
+            for name in os.listdir(self.leases_dir)
+            if name.startswith(f"{task_id}.lease.expired.")
+        ]
+        for path in paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    # --- リース ---
+
+    def _lease_path(self, task_id: str) -> str:
+        return os.path.join(self.leases_dir, f"{task_id}.lease")
+
+    def fs_now(self) -> float:
+        """ファイルサーバーの現在時刻（時計用ファイルの mtime）。"""
+        probe = os.path.join(self.leases_dir, f".clock.{self.worker_id}")
+        fd = os.open(probe, os.O_CREAT | os.O_TRUNC | os.O_WRONLY, 0o644)
+        try:
+            return os.fstat(fd).st_mtime
+        finally:
+            os.close(fd)
+            os.unlink(probe)
+
+    def expired_count(self, task_id: str) -> int:
+        prefix = f"{task_id}.lease.expired."
+        return sum(1 for name in os.listdir(self.leases_dir) if name.startswith(prefix))
+
+    def lease_states(self) -> dict[str, str]:
+        """task_id → "active" / "expired"（リースのあるタスクのみ）。"""
+        now = self.fs_now()
+        states = {}
+        for name in os.listdir(self.leases_dir):
+            if not name.endswith(".lease"):
+                continue
+            try:
+                age = now - os.stat(os.path.join(self.leases_dir, name)).st_mtime
+            except FileNotFoundError:
+                continue
+            states[name[:-6]] = "expired" if age > self.lease_ttl else "active"
+        return states
+
+    def try_claim(self, task_id: str) -> Lease | None:
+        """タスクのリースを取る。取れなければ None。"""
+        path = self._lease_path(task_id)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if not self._recover_expired(task_id):
+                    return None
+                continue
+            token = uuid.uuid4().hex
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"worker": self.worker_id, "token": token, "claimed_at": time.time()}, f)
+            # 回収と完了が競合して、取った時点で既に結果がある場合は手放す
+            if os.path.exists(os.path.join(self.results_dir, f"{task_id}.json")):
+                os.unlink(path)
+                return None
+            return Lease(self, task_id, token)
+        return None
+
+    def _recover_expired(self, task_id: str) -> bool:
+        """
+        期限切れのリースを回収する。回収できた（または既に消えていた）ら True。
+        複数のワーカーが同時に回収しようとしても rename に成功するのは1つだけ。
+        """
+        path = self._lease_path(task_id)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return True
+        if self.fs_now() - mtime <= self.lease_ttl:
+            return False
+        stale_token = _lease_token(path)
+        moved = f"{path}.expired.{self.worker_id}.{uuid.uuid4().hex[:6]}"
+        try:
+            os.rename(path, moved)
+        except FileNotFoundError:
+            return False  # 他のワーカーが先に回収した
+        if _lease_token(moved) != stale_token:
+            # 判定から rename までの間に他のワーカーが回収して取り直したリースを
+            # 動かしてしまった場合は元に戻す（既に別のリースがあれば、動かされた
+            # 側のワーカーはハートビートでリースの喪失に気付いて結果を捨てる）
+            try:
+                os.link(moved, path)
+            except FileExistsError:
+                pass
+            os.unlink(moved)
+            return False
+        logger.warning(f"Recovered expired lease: {task_id}")
+        return True
+
+    def commit(self, lease: Lease, result: dict) -> bool:
+        """リースを保持していれば結果を公開してリースを解放する。"""
+        lease.stop()
+        if lease.lost.is_set():
+            logger.warning(f"Lease lost for {lease.task_id}; discarding result")
+            return False
+        _atomic_write(
+            os.path.join(self.results_dir, f"{lease.task_id}.json"),
+            json.dumps(result, ensure_ascii=False),
+            self.worker_id,
+        )
+        lease.release()
+        return True
+
+
+class Lease:
+    """保持中のリース。バックグラウンドでハートビートを送る。"""
+
+    def __init__(self, queue: WorkQueue, task_id: str, token: str):
+        self.queue = queue
+        self.task_id = task_id
+        self.token = token
+        self.path = queue._lease_path(task_id)
+        self.lost = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self._thread.start()
+
+    def _heartbeat(self) -> None:
+        interval = self.queue.lease_ttl / HEARTBEATS_PER_TTL
+        while not self._stopped.wait(interval):
+            try:
+                if _lease_token(self.path) != self.token:
+                    raise FileNotFoundError(self.path)
+                os.utime(self.path)
+            except FileNotFoundError:
+                self.lost.set()
+                return
+
+    def stop(self) -> None:
+        """ハートビートを止め、リースをまだ保持しているか確認する。"""
+        self._stopped.set()
+        self._thread.join()
+        if _lease_token(self.path) != self.token:
+            self.lost.set()
+
+    def release(self) -> None:
+        self.stop()
+        if not self.lost.is_set():
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+# =====================================================================
+# タスクの登録
+# =====================================================================
+
+
+def _task_group(task_id: str) -> str:
+    """task_id の (種類, データシート) 部分（例: "text.TI_LM358M"）。"""
+    return task_id.rsplit(".p", 1)[0]
+
+
+def enqueue(
+    queue: WorkQueue,
+    output_dir: str,
+    pdfs: list[tuple[str, str]],
+    kinds: list[str],
+    pages_per_task: int,
+    strategies: dict[str, list[str]],
+    force: bool = False,
+) -> tuple[int, int]:
+    """
+    (種類, データシート) ごとにタスクを登録する。登録済みの組は --force が
+    無ければそのまま残す。登録したタスク数と、登録済みで残した組の数を返す。
+    """
+    existing: dict[str, list[str]] = {}
+    for task_id in queue.task_ids():
+        existing.setdefault(_task_group(task_id), []).append(task_id)
+
+    added = kept = 0
+    for datasheet_id, pdf_path in pdfs:
+        page_count = count_pages(pdf_path)
+        for kind in kinds:
+            group = f"{kind}.{datasheet_id}"
+            if group in existing:
+                if not force:
+                    kept += 1
+                    continue
+                for task_id in existing[group]:
+                    queue.remove_task(task_id)
+            for first, last in split_page_ranges(page_count, pages_per_task):
+                queue.add_task({
+                    "task_id": f"{group}.p{first:05d}-{last:05d}",
+                    "kind": kind,
+                    "datasheet_id": datasheet_id,
+                    "pdf": os.path.relpath(pdf_path, output_dir),
+                    "first_page": first,
+                    "last_page": last,
+                    "page_count": page_count,
+                    "strategies": strategies[kind],
+                    "quality_threshold": QUALITY_THRESHOLDS[kind],
+                })
+                added += 1
+    return added, kept
+
+
+# =====================================================================
+# ワーカー
+# =====================================================================
+
+
+def execute_task(task: dict, output_dir: str, ocr_cache: str | None = None) -> dict:
+    """タスクのページ範囲を抽出し、JSON 用の部分結果を返す。"""
+    extract = extract_text_range if task["kind"] == "text" else extract_tables_range
+    to_dict = text_result_to_dict if task["kind"] == "text" else table_result_to_dict
+    result = extract(
+        os.path.join(output_dir, task["pdf"]),
+        task["first_page"],
+        task["last_page"],
+        strategies=task["strategies"],
+        quality_threshold=task["quality_threshold"],
+        strategy_options={"ocr": {"ocr_cache_dir": ocr_cache}},
+    )
+    return to_dict(result)
+
+
+def run_worker(
+    queue_dir: str,
+    output_dir: str,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ocr_cache: str | None = None,
+) -> int:
+    """
+    未完了のタスクが無くなるまでタスクを取って実行する。実行したタスク数を返す。
+    他のワーカーが実行中のタスクしか残っていなければ、完了か期限切れを待つ。
+    """
+    queue = WorkQueue(queue_dir)
+    rng = random.Random(queue.worker_id)
+    executed = 0
+    while True:
+        done = queue.result_ids()
+        pending = [task_id for task_id in queue.task_ids() if task_id not in done]
+        if not pending:
+            return executed
+        # 多数のワーカーが同じ順にリースを取り合わないよう順番をずらす
+        rng.shuffle(pending)
+        lease = next(filter(None, (queue.try_claim(task_id) for task_id in pending)), None)
+        if lease is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        task = queue.load_task(lease.task_id)
+        record = {"task_id": lease.task_id, "worker": queue.worker_id}
+        attempts = queue.expired_count(lease.task_id)
+        start = time.perf_counter()
+        if task is None:
+            record.update(status="error", error="task definition is missing or unreadable")
+        elif attempts >= max_attempts:
+            record.update(status="error", error=f"abandoned after {attempts} expired lease(s)")
+        else:
+            logger.info(f"[{queue.worker_id}] {lease.task_id}")
+            try:
+                record.update(status="ok", part=execute_task(task, output_dir, ocr_cache))
+            except Exception as e:
+                logger.error(f"[{queue.worker_id}] {lease.task_id} failed: {e}", exc_info=True)
+                record.update(status="error", error=f"{type(e).__name__}: {e}")
+        record["elapsed_ms"] = int((time.perf_counter() - start) * 1000)
+        if queue.commit(lease, record):
+            executed += 1
+
+
+def _worker_main(queue_dir: str, output_dir: str, max_attempts: int, ocr_cache: str | None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    run_worker(queue_dir, output_dir, max_attempts, ocr_cache)
+
+
+# =====================================================================
+# 結合
+# =====================================================================
+
+
+def write_text_output(
+    pdf_path: str, result: ExtractionResult, strategies: list[str], range_count: int, writer_id: str
+) -> None:
+    """
+    ページ範囲を結合したテキスト抽出結果を、extract_pdf_text.py と同じ形式の
+    <id>.txt とメタ情報 JSON として PDF と同じディレクトリに書き出す。
+    """
+    from extract_pdf_text import format_output
+    from pdf_normalize import normalize_text
+    from pdf_quality import quality_details
+
+    if result.text:
+        result.text = normalize_text(result.text)
+        result.page_texts = [normalize_text(pt) for pt in result.page_texts]
+    base = os.path.dirname(pdf_path)
+    datasheet_id = os.path.splitext(os.path.basename(pdf_path))[0]
+    _atomic_write(os.path.join(base, f"{datasheet_id}.txt"), format_output(result, pdf_path), writer_id)
+    meta = {
+        "pdf_path": pdf_path,
+        "method": result.method,
+        "page_count": result.page_count,
+        "quality_score": result.quality_score,
+        "quality_details": quality_details(result.text, result.page_texts),
+        "warnings": result.warnings,
+        "elapsed_ms": result.elapsed_ms,
+        "total_elapsed_ms": result.elapsed_ms,
+        "usage": asdict(result.usage),
+        "strategy_plan": strategies,
+        "page_range_tasks": range_count,
+        "timing": result.spans.to_dict(),
+    }
+    _atomic_write(
+        os.path.join(base, TEXT_META_NAME), json.dumps(meta, ensure_ascii=False, indent=2), writer_id
+    )
+
+
+def write_tables_output(
+    pdf_path: str,
+    result: TableExtractionResult,
+    strategies: list[str],
+    quality_threshold: float,
+    range_count: int,
+    writer_id: str,
+) -> None:
+    """
+    ページ範囲を結合した表抽出結果を、extract_tables.py と同じ形式の
+    <id>.tables.json とメタ情報 JSON として PDF と同じディレクトリに書き出す。
+    """
+    from extract_tables import format_output
+
+    base = os.path.dirname(pdf_path)
+    datasheet_id = os.path.splitext(os.path.basename(pdf_path))[0]
+    output_data = format_output(result, pdf_path, quality_threshold)
+    output_data["total_elapsed_ms"] = result.elapsed_ms
+    _atomic_write(
+        os.path.join(base, f"{datasheet_id}.tables.json"),
+        json.dumps(output_data, ensure_ascii=False, indent=2),
+        writer_id,
+    )
+    meta = {
+        "pdf_path": pdf_path,
+        "method": result.method,
+        "page_count": result.page_count,
+        "table_count": len(result.tables),
+        "warnings": result.warnings,
+        "elapsed_ms": result.elapsed_ms,
+        "total_elapsed_ms": result.elapsed_ms,
+        "usage": asdict(result.usage),
+        "strategy_plan": strategies,
+        "page_range_tasks": range_count,
+        "timing": result.spans.to_dict(),
+    }
+    _atomic_write(
+        os.path.join(base, TABLES_META_NAME), json.dumps(meta, ensure_ascii=False, indent=2), writer_id
+    )
+
+
+def collect(queue: WorkQueue, output_dir: str) -> dict[str, list[str]]:
+    """
+    全ページ範囲が完了した (種類, データシート) の結果をページ順に結合して書き出す。
+    複数のノードが同時に実行しても出力は rename で置き換えるだけなので壊れない。
+    """
+    groups: dict[str, list[str]] = {}
+    for task_id in queue.task_ids():
+        groups.setdefault(_task_group(task_id), []).append(task_id)
+
+    outcome: dict[str, list[str]] = {"written": [], "incomplete": [], "failed": []}
+    for group, task_ids in sorted(groups.items()):
+        results = [queue.load_result(task_id) for task_id in task_ids]
+        if any(r is None for r in results):
+            outcome["incomplete"].append(group)
+            continue
+        if any(r["status"] != "ok" for r in results):
+            outcome["failed"].append(group)
+            continue
+        tasks = sorted((queue.load_task(t) for t in task_ids), key=lambda t: t["first_page"])
+        parts_by_id = {r["task_id"]: r["part"] for r in results}
+        parts = [parts_by_id[t["task_id"]] for t in tasks]
+        pdf_path = os.path.join(output_dir, tasks[0]["pdf"])
+        if tasks[0]["kind"] == "text":
+            result = merge_text_results([text_result_from_dict(p) for p in parts])
+            write_text_output(pdf_path, result, tasks[0]["strategies"], len(tasks), queue.worker_id)
+        else:
+            result = merge_table_results([table_result_from_dict(p) for p in parts])
+            write_tables_output(
+                pdf_path, result, tasks[0]["strategies"], tasks[0]["quality_threshold"],
+                len(tasks), queue.worker_id,
+            )
+        outcome["written"].append(group)
+    return outcome
+
+
+# =====================================================================
+# 状態表示
+# =====================================================================
+
+
+def print_status(queue: WorkQueue) -> None:
+    task_ids = queue.task_ids()
+    done = queue.result_ids()
+    leases = queue.lease_states()
+    counts = {"done": 0, "error": 0, "running": 0, "expired": 0, "pending": 0}
+    per_worker: dict[str, int] = {}
+    errors = []
+    for task_id in task_ids:
+        if task_id in done:
+            result = queue.load_result(task_id) or {}
+            if result.get("status") == "ok":
+                counts["done"] += 1
+            else:
+                counts["error"] += 1
+                errors.append(f"{task_id}: {result.get('error', 'unreadable result')}")
+            worker = result.get("worker", "?")
+            per_worker[worker] = per_worker.get(worker, 0) + 1
+        elif leases.get(task_id) == "active":
+            counts["running"] += 1
+        elif leases.get(task_id) == "expired":
+            counts["expired"] += 1
+        else:
+            counts["pending"] += 1
+
+    print("=" * 100)
+    print(f"Work queue: {queue.queue_dir}  (lease ttl {queue.lease_ttl:.0f}s)")
+    print("=" * 100)
+    print(f"  tasks: {len(task_ids)}  " + "  ".join(f"{k}: {v}" for k, v in counts.items()))
+    if per_worker:
+        print("  completed by worker:")
+        for worker, n in sorted(per_worker.items(), key=lambda kv: -kv[1]):
+            print(f"    {worker:<40s} {n}")
+    for line in errors:
+        print(f"  ERROR {line}")
+
+
+# =====================================================================
+# CLI
+# =====================================================================
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="共有ファイルシステム上のワークキューで抽出を複数ノードに分配する"
+    )
+    parser.add_argument(
+        "--queue-dir",
+        default=None,
+        help=f"キューディレクトリ。デフォルト: <output_dir>/{QUEUE_DIR_NAME}",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="タスクを登録する")
+    work_parser = subparsers.add_parser("work", help="ワーカーを起動してタスクを実行する")
+    status_parser = subparsers.add_parser("status", help="キューの状態を表示する")
+    collect_parser = subparsers.add_parser("collect", help="完了したタスクの結果を出力ファイルに結合する")
+    for sub in (enqueue_parser, work_parser, status_parser, collect_parser):
+        sub.add_argument(
+            "output_dir",
+            nargs="?",
+            default=None,
+            help="docs/datasheet/output/ ディレクトリのパス（省略時は自動検出）",
+        )
+
+    enqueue_parser.add_argument(
+        "--kinds",
+        default=",".join(TASK_KINDS),
+        help=f"抽出の種類（カンマ区切り）。デフォルト: {','.join(TASK_KINDS)}",
+    )
+    enqueue_parser.add_argument(
+        "--pages-per-task",
+        type=int,
+        default=0,
+        help="1タスクのページ数（0 でデータシート単位）。デフォルト: 0",
+    )
+    enqueue_parser.add_argument(
+        "--datasheets",
+        default=None,
+        help="対象のデータシートID（カンマ区切り）。省略時は全件",
+    )
+    enqueue_parser.add_argument(
+        "--text-strategies",
+        default=DEFAULT_STRATEGIES["text"],
+        help=f"テキスト抽出の戦略（カンマ区切り）。デフォルト: {DEFAULT_STRATEGIES['text']}",
+    )
+    enqueue_parser.add_argument(
+        "--table-strategies",
+        default=DEFAULT_STRATEGIES["tables"],
+        help=f"表抽出の戦略（カンマ区切り）。デフォルト: {DEFAULT_STRATEGIES['tables']}",
+    )
+    enqueue_parser.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=None,
+        help=f"リースの有効期間 (秒)。全ワーカーが queue.json から読む。デフォルト: {DEFAULT_LEASE_TTL:.0f}",
+    )
+    enqueue_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="登録済みの (種類, データシート) も結果を消して登録し直す（ワーカー停止中に実行すること）",
+    )
+
+    work_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="このノードで起動するワーカープロセス数。デフォルト: CPU数",
+    )
+    work_parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"期限切れの回収がこの回数に達したタスクを失敗とする。デフォルト: {DEFAULT_MAX_ATTEMPTS}",
+    )
+    work_parser.add_argument(
+        "--ocr-cache",
+        default=None,
+        help="OCR結果のキャッシュディレクトリ（共有ディレクトリならノード間で再OCRを避けられる）",
+    )
+    work_parser.add_argument(
+        "--no-collect",
+        action="store_true",
+        help="ワーカー終了後に結果を結合しない",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    output_dir = args.output_dir or str(SCRIPT_DIR.parent / "output")
+    queue_dir = args.queue_dir or os.path.join(output_dir, QUEUE_DIR_NAME)
+    queue = WorkQueue(queue_dir)
+
+    if args.command == "enqueue":
+        kinds = [s.strip() for s in args.kinds.split(",") if s.strip()]
+        unknown = [k for k in kinds if k not in TASK_KINDS]
+        if unknown:
+            parser.error(f"Unknown kind(s): {unknown}. Available: {TASK_KINDS}")
+        pdfs = find_pdfs(output_dir)
+        if args.datasheets:
+            wanted = {s.strip() for s in args.datasheets.split(",") if s.strip()}
+            pdfs = [(datasheet_id, path) for datasheet_id, path in pdfs if datasheet_id in wanted]
+        if not pdfs:
+            print(f"No PDFs found in {output_dir}")
+            sys.exit(1)
+        if args.lease_ttl is not None or not os.path.exists(os.path.join(queue_dir, "queue.json")):
+            queue.write_config(args.lease_ttl or DEFAULT_LEASE_TTL)
+        strategies = {
+            "text": [s.strip() for s in args.text_strategies.split(",") if s.strip()],
+            "tables": [s.strip() for s in args.table_strategies.split(",") if s.strip()],
+        }
+        added, kept = enqueue(
+            queue, output_dir, pdfs, kinds, args.pages_per_task, strategies, force=args.force
+        )
+        print(f"Enqueued {added} task(s) in {queue_dir} ({kept} datasheet/kind group(s) already queued)")
+
+    elif args.command == "work":
+        start = time.perf_counter()
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(
+                target=_worker_main,
+                args=(queue_dir, output_dir, max(args.max_attempts, 1), args.ocr_cache),
+            )
+            for _ in range(max(args.workers, 1))
+        ]
+        for process in workers:
+            process.start()
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            # 実行中のタスクはリースの期限切れ後に他のワーカーが回収する
+            for process in workers:
+                process.terminate()
+            sys.exit(130)
+        print(f"Workers finished ({time.perf_counter() - start:.1f}s)")
+        if not args.no_collect:
+            outcome = collect(queue, output_dir)
+            print(
+                f"Collected {len(outcome['written'])} output(s), "
+                f"{len(outcome['incomplete'])} incomplete, {len(outcome['failed'])} failed"
+            )
+            if outcome["failed"]:
+                sys.exit(1)
+
+    elif args.command == "status":
+        print_status(queue)
+
+    elif args.command == "collect":
+        outcome = collect(queue, output_dir)
+        for key, groups in outcome.items():
+            for group in groups:
+                print(f"  {key:<10s} {group}")
+        print(
+            f"Collected {len(outcome['written'])} output(s), "
+            f"{len(outcome['incomplete'])} incomplete, {len(outcome['failed'])} failed"
+        )
+        if outcome["failed"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()